@@ -9,8 +9,11 @@ from livekit.plugins import silero, deepgram, google, fishaudio
 from livekit.plugins.turn_detector.multilingual import MultilingualModel
 
 from bmo.config import AGENT_NAME, logger
-from bmo.status import increment_llm_counter, build_status_response
-from bmo.assistant import Assistant
+from bmo.status import increment_llm_counter, build_status_response, status_aggregator
+from bmo.assistant import Assistant, prompt_registry
+from bmo.http_clients import http_clients
+from bmo.llm_gatekeeper import init_gatekeeper_client
+from bmo.memory_mirror import load_memory_mirror
 from bmo.room import ensure_room_and_dispatch, agent_watchdog
 
 server = AgentServer()
@@ -18,6 +21,10 @@ server = AgentServer()
 
 def prewarm(proc: JobProcess):
     proc.userdata["vad"] = silero.VAD.load()
+    init_gatekeeper_client()
+    load_memory_mirror()
+    prompt_registry.start_watching()
+    http_clients.open()
 
 server.setup_fnc = prewarm
 
@@ -35,6 +42,9 @@ def _create_session(ctx):
 @server.rtc_session(agent_name=AGENT_NAME)
 async def entrypoint(ctx: agents.JobContext):
     session = _create_session(ctx)
+    status_aggregator.start()
+    ctx.add_shutdown_callback(status_aggregator.aclose)
+    ctx.add_shutdown_callback(http_clients.aclose)
 
     @session.on("agent_state_changed")
     def _on_agent_state_changed(*args, **kwargs):
@@ -1,139 +1,100 @@
-import asyncio
 import json
 from datetime import datetime
 
 from livekit.agents import Agent, function_tool, RunContext
 from livekit.agents.llm import ChatContext, ChatMessage
 
-from bmo.config import PROMPT_PATH, GMT_PLUS_8, MEM0_SETTING, mem0_client, logger
-from bmo.llm_gatekeeper import run_llm_gatekeeper
-from bmo.memory_policy import gatekeep_durable_memories
-from bmo.prompt import load_prompt, compose_instructions
+from bmo.config import PROMPT_PATH, PROMPT_WATCH_INTERVAL, GMT_PLUS_8, mem0_client, logger
+from bmo.context_window import ContextWindow
+from bmo.memory_injection import MemoryInjector, apply_memory_message
+from bmo.memory_retrieval import RetrievalPrefetcher, TurnRetrieval
+from bmo.memory_writer import MemoryWriter
+from bmo.prompt import PromptRegistry
 from bmo.services import fetch_obsidian_search, search_tavily
+from bmo.status import record_context_size
+from bmo.tool_prefetch import ObsidianPrefetcher
+from bmo.tool_results import OBSIDIAN_PROFILE, TAVILY_PROFILE, compact_tool_result
+
+prompt_registry = PromptRegistry(PROMPT_PATH, poll_interval=PROMPT_WATCH_INTERVAL)
 
 
 class Assistant(Agent):
 
     def __init__(self) -> None:
-        prompt = load_prompt(PROMPT_PATH)
-        instructions = compose_instructions(prompt)
-        super().__init__(instructions=instructions)
-        
-
-    def _inject_memories(self, turn_ctx: ChatContext, paragraphs: list[str], *, title: str) -> None:
-        cleaned = [p.strip() for p in paragraphs if isinstance(p, str) and p.strip()]
-        if not cleaned:
-            return
-        full_context = f"{title}:\n" + "\n".join(f"- {p}" for p in cleaned)
-        logger.info(f"Injecting RAG context: {full_context}")
-        turn_ctx.add_message(role="system", content=full_context)
+        super().__init__(instructions=prompt_registry.instructions())
+        self._prefetcher = RetrievalPrefetcher()
+        self._writer = MemoryWriter(on_written=self._prefetcher.invalidate)
+        self._injector = MemoryInjector()
+        self._context_window = ContextWindow()
+        self._obsidian_prefetch = ObsidianPrefetcher()
+
+    async def on_enter(self) -> None:
+        self.session.on("user_input_transcribed", self._on_user_input_transcribed)
+        self.session.on("conversation_item_added", self._on_conversation_item_added)
+
+    async def on_exit(self) -> None:
+        self.session.off("user_input_transcribed", self._on_user_input_transcribed)
+        self.session.off("conversation_item_added", self._on_conversation_item_added)
+        self._obsidian_prefetch.close()
+        await self._context_window.aclose()
+        await self._writer.aclose()
+
+    def _on_conversation_item_added(self, ev) -> None:
+        try:
+            self._context_window.maybe_compact(self.chat_ctx, self._edit_chat_ctx)
+            s = self._context_window.stats
+            record_context_size(tokens=s.tokens, items=s.items, summary_tokens=s.summary_tokens)
+        except Exception as e:
+            logger.warning(f"Chat context check failed: {e}")
 
-    def _extract_paragraphs(self, search_results: object) -> list[str]:
-        if not search_results:
-            return []
+    async def _edit_chat_ctx(self, edit) -> None:
+        await self.update_chat_ctx(edit(self.chat_ctx))
 
-        results_list = search_results.get("results", []) if isinstance(search_results, dict) else search_results
-        if not isinstance(results_list, list):
-            return []
+    def _on_user_input_transcribed(self, ev) -> None:
+        if mem0_client is None:
+            return
+        try:
+            self._prefetcher.on_transcript(ev.transcript, is_final=ev.is_final)
+        except Exception as e:
+            logger.warning(f"Mem0 prefetch failed to start: {e}")
 
-        paragraphs: list[str] = []
-        for result in results_list:
-            if not isinstance(result, dict):
-                continue
-            paragraph = result.get("memory") or result.get("text")
-            if not isinstance(paragraph, str) or not paragraph.strip():
-                continue
-            paragraphs.append(paragraph.strip())
+    async def _inject_memories(self, turn_ctx: ChatContext, results: list[dict]) -> None:
+        message = self._injector.build(self.chat_ctx, results)
+        if message is None:
+            return
+        logger.info(f"Injecting RAG context: {message.text_content}")
+        apply_memory_message(turn_ctx, message)
 
-        return paragraphs
+        history = self.chat_ctx.copy()
+        apply_memory_message(history, message)
+        await self.update_chat_ctx(history)
 
     async def on_user_turn_completed(self, turn_ctx: ChatContext, new_message: ChatMessage) -> None:
+        try:
+            self._obsidian_prefetch.on_user_turn(new_message.text_content or "")
+        except Exception as e:
+            logger.warning(f"Obsidian prefetch failed to start: {e}")
+
         if mem0_client is not None and new_message.text_content:
-            mode = MEM0_SETTING
             user_text = new_message.text_content
 
-            if mode == "NORMAL":
-                def _add_memory_normal():
-                    try:
-                        mem0_client.add(
-                            [{"role": "user", "content": user_text}],
-                            user_id="glenn",
-                        )
-                    except Exception as e:
-                        logger.warning(f"Failed to store user message in Mem0: {e}")
-
-                asyncio.create_task(asyncio.to_thread(_add_memory_normal))
-
-            else:
-                def _add_memory_gated_llm():
-                    def _heuristic_fallback() -> None:
-                        decision = gatekeep_durable_memories(user_text)
-                        if not decision.should_store:
-                            return
-                        for item in decision.items:
-                            mem0_client.add(
-                                [{"role": "user", "content": item.text}],
-                                user_id="glenn",
-                                metadata={"category": item.category.value, "mode": "gated", "source": "heuristic"},
-                                infer=False,
-                            )
-
-                    try:
-                        existing = mem0_client.search(user_text, user_id="glenn", limit=25)
-                        if isinstance(existing, dict):
-                            existing_list = existing.get("results", [])
-                        else:
-                            existing_list = existing
-                        if not isinstance(existing_list, list):
-                            existing_list = []
-
-                        result = run_llm_gatekeeper(user_text=user_text, existing_memories=existing_list)
-                        if result.status == "error":
-                            _heuristic_fallback()
-                            return
-                        if result.status == "skip":
-                            return
-
-                        id_to_has_category: dict[str, bool] = {}
-                        for m in existing_list:
-                            if not isinstance(m, dict):
-                                continue
-                            mid = m.get("id")
-                            md = m.get("metadata") if isinstance(m.get("metadata"), dict) else {}
-                            has_cat = isinstance(md.get("category"), str)
-                            if isinstance(mid, str):
-                                id_to_has_category[mid] = has_cat
-
-                        for action in result.actions:
-                            if action.op == "update" and action.memory_id and id_to_has_category.get(action.memory_id):
-                                mem0_client.update(action.memory_id, action.text)
-                                continue
-
-                            mem0_client.add(
-                                [{"role": "user", "content": action.text}],
-                                user_id="glenn",
-                                metadata={"category": action.category.value, "mode": "gated", "source": "llm"},
-                                infer=False,
-                            )
-                    except Exception as e:
-                        logger.warning(f"Failed to store gated memories in Mem0 (LLM): {e}")
-                        try:
-                            _heuristic_fallback()
-                        except Exception as fallback_err:
-                            logger.warning(f"Heuristic fallback failed: {fallback_err}")
-
-                asyncio.create_task(asyncio.to_thread(_add_memory_gated_llm))
-
-            try:
-                search_results = await asyncio.to_thread(
-                    mem0_client.search,
-                    user_text,
-                    user_id="glenn",
-                )
-                paragraphs = self._extract_paragraphs(search_results)
-                self._inject_memories(turn_ctx, paragraphs, title="Mem0 Memories")
-            except Exception as e:
-                logger.warning(f"Failed to inject RAG context from Mem0: {e}")
+            retrieval_task = self._prefetcher.take(user_text)
+
+            self._writer.submit(user_text, retrieval_task)
+
+            retrieval: TurnRetrieval | None = None
+            if retrieval_task is not None:
+                try:
+                    retrieval = await self._prefetcher.wait(retrieval_task)
+                except Exception as e:
+                    logger.warning(f"Failed to search Mem0 for turn: {e}")
+            self._prefetcher.log_stats()
+
+            if retrieval is not None:
+                try:
+                    await self._inject_memories(turn_ctx, retrieval.for_injection())
+                except Exception as e:
+                    logger.warning(f"Failed to inject RAG context from Mem0: {e}")
 
         await super().on_user_turn_completed(turn_ctx, new_message)
 
@@ -151,10 +112,11 @@ class Assistant(Agent):
             "Search Ghegi's Obsidian notes via RAG. Use when Ghegi is mentioned or when asked "
             "for Ghegi-specific info likely stored in notes (e.g., Philhealth/SSS numbers, VPS credentials). "
             "Input: a free-text search query and a short BMO-style loading_message describing what you're searching for. "
+            "Set fresh=true only when Ghegi says the notes just changed; otherwise recent answers may be reused. "
             "Output: JSON with a top-level 'results' array."
         ),
     )
-    async def obsidian_query(self, context: RunContext, query: str, loading_message: str) -> str:
+    async def obsidian_query(self, context: RunContext, query: str, loading_message: str, fresh: bool = False) -> str:
         try:
             room = context.session.room_io.room
             payload = json.dumps({"type": "loading-status", "text": loading_message})
@@ -162,7 +124,13 @@ class Assistant(Agent):
         except Exception as e:
             logger.warning(f"Failed to send loading status: {e}")
 
-        return await fetch_obsidian_search(query)
+        result = None
+        if not fresh:
+            result = await self._obsidian_prefetch.take(query)
+            self._obsidian_prefetch.log_stats()
+        if result is None:
+            result = await fetch_obsidian_search(query, use_cache=not fresh)
+        return compact_tool_result(result, OBSIDIAN_PROFILE)
 
     @function_tool(
         name="present_to_cassette",
@@ -209,5 +177,6 @@ class Assistant(Agent):
             logger.warning(f"Failed to send loading status: {e}")
 
         result = await search_tavily(query, topic=topic, max_results=max_results, time_range=time_range)
+        result = compact_tool_result(result, TAVILY_PROFILE)
         logger.info(f"search_internet query={query!r} topic={topic} → {result[:500]}")
         return result
@@ -6,22 +6,107 @@ from pathlib import Path
 from dotenv import load_dotenv
 from mem0 import Memory
 
+from bmo.embedding_cache import install_embedding_cache
+
 load_dotenv(".env.local")
 
 logger = logging.getLogger("bmo-agent")
 
+
+def _env_float(name: str, default: float) -> float:
+    raw = (os.getenv(name) or "").strip()
+    try:
+        return float(raw) if raw else default
+    except ValueError:
+        logger.warning(f"Invalid {name}={raw!r}, using {default}")
+        return default
+
+
 ROOM_NAME = "bmo-room"
 AGENT_NAME = "voice-agent"
 PROMPT_PATH = Path(__file__).resolve().parent.parent / "prompts" / "bmo.json"
+PROMPT_WATCH_INTERVAL = _env_float("PROMPT_WATCH_INTERVAL", 2)
 GMT_PLUS_8 = timezone(timedelta(hours=8))
 OBSIDIAN_SEARCH_URL_DEFAULT = "http://188.209.141.228:18000/api/v1/search"
 WATCHDOG_INTERVAL = 30
+OBSIDIAN_TIMEOUT = _env_float("OBSIDIAN_TIMEOUT", 8)
+OBSIDIAN_TIMEOUT_MIN = _env_float("OBSIDIAN_TIMEOUT_MIN", 1.5)
+OBSIDIAN_BREAKER_FAILURES = int(_env_float("OBSIDIAN_BREAKER_FAILURES", 3))
+OBSIDIAN_BREAKER_RESET = _env_float("OBSIDIAN_BREAKER_RESET", 30)
+OBSIDIAN_CACHE_TTL = _env_float("OBSIDIAN_CACHE_TTL", 600)
+OBSIDIAN_CACHE_STALE_TTL = _env_float("OBSIDIAN_CACHE_STALE_TTL", 86400)
+OBSIDIAN_CACHE_SIZE = int(_env_float("OBSIDIAN_CACHE_SIZE", 128))
+OBSIDIAN_PREFETCH_TRIGGERS = tuple(
+    t.strip()
+    for t in (os.getenv("OBSIDIAN_PREFETCH_TRIGGERS") or "Ghegi,Philhealth,SSS,VPS,credentials,notes").split(",")
+    if t.strip()
+)
+OBSIDIAN_PREFETCH_TTL = _env_float("OBSIDIAN_PREFETCH_TTL", 30)
+OBSIDIAN_PREFETCH_MATCH = _env_float("OBSIDIAN_PREFETCH_MATCH", 0.6)
+OBSIDIAN_RESULT_TOKEN_BUDGET = int(_env_float("OBSIDIAN_RESULT_TOKEN_BUDGET", 1200))
+TAVILY_RESULT_TOKEN_BUDGET = int(_env_float("TAVILY_RESULT_TOKEN_BUDGET", 1500))
+_TAVILY_BACKEND_RAW = (os.getenv("TAVILY_BACKEND") or "TAVILY").strip().upper()
+TAVILY_BACKEND = _TAVILY_BACKEND_RAW if _TAVILY_BACKEND_RAW in {"TAVILY", "STUB"} else "TAVILY"
+TAVILY_CACHE_SIZE = int(_env_float("TAVILY_CACHE_SIZE", 256))
+TAVILY_TTL_GENERAL = _env_float("TAVILY_TTL_GENERAL", 21600)
+TAVILY_TTL_NEWS = _env_float("TAVILY_TTL_NEWS", 600)
+TAVILY_TTL_FINANCE = _env_float("TAVILY_TTL_FINANCE", 120)
+STATUS_HTTP_TIMEOUT = _env_float("STATUS_HTTP_TIMEOUT", 10)
+STATUS_REFRESH_INTERVAL = _env_float("STATUS_REFRESH_INTERVAL", 300)
+STATUS_REFRESH_MAX_BACKOFF = _env_float("STATUS_REFRESH_MAX_BACKOFF", 1800)
+STATUS_REFRESH_JITTER = _env_float("STATUS_REFRESH_JITTER", 0.1)
+HTTP2_ENABLED = (os.getenv("HTTP2_ENABLED") or "").strip().lower() in {"1", "true", "yes", "on"}
+
+GATEKEEPER_TIMEOUT = _env_float("GATEKEEPER_TIMEOUT", 10)
+GATEKEEPER_CONCURRENCY = max(int(_env_float("GATEKEEPER_CONCURRENCY", 2)), 1)
+GATEKEEPER_CACHE_TTL = _env_float("GATEKEEPER_CACHE_TTL", 7 * 24 * 3600)
+GATEKEEPER_CACHE_SIZE = int(_env_float("GATEKEEPER_CACHE_SIZE", 4096))
+GATEKEEPER_CACHE_PATH = Path(
+    os.getenv("GATEKEEPER_CACHE_PATH") or Path(__file__).resolve().parent.parent / ".cache" / "gatekeeper-decisions.sqlite"
+)
 
 _MEM0_SETTING_RAW = (os.getenv("MEM0_SETTING") or "GATED").strip().upper()
 MEM0_SETTING = _MEM0_SETTING_RAW if _MEM0_SETTING_RAW in {"NORMAL", "GATED"} else "GATED"
 
 logger.info(f"MEM0_SETTING={MEM0_SETTING}")
 
+_MEM0_RETRIEVAL_MODE_RAW = (os.getenv("MEM0_RETRIEVAL_MODE") or "ALWAYS").strip().upper()
+MEM0_RETRIEVAL_MODE = (
+    _MEM0_RETRIEVAL_MODE_RAW
+    if _MEM0_RETRIEVAL_MODE_RAW in {"ALWAYS", "HEURISTIC", "HEURISTIC_CACHED"}
+    else "ALWAYS"
+)
+
+logger.info(f"MEM0_RETRIEVAL_MODE={MEM0_RETRIEVAL_MODE}")
+
+_MEM0_INJECT_MODE_RAW = (os.getenv("MEM0_INJECT_MODE") or "ROLLING").strip().upper()
+MEM0_INJECT_MODE = _MEM0_INJECT_MODE_RAW if _MEM0_INJECT_MODE_RAW in {"APPEND", "ROLLING"} else "ROLLING"
+
+logger.info(f"MEM0_INJECT_MODE={MEM0_INJECT_MODE}")
+
+MEM0_USER_ID = "glenn"
+MEM0_INJECT_LIMIT = 100
+MEM0_GATEKEEPER_LIMIT = 25
+MEM0_INJECT_DEADLINE = _env_float("MEM0_INJECT_DEADLINE_MS", 150) / 1000
+MEM0_PREFETCH_SIMILARITY = _env_float("MEM0_PREFETCH_SIMILARITY", 0.8)
+MEM0_RETRIEVAL_CACHE_TTL = _env_float("MEM0_RETRIEVAL_CACHE_TTL", 300)
+MEM0_WRITER_QUEUE_SIZE = int(_env_float("MEM0_WRITER_QUEUE_SIZE", 8))
+MEM0_WRITER_WORKERS = int(_env_float("MEM0_WRITER_WORKERS", 1))
+MEM0_WRITER_COALESCE_MAX = int(_env_float("MEM0_WRITER_COALESCE_MAX", 4))
+MEM0_WRITER_BATCH_WINDOW = _env_float("MEM0_WRITER_BATCH_WINDOW_MS", 1500) / 1000
+MEM0_PREFILTER_SAMPLE_RATE = _env_float("MEM0_PREFILTER_SAMPLE_RATE", 0.05)
+MEM0_SKIP_LEXICON = tuple(p.strip() for p in (os.getenv("MEM0_SKIP_LEXICON") or "").split("|") if p.strip())
+MEM0_LOCAL_MIRROR = (os.getenv("MEM0_LOCAL_MIRROR") or "").strip().lower() in {"1", "true", "yes", "on"}
+MEM0_MIRROR_RECONCILE_SECONDS = _env_float("MEM0_MIRROR_RECONCILE_SECONDS", 300)
+
+CHAT_CONTEXT_TOKEN_BUDGET = int(_env_float("CHAT_CONTEXT_TOKEN_BUDGET", 12000))
+CHAT_CONTEXT_KEEP_TURNS = int(_env_float("CHAT_CONTEXT_KEEP_TURNS", 6))
+
+EMBEDDING_MODEL = "models/gemini-embedding-001"
+EMBEDDING_CACHE_SIZE = int(_env_float("EMBEDDING_CACHE_SIZE", 2048))
+EMBEDDING_CACHE_PATH = Path(os.environ["EMBEDDING_CACHE_PATH"]) if os.getenv("EMBEDDING_CACHE_PATH") else None
+EMBEDDING_CACHE_DISK_SIZE = int(_env_float("EMBEDDING_CACHE_DISK_SIZE", 50_000))
+
 MEM0_CONFIG = {
     "vector_store": {
         "provider": "qdrant",
@@ -40,13 +125,20 @@ MEM0_CONFIG = {
     "embedder": {
         "provider": "gemini",
         "config": {
-            "model": "models/gemini-embedding-001",
+            "model": EMBEDDING_MODEL,
         }
     }
 }
 
 try:
     mem0_client = Memory.from_config(MEM0_CONFIG)
+    install_embedding_cache(
+        mem0_client,
+        model=EMBEDDING_MODEL,
+        max_entries=EMBEDDING_CACHE_SIZE,
+        disk_path=EMBEDDING_CACHE_PATH,
+        max_disk_entries=EMBEDDING_CACHE_DISK_SIZE,
+    )
     logger.info("Mem0 client initialized successfully.")
 except Exception as e:
     logger.warning(f"Failed to initialize Mem0: {e}")
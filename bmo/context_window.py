@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from livekit.agents.llm import ChatContext, ChatMessage
+
+from bmo.config import CHAT_CONTEXT_KEEP_TURNS, CHAT_CONTEXT_TOKEN_BUDGET, logger
+from bmo.llm_gatekeeper import init_gatekeeper_client
+from bmo.memory_injection import MEMORY_BLOCK_ID, estimate_tokens
+
+SUMMARY_MESSAGE_ID = "bmo-context-summary"
+_SUMMARY_MODEL = "gemini-3-flash-preview"
+_SUMMARY_TIMEOUT = 20.0
+_SUMMARY_MAX_WORDS = 250
+_HARD_LIMIT_FACTOR = 2.0
+
+Summarizer = Callable[[str, list[str]], Awaitable[str]]
+
+
+@dataclass
+class WindowStats:
+    tokens: int = 0
+    items: int = 0
+    summary_tokens: int = 0
+    compactions: int = 0
+    folded_items: int = 0
+    failures: int = 0
+
+
+class ContextWindow:
+    """Keeps a long-lived session's chat history under a token budget.
+
+    Framework instruction messages (``lk.*`` ids), the rolling memory block and the
+    last ``keep_turns`` user turns stay verbatim. Once the history goes over budget,
+    everything older is folded into one summary message in a background task. If
+    summarizing fails and the history passes twice the budget, the oldest turns are
+    dropped without a summary.
+    """
+
+    def __init__(
+        self,
+        *,
+        budget: int = CHAT_CONTEXT_TOKEN_BUDGET,
+        keep_turns: int = CHAT_CONTEXT_KEEP_TURNS,
+        summarizer: Summarizer | None = None,
+    ) -> None:
+        self.budget = max(budget, 1)
+        self.keep_turns = max(keep_turns, 1)
+        self.stats = WindowStats()
+        self._summarizer = summarizer or summarize_turns
+        self._task: asyncio.Task | None = None
+
+    def measure(self, chat_ctx: ChatContext) -> int:
+        s = self.stats
+        s.tokens = sum(item_tokens(item) for item in chat_ctx.items)
+        s.items = len(chat_ctx.items)
+        summary = chat_ctx.get_by_id(SUMMARY_MESSAGE_ID)
+        s.summary_tokens = item_tokens(summary) if summary is not None else 0
+        return s.tokens
+
+    def maybe_compact(
+        self,
+        chat_ctx: ChatContext,
+        apply: Callable[[Callable[[ChatContext], ChatContext]], Awaitable[None]],
+    ) -> None:
+        """Schedules a fold when over budget. ``apply`` receives an edit to run on the latest history."""
+        if self.measure(chat_ctx) <= self.budget or (self._task is not None and not self._task.done()):
+            return
+        folded = foldable_items(chat_ctx, keep_turns=self.keep_turns)
+        if not folded:
+            return
+        self._task = asyncio.create_task(self._compact(chat_ctx, folded, apply))
+
+    async def aclose(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _compact(self, chat_ctx: ChatContext, folded: list, apply) -> None:
+        previous = chat_ctx.get_by_id(SUMMARY_MESSAGE_ID)
+        previous_text = previous.extra.get("summary", "") if previous is not None else ""
+        lines = [line for line in (transcript_line(item) for item in folded) if line]
+        folded_ids = {item.id for item in folded}
+
+        try:
+            summary = (await self._summarizer(previous_text, lines)).strip() if lines else previous_text
+        except Exception as e:
+            self.stats.failures += 1
+            logger.warning(f"Chat context summary failed: {e}")
+            if self.stats.tokens <= self.budget * _HARD_LIMIT_FACTOR:
+                return
+            summary = previous_text
+
+        def edit(history: ChatContext) -> ChatContext:
+            updated = history.copy()
+            updated.items[:] = [item for item in updated.items if item.id not in folded_ids]
+            if summary:
+                message = ChatMessage(
+                    id=SUMMARY_MESSAGE_ID,
+                    role="system",
+                    content=[f"Summary of the earlier conversation:\n{summary}"],
+                    extra={"summary": summary},
+                )
+                index = updated.index_by_id(SUMMARY_MESSAGE_ID)
+                if index is None:
+                    updated.items.insert(_summary_position(updated), message)
+                else:
+                    updated.items[index] = message
+            return updated
+
+        await apply(edit)
+        before = self.stats.tokens
+        self.stats.compactions += 1
+        self.stats.folded_items += len(folded_ids)
+        logger.info(
+            f"Chat context compacted: folded={len(folded_ids)} items, "
+            f"tokens {before} -> ~{before - sum(item_tokens(i) for i in folded) + estimate_tokens(summary)}"
+        )
+
+
+def foldable_items(chat_ctx: ChatContext, *, keep_turns: int) -> list:
+    """Items older than the last ``keep_turns`` user messages, minus pinned ones."""
+    user_indexes = [i for i, item in enumerate(chat_ctx.items) if item.type == "message" and item.role == "user"]
+    if len(user_indexes) <= keep_turns:
+        return []
+    cutoff = user_indexes[-keep_turns]
+    return [item for item in chat_ctx.items[:cutoff] if not _pinned(item)]
+
+
+def item_tokens(item) -> int:
+    if item.type == "message":
+        return estimate_tokens(item.text_content or "")
+    if item.type == "function_call":
+        return estimate_tokens(item.name) + estimate_tokens(item.arguments)
+    if item.type == "function_call_output":
+        return estimate_tokens(item.output)
+    return 0
+
+
+def transcript_line(item) -> str:
+    if item.type == "message":
+        if item.role not in ("user", "assistant"):
+            return ""
+        text = " ".join((item.text_content or "").split())
+        return f"{'User' if item.role == 'user' else 'BMO'}: {text}" if text else ""
+    if item.type == "function_call":
+        return f"BMO called {item.name}({item.arguments})"
+    if item.type == "function_call_output":
+        return f"{item.name or 'tool'} returned: {' '.join(item.output.split())[:500]}"
+    return ""
+
+
+async def summarize_turns(previous: str, lines: list[str]) -> str:
+    client = init_gatekeeper_client()
+    if client is None:
+        raise RuntimeError("missing_google_api_key")
+
+    prompt = (
+        "You maintain the running summary of a long voice conversation between the user (Ghegi) "
+        "and BMO, a voice assistant. Update the summary with the new transcript lines. Keep durable "
+        "facts, open requests, decisions and anything BMO promised; drop greetings and small talk. "
+        f"Write plain prose, at most {_SUMMARY_MAX_WORDS} words.\n\n"
+        f"Current summary:\n{previous or '(none)'}\n\nNew transcript lines:\n" + "\n".join(lines)
+    )
+    response = await asyncio.wait_for(
+        client.aio.models.generate_content(
+            model=_SUMMARY_MODEL,
+            contents=prompt,
+            config={"temperature": 0.2},
+        ),
+        timeout=_SUMMARY_TIMEOUT,
+    )
+    text = getattr(response, "text", None)
+    if not isinstance(text, str) or not text.strip():
+        raise RuntimeError("empty_summary")
+    return text
+
+
+def _pinned(item) -> bool:
+    if item.id.startswith("lk.") or item.id in (MEMORY_BLOCK_ID, SUMMARY_MESSAGE_ID):
+        return True
+    return item.type not in ("message", "function_call", "function_call_output")
+
+
+def _summary_position(chat_ctx: ChatContext) -> int:
+    index = 0
+    for i, item in enumerate(chat_ctx.items):
+        if item.type == "message" and item.role in ("system", "developer") and _pinned(item):
+            index = i + 1
+        elif item.type == "message":
+            break
+    return index
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+from dataclasses import dataclass
+
+import httpx
+
+from bmo.config import HTTP2_ENABLED, OBSIDIAN_TIMEOUT, STATUS_HTTP_TIMEOUT, logger
+
+_STATS_LOG_EVERY = 50
+
+
+@dataclass(frozen=True)
+class ServiceConfig:
+    timeout: float
+    http2: bool = False
+    max_connections: int = 10
+    max_keepalive: int = 5
+    keepalive_expiry: float = 60.0
+
+
+SERVICES: dict[str, ServiceConfig] = {
+    "obsidian": ServiceConfig(timeout=OBSIDIAN_TIMEOUT),
+    "fish_audio": ServiceConfig(timeout=STATUS_HTTP_TIMEOUT, http2=HTTP2_ENABLED, max_connections=2, max_keepalive=1),
+    "deepgram": ServiceConfig(timeout=STATUS_HTTP_TIMEOUT, http2=HTTP2_ENABLED, max_connections=2, max_keepalive=1),
+}
+
+
+@dataclass
+class ClientStats:
+    requests: int = 0
+    connections: int = 0
+
+    @property
+    def reused(self) -> int:
+        return max(self.requests - self.connections, 0)
+
+
+class HttpClientRegistry:
+    """Process-wide pooled ``httpx.AsyncClient`` per outbound service.
+
+    Each service gets its own keep-alive pool and timeout. Clients are created lazily
+    (or up front by ``open()`` from prewarm) and bound to the event loop that first
+    uses them; a client from a different, closed loop is replaced. New TCP connections
+    are counted through httpcore's trace hook, so ``requests - connections`` is the
+    number of requests that reused a pooled connection.
+    """
+
+    def __init__(self, services: dict[str, ServiceConfig]) -> None:
+        self.services = services
+        self.stats: dict[str, ClientStats] = {name: ClientStats() for name in services}
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._loops: dict[str, asyncio.AbstractEventLoop | None] = {}
+        self._http2 = importlib.util.find_spec("h2") is not None
+        if any(c.http2 for c in services.values()) and not self._http2:
+            logger.warning("HTTP/2 requested but the h2 package is not installed, using HTTP/1.1")
+
+    def open(self) -> None:
+        for name in self.services:
+            self.get(name)
+
+    def get(self, service: str) -> httpx.AsyncClient:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        client = self._clients.get(service)
+        bound = self._loops.get(service)
+        if client is not None and not client.is_closed:
+            if bound is None and loop is not None:
+                self._loops[service] = loop
+                return client
+            if bound is loop or loop is None or not bound.is_closed():
+                return client
+
+        client = self._create(service)
+        self._clients[service] = client
+        self._loops[service] = loop
+        return client
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        self._loops = {}
+        await asyncio.gather(*(c.aclose() for c in clients.values() if not c.is_closed), return_exceptions=True)
+        self.log_stats()
+
+    def log_stats(self) -> None:
+        summary = " ".join(
+            f"{name}={s.requests}req/{s.connections}conn/{s.reused}reused" for name, s in self.stats.items() if s.requests
+        )
+        if summary:
+            logger.info(f"HTTP pools: {summary}")
+
+    def _create(self, service: str) -> httpx.AsyncClient:
+        config = self.services[service]
+        stats = self.stats[service]
+
+        async def trace(event: str, info: dict) -> None:
+            if event == "connection.connect_tcp.complete":
+                stats.connections += 1
+
+        async def on_request(request: httpx.Request) -> None:
+            stats.requests += 1
+            request.extensions["trace"] = trace
+            if stats.requests % _STATS_LOG_EVERY == 0:
+                self.log_stats()
+
+        return httpx.AsyncClient(
+            timeout=config.timeout,
+            http2=config.http2 and self._http2,
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+            event_hooks={"request": [on_request]},
+        )
+
+
+http_clients = HttpClientRegistry(SERVICES)
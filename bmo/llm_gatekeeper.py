@@ -1,14 +1,30 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import os
 import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Literal
 
 from google import genai
 
-from bmo.memory_policy import MemoryCategory
+from bmo.config import (
+    GATEKEEPER_CACHE_PATH,
+    GATEKEEPER_CACHE_SIZE,
+    GATEKEEPER_CACHE_TTL,
+    GATEKEEPER_CONCURRENCY,
+    GATEKEEPER_TIMEOUT,
+)
+from bmo.memory_policy import SKIP_EXAMPLES, MemoryCategory, normalize_text
+
+_CATEGORIES = [c.value for c in MemoryCategory]
 
 
 @dataclass(frozen=True)
@@ -30,92 +46,496 @@ class GatekeeperResult:
         return bool(self.actions)
 
 
+@dataclass(frozen=True)
+class GatekeeperItem:
+    user_text: str
+    existing_memories: list[dict]
+
+
+_DEFAULT_MODEL = "gemini-3-flash-preview"
+_DEFAULT_TIMEOUT = GATEKEEPER_TIMEOUT
+_MAX_CONCURRENCY = GATEKEEPER_CONCURRENCY
+
+_client: genai.Client | None = None
+_client_lock = threading.Lock()
+_semaphore: asyncio.Semaphore | None = None
+
+
+def init_gatekeeper_client() -> genai.Client | None:
+    """Creates the shared Gemini client once per process (called from prewarm)."""
+    global _client
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        return None
+    with _client_lock:
+        if _client is None:
+            _client = genai.Client(api_key=api_key)
+    return _client
+
+
 def run_llm_gatekeeper(
     *,
     user_text: str,
     existing_memories: list[dict],
-    model: str = "gemini-3-flash-preview",
+    model: str = _DEFAULT_MODEL,
 ) -> GatekeeperResult:
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key:
+    key = decision_cache.key(user_text, existing_memories, model)
+    cached = decision_cache.get(key)
+    if cached is not None:
+        return cached
+
+    client = init_gatekeeper_client()
+    if client is None:
         return GatekeeperResult(actions=(), reason="missing_google_api_key", status="error")
 
-    memories_compact: list[dict] = []
-    for m in existing_memories:
-        if not isinstance(m, dict):
-            continue
-        mid = m.get("id")
-        mem = m.get("memory")
-        md = m.get("metadata") if isinstance(m.get("metadata"), dict) else {}
-        cat = md.get("category")
-        if isinstance(mid, str) and isinstance(mem, str) and mem.strip():
-            memories_compact.append({"id": mid, "memory": mem.strip(), "category": cat})
+    response = client.models.generate_content(**_build_request(user_text, existing_memories, model))
+    result = _parse_result(_extract_text(response))
+    decision_cache.put(key, result)
+    return result
+
+
+async def arun_llm_gatekeeper(
+    *,
+    user_text: str,
+    existing_memories: list[dict],
+    model: str = _DEFAULT_MODEL,
+    timeout: float = _DEFAULT_TIMEOUT,
+) -> GatekeeperResult:
+    """Async variant on the shared client; at most GATEKEEPER_CONCURRENCY calls run at once."""
+    key = decision_cache.key(user_text, existing_memories, model)
+    cached = await decision_cache.aget(key)
+    if cached is not None:
+        return cached
+
+    client = init_gatekeeper_client()
+    if client is None:
+        return GatekeeperResult(actions=(), reason="missing_google_api_key", status="error")
+
+    try:
+        async with _get_semaphore():
+            response = await asyncio.wait_for(
+                client.aio.models.generate_content(**_build_request(user_text, existing_memories, model)),
+                timeout=timeout,
+            )
+    except asyncio.TimeoutError:
+        return GatekeeperResult(actions=(), reason="timeout", status="error")
+
+    result = _parse_result(_extract_text(response))
+    await decision_cache.aput(key, result)
+    return result
+
+
+def run_llm_gatekeeper_batch(
+    items: list[GatekeeperItem],
+    *,
+    model: str = _DEFAULT_MODEL,
+) -> list[GatekeeperResult]:
+    """Classifies many utterances with one request; a bad entry only fails its own item."""
+    results, keys, missing = _lookup_batch(items, model)
+    if len(missing) == 1:
+        item = items[missing[0]]
+        results[missing[0]] = run_llm_gatekeeper(
+            user_text=item.user_text, existing_memories=item.existing_memories, model=model
+        )
+    elif missing:
+        client = init_gatekeeper_client()
+        if client is None:
+            fresh = [GatekeeperResult(actions=(), reason="missing_google_api_key", status="error")] * len(missing)
+        else:
+            response = client.models.generate_content(**_build_batch_request([items[i] for i in missing], model))
+            fresh = _parse_batch_result(_extract_text(response), len(missing))
+        _store_batch(results, keys, missing, fresh)
+    return results
+
+
+async def arun_llm_gatekeeper_batch(
+    items: list[GatekeeperItem],
+    *,
+    model: str = _DEFAULT_MODEL,
+    timeout: float = _DEFAULT_TIMEOUT,
+) -> list[GatekeeperResult]:
+    keys = [decision_cache.key(item.user_text, item.existing_memories, model) for item in items]
+    results = [await decision_cache.aget(key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if len(missing) == 1:
+        item = items[missing[0]]
+        results[missing[0]] = await arun_llm_gatekeeper(
+            user_text=item.user_text,
+            existing_memories=item.existing_memories,
+            model=model,
+            timeout=timeout,
+        )
+    elif missing:
+        client = init_gatekeeper_client()
+        if client is None:
+            fresh = [GatekeeperResult(actions=(), reason="missing_google_api_key", status="error")] * len(missing)
+        else:
+            try:
+                async with _get_semaphore():
+                    response = await asyncio.wait_for(
+                        client.aio.models.generate_content(
+                            **_build_batch_request([items[i] for i in missing], model)
+                        ),
+                        timeout=timeout,
+                    )
+                fresh = _parse_batch_result(_extract_text(response), len(missing))
+            except asyncio.TimeoutError:
+                fresh = [GatekeeperResult(actions=(), reason="timeout", status="error")] * len(missing)
+        for i, result in zip(missing, fresh):
+            results[i] = result
+        await decision_cache.aput_many([(keys[i], result) for i, result in zip(missing, fresh)])
+    return results
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(_MAX_CONCURRENCY)
+    return _semaphore
+
+
+def _lookup_batch(
+    items: list[GatekeeperItem], model: str
+) -> tuple[list[GatekeeperResult | None], list[str], list[int]]:
+    keys = [decision_cache.key(item.user_text, item.existing_memories, model) for item in items]
+    results = [decision_cache.get(key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+    return results, keys, missing
+
+
+def _store_batch(
+    results: list[GatekeeperResult | None],
+    keys: list[str],
+    missing: list[int],
+    fresh: list[GatekeeperResult],
+) -> None:
+    for i, result in zip(missing, fresh):
+        results[i] = result
+    decision_cache.put_many([(keys[i], result) for i, result in zip(missing, fresh)])
+
+
+class DecisionCache:
+    """TTL + LRU cache of gatekeeper decisions, mirrored to SQLite so it survives restarts.
+
+    Keys combine the normalized utterance, the model and a hash of the ids of the
+    memories the gatekeeper was shown, so an update decision is only reused against the
+    same memory set. Errors are never cached; skips are, since they dominate traffic.
+
+    The database is opened on first use. Writes go to the in-memory tier at once and are
+    queued for SQLite; ``flush`` commits the queue in one transaction. The async
+    ``aget``/``aput`` do their disk work on a worker thread.
+    """
+
+    def __init__(self, *, ttl: float, max_entries: int, path: Path | None) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, GatekeeperResult]] = OrderedDict()
+        self._pending: list[tuple[str, tuple[float, str] | None]] = []
+        self._db: sqlite3.Connection | None = None
+        self._db_failed = path is None
+
+    @staticmethod
+    def key(user_text: str, existing_memories: list[dict], model: str) -> str:
+        normalized = normalize_text(user_text)
+        ids = sorted(
+            m["id"] for m in existing_memories if isinstance(m, dict) and isinstance(m.get("id"), str)
+        )
+        fingerprint = hashlib.sha256("\0".join(ids).encode("utf-8")).hexdigest()[:16]
+        return hashlib.sha256(f"{model}\0{normalized}\0{fingerprint}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> GatekeeperResult | None:
+        entry = self._memory_entry(key)
+        if entry is None and not self._db_failed:
+            entry = self._disk_entry(key)
+        return self._resolve(key, entry)
+
+    async def aget(self, key: str) -> GatekeeperResult | None:
+        entry = self._memory_entry(key)
+        if entry is None and not self._db_failed:
+            entry = await asyncio.to_thread(self._disk_entry, key)
+        return self._resolve(key, entry)
+
+    def put(self, key: str, result: GatekeeperResult) -> None:
+        if self._queue(key, result):
+            self.flush()
+
+    async def aput(self, key: str, result: GatekeeperResult) -> None:
+        if self._queue(key, result):
+            await asyncio.to_thread(self.flush)
+
+    def put_many(self, entries: list[tuple[str, GatekeeperResult]]) -> None:
+        """Stores several decisions with a single SQLite transaction."""
+        if any([self._queue(key, result) for key, result in entries]):
+            self.flush()
+
+    async def aput_many(self, entries: list[tuple[str, GatekeeperResult]]) -> None:
+        if any([self._queue(key, result) for key, result in entries]):
+            await asyncio.to_thread(self.flush)
+
+    def flush(self) -> None:
+        """Writes queued puts and deletes to SQLite in one transaction."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        with self._db_lock:
+            db = self._connect()
+            if db is None:
+                return
+            try:
+                for key, row in pending:
+                    if row is None:
+                        db.execute("DELETE FROM decisions WHERE key = ?", (key,))
+                    else:
+                        db.execute(
+                            "INSERT OR REPLACE INTO decisions (key, expires_at, result) VALUES (?, ?, ?)",
+                            (key, *row),
+                        )
+                db.commit()
+            except sqlite3.Error:
+                pass
+
+    def _queue(self, key: str, result: GatekeeperResult) -> bool:
+        if result.status == "error":
+            return False
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, (expires_at, result))
+            if not self._db_failed:
+                self._pending.append((key, (expires_at, _result_to_json(result))))
+        return not self._db_failed
+
+    def _memory_entry(self, key: str) -> tuple[float, GatekeeperResult] | None:
+        with self._lock:
+            return self._entries.get(key)
+
+    def _disk_entry(self, key: str) -> tuple[float, GatekeeperResult] | None:
+        with self._db_lock:
+            db = self._connect()
+            if db is None:
+                return None
+            try:
+                row = db.execute("SELECT expires_at, result FROM decisions WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error:
+                return None
+        if row is None:
+            return None
+        entry = (row[0], _result_from_json(row[1]))
+        with self._lock:
+            self._remember(key, entry)
+        return entry
+
+    def _resolve(self, key: str, entry: tuple[float, GatekeeperResult] | None) -> GatekeeperResult | None:
+        with self._lock:
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    self._forget(key)
+                self.misses += 1
+                return None
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def _connect(self) -> sqlite3.Connection | None:
+        """Opens the database on first use; callers hold ``_db_lock``."""
+        if self._db is None and not self._db_failed:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                db = sqlite3.connect(str(self.path), check_same_thread=False)
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS decisions (key TEXT PRIMARY KEY, expires_at REAL NOT NULL, result TEXT NOT NULL)"
+                )
+                db.execute("DELETE FROM decisions WHERE expires_at < ?", (time.time(),))
+                db.commit()
+                self._db = db
+            except (OSError, sqlite3.Error):
+                self._db_failed = True
+        return self._db
+
+    def _remember(self, key: str, entry: tuple[float, GatekeeperResult]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            if not self._db_failed:
+                self._pending.append((evicted, None))
+
+    def _forget(self, key: str) -> None:
+        self._entries.pop(key, None)
+        if not self._db_failed:
+            self._pending.append((key, None))
+
+
+def _result_to_json(result: GatekeeperResult) -> str:
+    return json.dumps(
+        {
+            "status": result.status,
+            "reason": result.reason,
+            "actions": [
+                {"op": a.op, "text": a.text, "category": a.category.value, "memory_id": a.memory_id}
+                for a in result.actions
+            ],
+        }
+    )
+
 
-    system = (
-        "You are a memory gatekeeper for a voice assistant. "
-        "Your job is to decide what durable long-term memories should be stored. "
-        "Only store stable facts and preferences that will matter later. "
-        "Do NOT store transient status updates, bodily functions, tool requests, one-off actions."
-        "Prefer atomic, canonical statements."
+def _result_from_json(raw: str) -> GatekeeperResult:
+    data = json.loads(raw)
+    return GatekeeperResult(
+        actions=tuple(
+            GatekeeperAction(
+                op=a["op"],
+                text=a["text"],
+                category=MemoryCategory(a["category"]),
+                memory_id=a.get("memory_id"),
+            )
+            for a in data.get("actions", [])
+        ),
+        reason=data.get("reason", ""),
+        status=data["status"],
     )
 
-    categories = [c.value for c in MemoryCategory]
 
+decision_cache = DecisionCache(
+    ttl=GATEKEEPER_CACHE_TTL,
+    max_entries=GATEKEEPER_CACHE_SIZE,
+    path=GATEKEEPER_CACHE_PATH,
+)
+
+
+_SYSTEM_PROMPT = (
+    "You are a memory gatekeeper for a voice assistant. "
+    "Your job is to decide what durable long-term memories should be stored. "
+    "Only store stable facts and preferences that will matter later. "
+    "Do NOT store transient status updates, bodily functions, tool requests, one-off actions."
+    "Prefer atomic, canonical statements."
+)
+
+_PREFERRED_MEMORY_TYPES = {
+    "allowed_categories": _CATEGORIES,
+    "examples_store": [
+        {"category": "relationships", "text": "Has a brother named Elp."},
+        {"category": "preferences", "text": "Favorite color: blue."},
+        {"category": "goals", "text": "Goal: become a better backend engineer."},
+        {"category": "personal_facts", "text": "Works as a software engineer."},
+    ],
+    "examples_skip": list(SKIP_EXAMPLES),
+}
+
+_DECISION_SCHEMA = {
+    "store": "boolean",
+    "reason": "string",
+    "actions": [
+        {
+            "op": "add|update",
+            "memory_id": "string (required if op=update)",
+            "category": "one of allowed_categories",
+            "text": "canonical memory text",
+        }
+    ],
+}
+
+_RULES = [
+    "Return ONLY valid JSON. No markdown, no code fences.",
+    "If nothing durable, return store=false and actions=[]",
+    "Use op=update only if an existing memory already expresses the same fact (choose the best matching id).",
+    "If you update, output the full corrected canonical memory text.",
+    "Keep text short (<= 100 chars) and avoid sensitive details.",
+]
+
+_BATCH_RULES = [
+    *_RULES,
+    "Return exactly one entry in results for every item, echoing its index.",
+    "Decide each item independently; only use that item's existing_memories for op=update.",
+]
+
+
+def _build_request(user_text: str, existing_memories: list[dict], model: str) -> dict:
     user = {
         "user_text": user_text,
-        "preferred_memory_types": {
-            "allowed_categories": categories,
-            "examples_store": [
-                {"category": "relationships", "text": "Has a brother named Elp."},
-                {"category": "preferences", "text": "Favorite color: blue."},
-                {"category": "goals", "text": "Goal: become a better backend engineer."},
-                {"category": "personal_facts", "text": "Works as a software engineer."},
-            ],
-            "examples_skip": [
-                "I'm pooping.",
-                "Pick a random cassette.",
-                "I'm hungry right now.",
-                "Turn the volume up.",
-            ],
-        },
-        "existing_memories": memories_compact,
-        "output_schema": {
-            "store": "boolean",
-            "reason": "string",
-            "actions": [
-                {
-                    "op": "add|update",
-                    "memory_id": "string (required if op=update)",
-                    "category": "one of allowed_categories",
-                    "text": "canonical memory text",
-                }
-            ],
-        },
-        "rules": [
-            "Return ONLY valid JSON. No markdown, no code fences.",
-            "If nothing durable, return store=false and actions=[]",
-            "Use op=update only if an existing memory already expresses the same fact (choose the best matching id).",
-            "If you update, output the full corrected canonical memory text.",
-            "Keep text short (<= 100 chars) and avoid sensitive details.",
+        "preferred_memory_types": _PREFERRED_MEMORY_TYPES,
+        "existing_memories": _compact_memories(existing_memories),
+        "output_schema": _DECISION_SCHEMA,
+        "rules": _RULES,
+    }
+    return _request(user, model)
+
+
+def _build_batch_request(items: list[GatekeeperItem], model: str) -> dict:
+    user = {
+        "items": [
+            {
+                "index": i,
+                "user_text": item.user_text,
+                "existing_memories": _compact_memories(item.existing_memories),
+            }
+            for i, item in enumerate(items)
         ],
+        "preferred_memory_types": _PREFERRED_MEMORY_TYPES,
+        "output_schema": {"results": [{"index": "integer", **_DECISION_SCHEMA}]},
+        "rules": _BATCH_RULES,
     }
+    return _request(user, model)
+
 
-    client = genai.Client(api_key=api_key)
-    response = client.models.generate_content(
-        model=model,
-        contents=[
-            {"role": "system", "parts": [{"text": system}]},
+def _request(user: dict, model: str) -> dict:
+    return {
+        "model": model,
+        "contents": [
+            {"role": "system", "parts": [{"text": _SYSTEM_PROMPT}]},
             {"role": "user", "parts": [{"text": json.dumps(user, ensure_ascii=False)}]},
         ],
-        config={
+        "config": {
             "temperature": 0.2,
             "response_mime_type": "application/json",
         },
-    )
+    }
+
+
+def _compact_memories(existing_memories: list[dict]) -> list[dict]:
+    memories_compact: list[dict] = []
+    for m in existing_memories:
+        if not isinstance(m, dict):
+            continue
+        mid = m.get("id")
+        mem = m.get("memory")
+        md = m.get("metadata") if isinstance(m.get("metadata"), dict) else {}
+        cat = md.get("category")
+        if isinstance(mid, str) and isinstance(mem, str) and mem.strip():
+            memories_compact.append({"id": mid, "memory": mem.strip(), "category": cat})
+    return memories_compact
+
 
-    raw_text = _extract_text(response)
+def _parse_batch_result(raw_text: str, count: int) -> list[GatekeeperResult]:
     payload = _parse_json(raw_text)
+    entries = payload.get("results") if isinstance(payload, dict) else None
+    if not isinstance(entries, list):
+        return [GatekeeperResult(actions=(), reason="invalid_json", status="error")] * count
+
+    by_index: dict[int, dict] = {}
+    for entry in entries:
+        if isinstance(entry, dict) and isinstance(entry.get("index"), int):
+            by_index.setdefault(entry["index"], entry)
+
+    return [
+        _result_from_payload(by_index[i])
+        if i in by_index
+        else GatekeeperResult(actions=(), reason="missing_batch_result", status="error")
+        for i in range(count)
+    ]
+
+
+def _parse_result(raw_text: str) -> GatekeeperResult:
+    return _result_from_payload(_parse_json(raw_text))
+
 
+def _result_from_payload(payload) -> GatekeeperResult:
     if not isinstance(payload, dict):
         return GatekeeperResult(actions=(), reason="invalid_json", status="error")
 
@@ -141,7 +561,7 @@ def run_llm_gatekeeper(
             continue
         if not isinstance(text, str) or not text.strip():
             continue
-        if not isinstance(category, str) or category not in categories:
+        if not isinstance(category, str) or category not in _CATEGORIES:
             continue
         if op == "update" and not (isinstance(memory_id, str) and memory_id.strip()):
             continue
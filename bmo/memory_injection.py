@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from livekit.agents.llm import ChatContext, ChatMessage
+
+from bmo.config import MEM0_INJECT_LIMIT, MEM0_INJECT_MODE, logger
+
+MEMORY_BLOCK_ID = "bmo-mem0-memories"
+_EXTRA_KEY = "mem0_memories"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token); no tokenizer ships with the agent."""
+    return (len(text) + 3) // 4 if text else 0
+
+
+@dataclass
+class InjectionStats:
+    turns: int = 0
+    injected: int = 0
+    repeated: int = 0
+    memory_tokens: int = 0
+    last_saved_tokens: int = 0
+    saved_tokens: int = 0
+
+
+class MemoryInjector:
+    """Injects only Mem0 memories that are not already in the session's chat context.
+
+    Injected ids and texts are stored in each message's ``extra``, so the history itself
+    is the record of what the model has seen; trimming old messages makes their
+    memories eligible again. ROLLING (the default) keeps a single block of at most
+    ``max_block`` memories that is replaced in place. APPEND adds one message per turn
+    with only the new memories, so every injected memory stays in the prompt.
+
+    ``tokens_saved`` compares against injecting only this turn's hits into the turn
+    context, and counts every memory token persisted in the history as the cost.
+    """
+
+    def __init__(self, *, mode: str = MEM0_INJECT_MODE, max_block: int = MEM0_INJECT_LIMIT, title: str = "Mem0 Memories") -> None:
+        self.mode = mode
+        self.max_block = max(max_block, 1)
+        self.title = title
+        self.stats = InjectionStats()
+
+    def build(self, history: ChatContext, results: list[dict]) -> ChatMessage | None:
+        """Returns the message to apply for this turn, or None when nothing is new."""
+        hits = _memories(results)
+        known = known_memories(history)
+        fresh = {mid: text for mid, text in hits.items() if mid not in known}
+
+        previous = history.get_by_id(MEMORY_BLOCK_ID) if self.mode == "ROLLING" else None
+        if self.mode == "ROLLING":
+            current = dict(previous.extra.get(_EXTRA_KEY, {})) if previous is not None else {}
+            current.update(fresh)
+            block = dict(list(current.items())[-self.max_block:])
+            message = self._message(block, id=MEMORY_BLOCK_ID) if fresh else None
+        else:
+            message = self._message(fresh) if fresh else None
+
+        baseline = estimate_tokens(self._render(hits)) if hits else 0
+        persisted = memory_tokens(history)
+        if message is not None:
+            persisted += estimate_tokens(message.text_content or "")
+            if previous is not None:
+                persisted -= estimate_tokens(previous.text_content or "")
+
+        s = self.stats
+        s.turns += 1
+        s.injected += len(fresh)
+        s.repeated += len(hits) - len(fresh)
+        s.memory_tokens = persisted
+        s.last_saved_tokens = baseline - persisted
+        s.saved_tokens += s.last_saved_tokens
+        if hits:
+            logger.info(
+                f"Mem0 injection: new={len(fresh)} repeated={len(hits) - len(fresh)} memory_tokens={persisted} "
+                f"tokens_saved={s.last_saved_tokens} total_tokens_saved={s.saved_tokens}"
+            )
+        return message
+
+    def _message(self, memories: dict[str, str], **kwargs) -> ChatMessage:
+        return ChatMessage(role="system", content=[self._render(memories)], extra={_EXTRA_KEY: memories}, **kwargs)
+
+    def _render(self, memories: dict[str, str]) -> str:
+        return f"{self.title}:\n" + "\n".join(f"- {text}" for text in memories.values())
+
+
+def apply_memory_message(chat_ctx: ChatContext, message: ChatMessage) -> None:
+    """Replaces the rolling block in place, otherwise appends the message."""
+    index = chat_ctx.index_by_id(message.id)
+    if index is None:
+        chat_ctx.items.append(message)
+    else:
+        chat_ctx.items[index] = message
+
+
+def known_memories(history: ChatContext) -> dict[str, str]:
+    known: dict[str, str] = {}
+    for item in history.items:
+        if item.type == "message" and isinstance(item.extra, dict):
+            memories = item.extra.get(_EXTRA_KEY)
+            if isinstance(memories, dict):
+                known.update(memories)
+    return known
+
+
+def memory_tokens(history: ChatContext) -> int:
+    """Estimated tokens of every memory message persisted in ``history``."""
+    return sum(
+        estimate_tokens(item.text_content or "")
+        for item in history.items
+        if item.type == "message" and isinstance(item.extra, dict) and _EXTRA_KEY in item.extra
+    )
+
+
+def _memories(results: list[dict]) -> dict[str, str]:
+    out: dict[str, str] = {}
+    for result in results or ():
+        if not isinstance(result, dict):
+            continue
+        text = result.get("memory") or result.get("text")
+        if not isinstance(text, str) or not text.strip():
+            continue
+        mid = result.get("id")
+        out[mid if isinstance(mid, str) and mid else text.strip()] = text.strip()
+    return out
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import numpy as np
+from qdrant_client.models import FieldCondition, Filter, MatchValue
+
+from bmo.config import (
+    MEM0_LOCAL_MIRROR,
+    MEM0_MIRROR_RECONCILE_SECONDS,
+    MEM0_USER_ID,
+    logger,
+    mem0_client,
+)
+
+_SCROLL_PAGE_SIZE = 256
+_CORE_PAYLOAD_KEYS = {"data", "hash", "created_at", "updated_at", "user_id", "agent_id", "run_id", "actor_id", "role"}
+
+
+class MemoryMirror:
+    """In-process copy of the user's Mem0 vectors for local top-k recall.
+
+    Rows are L2-normalized so a single matrix-vector product gives cosine scores,
+    matching the Qdrant collection Mem0 creates. The agent keeps the mirror in sync
+    after its own writes; ``maybe_reconcile`` reloads it from Qdrant in the background
+    to pick up edits made elsewhere (memory API, backfill).
+    """
+
+    def __init__(self, *, user_id: str = MEM0_USER_ID, reconcile_seconds: float = MEM0_MIRROR_RECONCILE_SECONDS) -> None:
+        self.user_id = user_id
+        self.reconcile_seconds = reconcile_seconds
+        self._lock = threading.Lock()
+        self._reloading = False
+        self._ids: list[str] = []
+        self._rows: list[dict] = []
+        self._matrix = None
+        self._loaded_at: float | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self._loaded_at is not None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def load(self) -> None:
+        store = _vector_store()
+        ids: list[str] = []
+        rows: list[dict] = []
+        vectors: list[list[float]] = []
+
+        offset = None
+        while True:
+            points, offset = store.client.scroll(
+                collection_name=store.collection_name,
+                scroll_filter=Filter(must=[FieldCondition(key="user_id", match=MatchValue(value=self.user_id))]),
+                limit=_SCROLL_PAGE_SIZE,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+            )
+            for point in points:
+                row = _point_to_row(point)
+                if row is None or point.vector is None:
+                    continue
+                ids.append(row["id"])
+                rows.append(row)
+                vectors.append(point.vector)
+            if offset is None:
+                break
+
+        matrix = _normalized(np.asarray(vectors, dtype=np.float32)) if vectors else None
+        with self._lock:
+            self._ids, self._rows, self._matrix = ids, rows, matrix
+            self._loaded_at = time.monotonic()
+        logger.info(f"Mem0 mirror loaded {len(ids)} memories")
+
+    def search(self, query_vector: list[float], limit: int) -> list[dict]:
+        with self._lock:
+            matrix, rows = self._matrix, self._rows
+        if matrix is None or not rows:
+            return []
+
+        query = _normalized(np.asarray(query_vector, dtype=np.float32))
+        scores = matrix @ query
+        k = min(limit, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [{**rows[i], "score": float(scores[i])} for i in top]
+
+    def apply_write_result(self, result: object) -> None:
+        """Syncs ids touched by a ``mem0_client.add`` call (events ADD/UPDATE/DELETE)."""
+        entries = result.get("results", []) if isinstance(result, dict) else result
+        if not isinstance(entries, list):
+            return
+        changed: list[str] = []
+        removed: list[str] = []
+        for entry in entries:
+            if not isinstance(entry, dict) or not isinstance(entry.get("id"), str):
+                continue
+            if entry.get("event") == "DELETE":
+                removed.append(entry["id"])
+            else:
+                changed.append(entry["id"])
+        if removed:
+            self.remove(removed)
+        if changed:
+            self.refresh(changed)
+
+    def refresh(self, memory_ids: list[str]) -> None:
+        if not self.ready or not memory_ids:
+            return
+        store = _vector_store()
+        points = store.client.retrieve(
+            collection_name=store.collection_name,
+            ids=memory_ids,
+            with_payload=True,
+            with_vectors=True,
+        )
+        fresh = {}
+        for point in points:
+            row = _point_to_row(point)
+            if row is not None and point.vector is not None and row.get("user_id", self.user_id) == self.user_id:
+                fresh[row["id"]] = (row, point.vector)
+
+        with self._lock:
+            ids, rows = list(self._ids), list(self._rows)
+            matrix = self._matrix.copy() if self._matrix is not None else None
+            index = {mid: i for i, mid in enumerate(ids)}
+            appended: list[list[float]] = []
+            for mid, (row, vector) in fresh.items():
+                vec = _normalized(np.asarray(vector, dtype=np.float32))
+                if mid in index:
+                    rows[index[mid]] = row
+                    matrix[index[mid]] = vec
+                else:
+                    ids.append(mid)
+                    rows.append(row)
+                    appended.append(vec)
+            if appended:
+                block = np.vstack(appended)
+                matrix = block if matrix is None else np.vstack([matrix, block])
+            self._ids, self._rows, self._matrix = ids, rows, matrix
+
+    def remove(self, memory_ids: list[str]) -> None:
+        drop = set(memory_ids)
+        with self._lock:
+            keep = [i for i, mid in enumerate(self._ids) if mid not in drop]
+            if len(keep) == len(self._ids):
+                return
+            self._ids = [self._ids[i] for i in keep]
+            self._rows = [self._rows[i] for i in keep]
+            self._matrix = self._matrix[keep] if keep and self._matrix is not None else None
+
+    def maybe_reconcile(self) -> None:
+        if not self.ready or self._reloading:
+            return
+        if time.monotonic() - self._loaded_at < self.reconcile_seconds:
+            return
+        self._reloading = True
+
+        def _reload():
+            try:
+                self.load()
+            except Exception as e:
+                logger.warning(f"Mem0 mirror reconcile failed: {e}")
+                self._loaded_at = time.monotonic()
+            finally:
+                self._reloading = False
+
+        threading.Thread(target=_reload, daemon=True).start()
+
+
+memory_mirror = MemoryMirror()
+
+
+def load_memory_mirror() -> None:
+    if not MEM0_LOCAL_MIRROR or mem0_client is None:
+        return
+    try:
+        memory_mirror.load()
+    except Exception as e:
+        logger.warning(f"Failed to load Mem0 mirror, using Qdrant only: {e}")
+
+
+def sync_mirror(*, add_result: object = None, updated: tuple[str, ...] = (), deleted: tuple[str, ...] = ()) -> None:
+    """Applies one agent write to the mirror; failures only cost freshness until the next reconcile."""
+    if not memory_mirror.ready:
+        return
+    try:
+        if add_result is not None:
+            memory_mirror.apply_write_result(add_result)
+        if updated:
+            memory_mirror.refresh(list(updated))
+        if deleted:
+            memory_mirror.remove(list(deleted))
+    except Exception as e:
+        logger.warning(f"Failed to sync Mem0 mirror: {e}")
+
+
+def _vector_store():
+    return mem0_client.vector_store
+
+
+def _normalized(vectors):
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _point_to_row(point) -> dict | None:
+    payload = point.payload if isinstance(point.payload, dict) else {}
+    text = payload.get("data")
+    if not isinstance(text, str) or not text:
+        return None
+    row = {
+        "id": str(point.id),
+        "memory": text,
+        "hash": payload.get("hash"),
+        "created_at": payload.get("created_at"),
+        "updated_at": payload.get("updated_at"),
+    }
+    for key in ("user_id", "agent_id", "run_id", "actor_id", "role"):
+        if key in payload:
+            row[key] = payload[key]
+    metadata = {k: v for k, v in payload.items() if k not in _CORE_PAYLOAD_KEYS}
+    if metadata:
+        row["metadata"] = metadata
+    return row
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
 import re
+from bisect import bisect_right
+from collections.abc import Callable
 from dataclasses import dataclass
+from difflib import SequenceMatcher
+from functools import lru_cache
 from enum import StrEnum
+from typing import Literal
 
 
 class MemoryCategory(StrEnum):
@@ -36,6 +41,46 @@ class MemoryDecision:
         return bool(self.items)
 
 
+@dataclass(frozen=True)
+class PrefilterDecision:
+    verdict: Literal["skip", "store", "uncertain"]
+    reason: str
+    items: tuple[MemoryItem, ...] = ()
+
+
+SKIP_EXAMPLES: tuple[str, ...] = (
+    "I'm pooping.",
+    "Pick a random cassette.",
+    "I'm hungry right now.",
+    "Turn the volume up.",
+)
+
+DEFAULT_SKIP_LEXICON: tuple[str, ...] = (
+    *SKIP_EXAMPLES,
+    "I'm tired.",
+    "I'm bored.",
+    "I'm back.",
+    "Good morning.",
+    "Good night.",
+    "Thank you.",
+    "Never mind.",
+)
+
+# Prefixes are matched on whole leading tokens, so "Stopping coffee..." is not "stop"
+# and "However, ..." is not "how".
+_COMMAND_WORDS = frozenset({"turn", "pick", "play", "stop", "pause", "skip", "open", "show", "search", "set", "send", "read"})
+_COMMAND_PHRASES = frozenset({"look up", "tell me", "can you", "could you", "please"})
+_QUESTION_WORDS = frozenset({
+    "what", "who", "when", "where", "why", "how", "is", "are", "do", "does", "did",
+    "can", "could", "will", "would", "should", "what's", "who's", "where's", "how's",
+})
+_FIRST_PERSON_WORDS = frozenset({"i", "i'm", "i’m", "im", "i've", "i'd", "i'll", "my"})
+
+_PREFILTER_MAX_STORE_WORDS = 16
+_SINGLE_VALUED_SLOTS: tuple[str, ...] = ("Favorite ", "Name is ", "Lives in ", "From ", "Works as ", "Has a ")
+_COLLISION_SIMILARITY = 0.8
+
+
 _RELATIONSHIP_PATTERNS: tuple[re.Pattern[str], ...] = (
     re.compile(
         r"\bmy\s+(brother|sister|mom|mother|dad|father|partner|wife|husband|girlfriend|boyfriend)\s+(?:is\s+named|is\s+called|is|named|called)\s+([A-Za-z][A-Za-z0-9_\-']{1,40})\b",
@@ -122,6 +167,91 @@ def should_run_retrieval(message: str) -> bool:
     return False
 
 
+def prefilter_memory_turn(message: str, *, skip_lexicon: tuple[str, ...] = DEFAULT_SKIP_LEXICON) -> PrefilterDecision:
+    """Cheap local tier in front of the LLM gatekeeper.
+
+    Short single-sentence statements the extractors fully understand are stored
+    directly, obvious chatter, commands and questions are skipped, and everything else
+    (including short turns and first-person statements) is left for the LLM.
+    """
+    text = _normalize(message)
+    if not text:
+        return PrefilterDecision(verdict="skip", reason="empty")
+
+    bare = _strip_trailing_punct(text)
+    words = bare.split()
+
+    decision = gatekeep_durable_memories(message)
+    if decision.should_store:
+        single_sentence = len(re.findall(r"[.!?]+", bare)) == 0
+        if single_sentence and "?" not in text and len(words) <= _PREFILTER_MAX_STORE_WORDS:
+            return PrefilterDecision(verdict="store", reason="durable_match", items=decision.items)
+        return PrefilterDecision(verdict="uncertain", reason="partial_durable_match")
+
+    if bare in _lexicon_set(skip_lexicon):
+        return PrefilterDecision(verdict="skip", reason="skip_lexicon")
+
+    tokens = [w.strip(",;:!?.\"") for w in words]
+    if "?" not in text and _FIRST_PERSON_WORDS.intersection(tokens):
+        return PrefilterDecision(verdict="uncertain", reason="first_person")
+    if tokens[0] in _COMMAND_WORDS or " ".join(tokens[:2]) in _COMMAND_PHRASES or tokens[0] in _COMMAND_PHRASES:
+        return PrefilterDecision(verdict="skip", reason="command")
+    if text.endswith("?") or tokens[0] in _QUESTION_WORDS:
+        return PrefilterDecision(verdict="skip", reason="question")
+
+    return PrefilterDecision(verdict="uncertain", reason="no_local_rule")
+
+
+def texts_similar(a: str, b: str, threshold: float) -> bool:
+    """Case/punctuation-insensitive near-duplicate check shared by retrieval reuse and dedup."""
+    na, nb = normalize_text(a), normalize_text(b)
+    if not na or not nb:
+        return False
+    return na == nb or SequenceMatcher(None, na, nb).ratio() >= threshold
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s']", " ", (text or "").lower()).split())
+
+
+def memory_collides(item: MemoryItem, existing: list[dict]) -> bool:
+    """True when an existing memory in the same category may need updating rather than a new add.
+
+    Single-valued slots ("Favorite color: ...", "Name is ...") collide on the slot;
+    everything else collides on near-duplicate text.
+    """
+    slot = _memory_slot(item.text)
+    for m in existing:
+        if not isinstance(m, dict) or not isinstance(m.get("memory"), str):
+            continue
+        md = m.get("metadata") if isinstance(m.get("metadata"), dict) else {}
+        if md.get("category") not in (None, item.category.value):
+            continue
+        if slot is not None:
+            if _memory_slot(m["memory"]) == slot:
+                return True
+        elif texts_similar(m["memory"], item.text, _COLLISION_SIMILARITY):
+            return True
+    return False
+
+
+def _memory_slot(text: str) -> str | None:
+    value = (text or "").strip()
+    for prefix in _SINGLE_VALUED_SLOTS:
+        if value.startswith(prefix):
+            if prefix == "Favorite ":
+                return value.split(":", 1)[0].casefold()
+            if prefix == "Has a ":
+                return value.split(" named ", 1)[0].casefold()
+            return prefix.casefold()
+    return None
+
+
+@lru_cache(maxsize=8)
+def _lexicon_set(skip_lexicon: tuple[str, ...]) -> frozenset[str]:
+    return frozenset(_strip_trailing_punct(_normalize(p)) for p in skip_lexicon)
+
+
 def gatekeep_durable_memories(message: str) -> MemoryDecision:
     original = (message or "").strip()
     if not original:
@@ -130,15 +260,24 @@ def gatekeep_durable_memories(message: str) -> MemoryDecision:
     items: list[MemoryItem] = []
 
     text = _strip_trailing_punct(original)
-    chunks = [c.strip() for c in re.split(r"[.!?]+", text) if c.strip()]
+    chunks = []
+    for m in _CHUNK_RE.finditer(text):
+        raw = m.group()
+        chunk = raw.strip()
+        if chunk:
+            chunks.append((m.start() + len(raw) - len(raw.lstrip()), chunk))
     if not chunks:
-        chunks = [text]
-
-    for chunk in chunks:
-        items.extend(_extract_relationships(chunk))
-        items.extend(_extract_preferences(chunk))
-        items.extend(_extract_goals(chunk))
-        items.extend(_extract_personal_facts(chunk))
+        chunks = [(0, text)]
+
+    triggered = _triggered_rules(text, [start for start, _ in chunks])
+    for (_, chunk), rules in zip(chunks, triggered):
+        for index in sorted(rules):
+            pattern, canonicalize = _RULES[index]
+            match = _first_match(pattern, chunk, rules[index])
+            if match:
+                item = canonicalize(match)
+                if item is not None:
+                    items.append(item)
 
     deduped = _dedupe(items)
     if not deduped:
@@ -147,101 +286,135 @@ def gatekeep_durable_memories(message: str) -> MemoryDecision:
     return MemoryDecision(items=tuple(deduped), reason="durable_match")
 
 
-def _extract_relationships(text: str) -> list[MemoryItem]:
-    out: list[MemoryItem] = []
-    for pattern in _RELATIONSHIP_PATTERNS:
-        match = pattern.search(text)
-        if not match:
-            continue
+def _triggered_rules(text: str, chunk_starts: list[int]) -> list[dict[int, list[int]]]:
+    """One scan over the whole message for every rule's literal prefix.
 
-        relation = match.group(1).lower()
-        name = _titlecase_name(match.group(2))
-        if relation in {"mom", "mother"}:
-            out.append(MemoryItem(text=f"Has a mother named {name}.", category=MemoryCategory.RELATIONSHIPS))
-        elif relation in {"dad", "father"}:
-            out.append(MemoryItem(text=f"Has a father named {name}.", category=MemoryCategory.RELATIONSHIPS))
-        else:
-            out.append(MemoryItem(text=f"Has a {relation} named {name}.", category=MemoryCategory.RELATIONSHIPS))
+    Returns, per chunk, the chunk-relative positions where each rule's prefix occurs. The
+    anchors are zero-width, so overlapping prefixes ("my favorite" / "favorite") are all
+    reported.
+    """
+    triggered: list[dict[int, list[int]]] = [{} for _ in chunk_starts]
+    for match in _ANCHOR_RE.finditer(text):
+        chunk = bisect_right(chunk_starts, match.start()) - 1
+        if chunk >= 0:
+            offset = match.start() - chunk_starts[chunk]
+            for rule in _ANCHOR_RULES[match.lastgroup]:
+                triggered[chunk].setdefault(rule, []).append(offset)
+    return triggered
 
-    return out
 
+def _first_match(pattern: re.Pattern[str], chunk: str, positions: list[int]) -> re.Match[str] | None:
+    """Same result as ``pattern.search(chunk)``, trying only where the rule's prefix occurs.
 
-def _extract_preferences(text: str) -> list[MemoryItem]:
-    out: list[MemoryItem] = []
-    for pattern in _PREFERENCE_PATTERNS:
-        match = pattern.search(text)
-        if not match:
-            continue
+    A rule can only match where its anchor does, so anchored ``match`` calls in position
+    order find the leftmost match without rescanning the chunk.
+    """
+    for pos in positions:
+        match = pattern.match(chunk, pos)
+        if match:
+            return match
+    return None
 
-        if pattern is _PREF_MY_FAVORITE or pattern is _PREF_FAVORITE:
-            thing = _compact(match.group(1))
-            value = _compact(match.group(2))
-            if thing and value:
-                out.append(
-                    MemoryItem(
-                        text=f"Favorite {thing}: {value}.",
-                        category=MemoryCategory.PREFERENCES,
-                    )
-                )
-            continue
 
-        verb = match.group(1).lower() if match.lastindex and match.lastindex >= 2 else ""
-        tail = match.group(2) if match.lastindex and match.lastindex >= 2 else match.group(1)
-        tail = _compact(tail)
-        if not tail:
-            continue
+def _relationship_item(match: re.Match[str]) -> MemoryItem:
+    relation = match.group(1).lower()
+    name = _titlecase_name(match.group(2))
+    if relation in {"mom", "mother"}:
+        return MemoryItem(text=f"Has a mother named {name}.", category=MemoryCategory.RELATIONSHIPS)
+    if relation in {"dad", "father"}:
+        return MemoryItem(text=f"Has a father named {name}.", category=MemoryCategory.RELATIONSHIPS)
+    return MemoryItem(text=f"Has a {relation} named {name}.", category=MemoryCategory.RELATIONSHIPS)
 
-        if verb in {"hate", "dislike"}:
-            out.append(MemoryItem(text=f"Dislikes {tail}.", category=MemoryCategory.PREFERENCES))
-        elif verb in {"love", "like", "enjoy"}:
-            out.append(MemoryItem(text=f"Likes {tail}.", category=MemoryCategory.PREFERENCES))
-        else:
-            out.append(MemoryItem(text=f"Prefers {tail}.", category=MemoryCategory.PREFERENCES))
 
-    return out
+def _favorite_item(match: re.Match[str]) -> MemoryItem | None:
+    thing = _compact(match.group(1))
+    value = _compact(match.group(2))
+    if not (thing and value):
+        return None
+    return MemoryItem(text=f"Favorite {thing}: {value}.", category=MemoryCategory.PREFERENCES)
 
 
-def _extract_goals(text: str) -> list[MemoryItem]:
-    out: list[MemoryItem] = []
-    for pattern in _GOAL_PATTERNS:
-        match = pattern.search(text)
-        if not match:
-            continue
+def _preference_item(match: re.Match[str]) -> MemoryItem | None:
+    verb = match.group(1).lower() if match.lastindex and match.lastindex >= 2 else ""
+    tail = match.group(2) if match.lastindex and match.lastindex >= 2 else match.group(1)
+    tail = _compact(tail)
+    if not tail:
+        return None
 
-        goal = _compact(match.group(1))
-        if goal:
-            out.append(MemoryItem(text=f"Goal: {goal}.", category=MemoryCategory.GOALS))
-
-    return out
+    if verb in {"hate", "dislike"}:
+        return MemoryItem(text=f"Dislikes {tail}.", category=MemoryCategory.PREFERENCES)
+    if verb in {"love", "like", "enjoy"}:
+        return MemoryItem(text=f"Likes {tail}.", category=MemoryCategory.PREFERENCES)
+    return MemoryItem(text=f"Prefers {tail}.", category=MemoryCategory.PREFERENCES)
 
 
-def _extract_personal_facts(text: str) -> list[MemoryItem]:
-    out: list[MemoryItem] = []
+def _goal_item(match: re.Match[str]) -> MemoryItem | None:
+    goal = _compact(match.group(1))
+    if not goal:
+        return None
+    return MemoryItem(text=f"Goal: {goal}.", category=MemoryCategory.GOALS)
 
-    name_pattern, live_pattern, from_pattern, work_pattern = _PERSONAL_FACT_PATTERNS
 
-    for pattern in _PERSONAL_FACT_PATTERNS:
-        match = pattern.search(text)
-        if not match:
-            continue
+def _name_item(match: re.Match[str]) -> MemoryItem:
+    return MemoryItem(text=f"Name is {_titlecase_name(match.group(1))}.", category=MemoryCategory.PERSONAL_FACTS)
 
-        if pattern is name_pattern:
-            name = _titlecase_name(match.group(1))
-            out.append(MemoryItem(text=f"Name is {name}.", category=MemoryCategory.PERSONAL_FACTS))
-            continue
 
+def _fact_item(template: str) -> Callable[[re.Match[str]], MemoryItem | None]:
+    def canonicalize(match: re.Match[str]) -> MemoryItem | None:
         fact = _compact(match.group(1))
         if not fact:
-            continue
+            return None
+        return MemoryItem(text=template.format(fact), category=MemoryCategory.PERSONAL_FACTS)
+
+    return canonicalize
+
+
+_NAME_PATTERN, _LIVE_PATTERN, _FROM_PATTERN, _WORK_PATTERN = _PERSONAL_FACT_PATTERNS
+
+# Rule order is output order: relationships, preferences, goals, personal facts.
+_RULES: tuple[tuple[re.Pattern[str], Callable[[re.Match[str]], MemoryItem | None]], ...] = (
+    *((p, _relationship_item) for p in _RELATIONSHIP_PATTERNS),
+    (_PREF_LIKE, _preference_item),
+    (_PREF_HATE, _preference_item),
+    (_PREF_PREFER, _preference_item),
+    (_PREF_MY_FAVORITE, _favorite_item),
+    (_PREF_FAVORITE, _favorite_item),
+    *((p, _goal_item) for p in _GOAL_PATTERNS),
+    (_NAME_PATTERN, _name_item),
+    (_LIVE_PATTERN, _fact_item("Lives in {}.")),
+    (_FROM_PATTERN, _fact_item("From {}.")),
+    (_WORK_PATTERN, _fact_item("Works as {}.")),
+)
 
-        if pattern is live_pattern:
-            out.append(MemoryItem(text=f"Lives in {fact}.", category=MemoryCategory.PERSONAL_FACTS))
-        elif pattern is from_pattern:
-            out.append(MemoryItem(text=f"From {fact}.", category=MemoryCategory.PERSONAL_FACTS))
-        else:
-            out.append(MemoryItem(text=f"Works as {fact}.", category=MemoryCategory.PERSONAL_FACTS))
+_RELATIONS = r"(?:brother|sister|mom|mother|dad|father|partner|wife|husband|girlfriend|boyfriend)"
+
+# Each anchor is the literal prefix of the rules it maps to, so a rule can only match
+# in a chunk where its anchor occurs. Every anchor starts with i/m/f/r; the leading
+# class lets the scan reject most positions before trying the alternation.
+_ANCHORS: tuple[tuple[str, str, tuple[int, ...]], ...] = (
+    ("rel_my", rf"my\s+{_RELATIONS}", (0, 2)),
+    ("rel_have", rf"I\s+have\s+(?:a|an)\s+{_RELATIONS}", (1,)),
+    ("like", r"I\s+(?:love|like|enjoy)", (3,)),
+    ("hate", r"I\s+(?:hate|dislike)", (4,)),
+    ("prefer", r"I\s+prefer", (5,)),
+    ("my_favorite", r"my\s+favorite", (6,)),
+    ("favorite", r"favorite", (7,)),
+    ("my_goal", r"my\s+goal\s+is", (8,)),
+    ("want", r"I\s+want\s+to", (9,)),
+    ("trying", r"I\s+am\s+trying\s+to", (10,)),
+    ("remember", r"remember\s+to", (11,)),
+    ("name", r"my\s+name\s+is", (12,)),
+    ("live", r"I\s+live\s+in", (13,)),
+    ("from", r"I\s+am\s+from", (14,)),
+    ("work", r"I\s+work\s+as", (15,)),
+)
 
-    return out
+_ANCHOR_RE = re.compile(
+    r"\b(?=[imfr])(?=" + "|".join(f"(?P<{name}>{regex})" for name, regex, _ in _ANCHORS) + ")",
+    re.IGNORECASE,
+)
+_ANCHOR_RULES: dict[str, tuple[int, ...]] = {name: rules for name, _, rules in _ANCHORS}
+_CHUNK_RE = re.compile(r"[^.!?]+")
 
 
 def _dedupe(items: list[MemoryItem]) -> list[MemoryItem]:
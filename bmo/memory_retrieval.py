@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from bmo.config import (
+    MEM0_GATEKEEPER_LIMIT,
+    MEM0_INJECT_DEADLINE,
+    MEM0_INJECT_LIMIT,
+    MEM0_PREFETCH_SIMILARITY,
+    MEM0_RETRIEVAL_CACHE_TTL,
+    MEM0_RETRIEVAL_MODE,
+    MEM0_USER_ID,
+    logger,
+    mem0_client,
+)
+from bmo.memory_mirror import memory_mirror
+from bmo.memory_policy import normalize_text, should_run_retrieval, texts_similar
+
+_PREFETCH_MIN_CHARS = 8
+_RETRIEVAL_CACHE_SIZE = 64
+_PREFETCH_MAX_PER_TURN = 2
+
+
+@dataclass(frozen=True)
+class TurnRetrieval:
+    """One Mem0 search per user turn, shared by memory injection and the gated write path."""
+
+    user_text: str
+    results: tuple[dict, ...]
+
+    def for_injection(self) -> list[dict]:
+        return list(self.results[:MEM0_INJECT_LIMIT])
+
+    def for_gatekeeper(self) -> list[dict]:
+        return list(self.results[:MEM0_GATEKEEPER_LIMIT])
+
+
+def retrieve_turn_memories(user_text: str) -> TurnRetrieval:
+    """Embed and search once with the larger of the two limits.
+
+    Mem0 returns hits ranked by score, so the first N results of the larger query
+    are the same as a separate query with limit=N.
+    """
+    if mem0_client is None:
+        return TurnRetrieval(user_text=user_text, results=())
+
+    limit = max(MEM0_INJECT_LIMIT, MEM0_GATEKEEPER_LIMIT)
+    if memory_mirror.ready:
+        try:
+            query_vector = mem0_client.embedding_model.embed(user_text, "search")
+            results = memory_mirror.search(query_vector, limit)
+            memory_mirror.maybe_reconcile()
+            return TurnRetrieval(user_text=user_text, results=tuple(results))
+        except Exception as e:
+            logger.warning(f"Mem0 mirror search failed, falling back to Qdrant: {e}")
+
+    raw = mem0_client.search(user_text, user_id=MEM0_USER_ID, limit=limit)
+    return TurnRetrieval(user_text=user_text, results=tuple(results_list(raw)))
+
+
+def results_list(raw: object) -> list[dict]:
+    results = raw.get("results", []) if isinstance(raw, dict) else raw
+    if not isinstance(results, list):
+        return []
+    return [r for r in results if isinstance(r, dict)]
+
+
+@dataclass
+class PrefetchStats:
+    hits: int = 0
+    misses: int = 0
+    timeouts: int = 0
+    skipped: int = 0
+    cached: int = 0
+    avg_latency: float = 0.0
+
+    @property
+    def saved_seconds(self) -> float:
+        return (self.skipped + self.cached) * self.avg_latency
+
+
+class RetrievalPrefetcher:
+    """Starts Mem0 retrieval from interim transcripts while the user is still talking.
+
+    The final turn reuses the in-flight search when its text is close enough to the
+    transcript the search was started from, and injection gives up after ``deadline``
+    seconds so a slow embedder or Qdrant never delays the LLM. At most one prefetch runs
+    at a time: transcripts that drift while it is in flight are coalesced into a single
+    follow-up once it finishes, and a turn starts at most ``_PREFETCH_MAX_PER_TURN``.
+
+    ``mode`` gates retrieval: ALWAYS searches every turn, HEURISTIC only searches when
+    ``should_run_retrieval`` says the turn needs long-term memory, and HEURISTIC_CACHED
+    additionally reuses results for repeated queries within ``cache_ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        *,
+        mode: str = MEM0_RETRIEVAL_MODE,
+        deadline: float = MEM0_INJECT_DEADLINE,
+        similarity: float = MEM0_PREFETCH_SIMILARITY,
+        cache_ttl: float = MEM0_RETRIEVAL_CACHE_TTL,
+    ) -> None:
+        self.mode = mode
+        self.deadline = deadline
+        self.similarity = similarity
+        self.cache_ttl = cache_ttl
+        self.stats = PrefetchStats()
+        self._final_parts: list[str] = []
+        self._pending_text = ""
+        self._pending: asyncio.Future[TurnRetrieval] | None = None
+        self._latest_text = ""
+        self._turn_prefetches = 0
+        self._cache: OrderedDict[str, tuple[float, TurnRetrieval]] = OrderedDict()
+
+    def should_retrieve(self, text: str) -> bool:
+        if self.mode == "ALWAYS":
+            return bool(text.strip())
+        return should_run_retrieval(text)
+
+    def on_transcript(self, transcript: str, *, is_final: bool) -> None:
+        segment = (transcript or "").strip()
+        if not segment:
+            return
+
+        text = " ".join([*self._final_parts, segment])
+        if is_final:
+            self._final_parts.append(segment)
+
+        if len(text) < _PREFETCH_MIN_CHARS or not self.should_retrieve(text):
+            return
+        if self._pending is not None and self._matches(self._pending_text, text):
+            self._latest_text = ""
+            return
+        if self._pending is not None and not self._pending.done():
+            self._latest_text = text
+            return
+        self._prefetch(text)
+
+    def take(self, final_text: str) -> asyncio.Future[TurnRetrieval] | None:
+        """Returns the retrieval for the completed turn, or None when the gate skips it."""
+        pending, pending_text = self._pending, self._pending_text
+        self._final_parts = []
+        self._pending = None
+        self._pending_text = ""
+        self._latest_text = ""
+        self._turn_prefetches = 0
+
+        if not self.should_retrieve(final_text):
+            self.stats.skipped += 1
+            return None
+
+        reusable = pending is not None and not (pending.done() and pending.exception() is not None)
+        if reusable and self._matches(pending_text, final_text):
+            self.stats.hits += 1
+            return pending
+
+        cached = self._cached(final_text)
+        if cached is not None:
+            self.stats.cached += 1
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(cached)
+            return future
+
+        self.stats.misses += 1
+        return self._start(final_text)
+
+    async def wait(self, task: asyncio.Future[TurnRetrieval]) -> TurnRetrieval | None:
+        """Waits up to the deadline; the task keeps running for other consumers on timeout."""
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout=self.deadline)
+        except asyncio.TimeoutError:
+            self.stats.timeouts += 1
+            return None
+
+    def invalidate(self) -> None:
+        """Drops cached results after the agent writes to Mem0."""
+        self._cache.clear()
+
+    def log_stats(self) -> None:
+        s = self.stats
+        logger.info(
+            f"Mem0 retrieval: mode={self.mode} hits={s.hits} misses={s.misses} timeouts={s.timeouts} "
+            f"skipped={s.skipped} cached={s.cached} saved~{s.saved_seconds:.2f}s"
+        )
+
+    def _prefetch(self, text: str) -> None:
+        if self._turn_prefetches >= _PREFETCH_MAX_PER_TURN:
+            return
+        self._turn_prefetches += 1
+        self._pending_text = text
+        self._latest_text = ""
+        self._pending = self._start(text)
+        self._pending.add_done_callback(self._prefetch_done)
+
+    def _prefetch_done(self, task: asyncio.Task[TurnRetrieval]) -> None:
+        if task is self._pending and self._latest_text:
+            self._prefetch(self._latest_text)
+
+    def _start(self, text: str) -> asyncio.Task[TurnRetrieval]:
+        task = asyncio.create_task(self._timed_retrieval(text))
+        task.add_done_callback(_log_retrieval_error)
+        return task
+
+    async def _timed_retrieval(self, text: str) -> TurnRetrieval:
+        started = time.monotonic()
+        retrieval = await asyncio.to_thread(retrieve_turn_memories, text)
+        elapsed = time.monotonic() - started
+        s = self.stats
+        s.avg_latency = elapsed if s.avg_latency == 0.0 else 0.8 * s.avg_latency + 0.2 * elapsed
+        if self.mode == "HEURISTIC_CACHED":
+            self._cache[normalize_text(text)] = (time.monotonic(), retrieval)
+            while len(self._cache) > _RETRIEVAL_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return retrieval
+
+    def _cached(self, text: str) -> TurnRetrieval | None:
+        if self.mode != "HEURISTIC_CACHED":
+            return None
+        key = normalize_text(text)
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        stored_at, retrieval = entry
+        if time.monotonic() - stored_at > self.cache_ttl:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return retrieval
+
+    def _matches(self, a: str, b: str) -> bool:
+        return texts_similar(a, b, self.similarity)
+
+
+def _log_retrieval_error(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Mem0 retrieval failed: {task.exception()}")
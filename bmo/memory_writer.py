@@ -0,0 +1,386 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from bmo.config import (
+    MEM0_PREFILTER_SAMPLE_RATE,
+    MEM0_SETTING,
+    MEM0_SKIP_LEXICON,
+    MEM0_USER_ID,
+    MEM0_WRITER_BATCH_WINDOW,
+    MEM0_WRITER_COALESCE_MAX,
+    MEM0_WRITER_QUEUE_SIZE,
+    MEM0_WRITER_WORKERS,
+    logger,
+    mem0_client,
+)
+from bmo.llm_gatekeeper import GatekeeperItem, GatekeeperResult, arun_llm_gatekeeper_batch
+from bmo.memory_mirror import sync_mirror
+from bmo.memory_policy import (
+    DEFAULT_SKIP_LEXICON,
+    PrefilterDecision,
+    gatekeep_durable_memories,
+    memory_collides,
+    prefilter_memory_turn,
+    texts_similar,
+)
+from bmo.memory_retrieval import TurnRetrieval, retrieve_turn_memories
+
+_DEDUP_SIMILARITY = 0.85
+
+
+@dataclass
+class WriteJob:
+    texts: list[str]
+    retrievals: list[asyncio.Future[TurnRetrieval]]
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class WriterStats:
+    submitted: int = 0
+    processed: int = 0
+    batches: int = 0
+    coalesced: int = 0
+    merged: int = 0
+    dropped: int = 0
+    last_lag: float = 0.0
+    max_lag: float = 0.0
+
+
+@dataclass
+class PrefilterStats:
+    skip: int = 0
+    store: int = 0
+    uncertain: int = 0
+    sampled: int = 0
+    agreed: int = 0
+
+    def record(self, decision: PrefilterDecision) -> None:
+        setattr(self, decision.verdict, getattr(self, decision.verdict) + 1)
+
+    @property
+    def agreement(self) -> float:
+        return self.agreed / self.sampled if self.sampled else 0.0
+
+
+class MemoryWriter:
+    """Bounded background queue for Mem0 persistence.
+
+    Each worker waits ``batch_window`` seconds for more turns, then drains up to
+    ``coalesce_max`` queued jobs and classifies them with a single batched gatekeeper
+    call. When the queue is full, a new utterance is merged into the newest queued job;
+    once that job holds ``coalesce_max`` utterances the oldest job is dropped.
+    Blocking Mem0 and Gemini calls run on a dedicated executor so they never compete
+    with the live turn for the default one.
+    """
+
+    def __init__(
+        self,
+        *,
+        mode: str = MEM0_SETTING,
+        queue_size: int = MEM0_WRITER_QUEUE_SIZE,
+        workers: int = MEM0_WRITER_WORKERS,
+        coalesce_max: int = MEM0_WRITER_COALESCE_MAX,
+        batch_window: float = MEM0_WRITER_BATCH_WINDOW,
+        skip_lexicon: tuple[str, ...] = DEFAULT_SKIP_LEXICON + MEM0_SKIP_LEXICON,
+        sample_rate: float = MEM0_PREFILTER_SAMPLE_RATE,
+        on_written: Callable[[], None] | None = None,
+    ) -> None:
+        self.mode = mode
+        self.queue_size = max(queue_size, 1)
+        self.workers = max(workers, 1)
+        self.coalesce_max = max(coalesce_max, 1)
+        self.batch_window = max(batch_window, 0.0)
+        self.skip_lexicon = skip_lexicon
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.stats = WriterStats()
+        self.prefilter = PrefilterStats()
+        self._on_written = on_written
+        self._jobs: deque[WriteJob] = deque()
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._active = 0
+        self._tasks: list[asyncio.Task] = []
+        self._executor: ThreadPoolExecutor | None = None
+        self._closing = False
+
+    @property
+    def depth(self) -> int:
+        return len(self._jobs)
+
+    def submit(self, user_text: str, retrieval: asyncio.Future[TurnRetrieval] | None) -> None:
+        if self._closing or mem0_client is None:
+            return
+        self._ensure_started()
+        self.stats.submitted += 1
+        retrievals = [retrieval] if retrieval is not None else []
+
+        if len(self._jobs) >= self.queue_size:
+            newest = self._jobs[-1]
+            if len(newest.texts) < self.coalesce_max:
+                newest.texts.append(user_text)
+                newest.retrievals.extend(retrievals)
+                self.stats.merged += 1
+                return
+            self._jobs.popleft()
+            self.stats.dropped += 1
+            logger.warning("Memory writer saturated, dropped oldest queued utterance batch")
+
+        self._jobs.append(WriteJob(texts=[user_text], retrievals=retrievals))
+        self._idle.clear()
+        self._wakeup.set()
+
+    async def aclose(self, timeout: float = 10.0) -> None:
+        """Stops accepting work, drains what is queued, then stops the workers."""
+        self._closing = True
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Memory writer shutdown timed out with {self.depth} queued jobs")
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def log_stats(self) -> None:
+        s = self.stats
+        logger.info(
+            f"Memory writer: depth={self.depth} submitted={s.submitted} processed={s.processed} "
+            f"batches={s.batches} coalesced={s.coalesced} merged={s.merged} dropped={s.dropped} "
+            f"lag={s.last_lag:.2f}s max_lag={s.max_lag:.2f}s"
+        )
+        p = self.prefilter
+        logger.info(
+            f"Memory prefilter: skip={p.skip} store={p.store} uncertain={p.uncertain} "
+            f"sampled={p.sampled} agreement={p.agreement:.2f}"
+        )
+
+    def _ensure_started(self) -> None:
+        if self._tasks:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="mem0-writer")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def _worker(self) -> None:
+        while True:
+            while not self._jobs:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            if self.batch_window > 0 and len(self._jobs) < self.coalesce_max:
+                await asyncio.sleep(self.batch_window)
+            if not self._jobs:
+                continue
+
+            batch = [self._jobs.popleft()]
+            while self._jobs and len(batch) < self.coalesce_max:
+                batch.append(self._jobs.popleft())
+
+            self._active += 1
+            try:
+                await self._process(batch)
+            except Exception as e:
+                logger.warning(f"Memory writer batch failed: {e}")
+            finally:
+                self._active -= 1
+                if not self._jobs and self._active == 0:
+                    self._idle.set()
+
+    async def _process(self, batch: list[WriteJob]) -> None:
+        lag = time.monotonic() - batch[0].enqueued_at
+        texts = [t for job in batch for t in job.texts]
+        s = self.stats
+        s.last_lag = lag
+        s.max_lag = max(s.max_lag, lag)
+        s.batches += 1
+        s.processed += len(texts)
+        s.coalesced += len(batch) - 1
+
+        if self.mode == "NORMAL":
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, store_normal, texts)
+        else:
+            await self._process_gated(batch)
+
+        if self._on_written is not None:
+            self._on_written()
+        self.log_stats()
+
+    async def _process_gated(self, batch: list[WriteJob]) -> None:
+        """Lets the local prefilter settle obvious turns; only uncertain ones reach the LLM.
+
+        Skipped turns never search Mem0. A ``sample_rate`` share of locally decided
+        turns is also sent to the gatekeeper as a shadow check, only to measure agreement.
+        """
+        texts = [join_utterances(job.texts) for job in batch]
+        decisions = [prefilter_memory_turn(text, skip_lexicon=self.skip_lexicon) for text in texts]
+        for decision in decisions:
+            self.prefilter.record(decision)
+
+        wanted = [i for i, d in enumerate(decisions) if d.verdict != "skip"]
+        found = await asyncio.gather(*(self._existing_memories(batch[i]) for i in wanted))
+        existing = dict(zip(wanted, found))
+
+        items = [(texts[i], existing[i], decisions[i]) for i in wanted]
+        shadows = [
+            (text, decision)
+            for text, decision in zip(texts, decisions)
+            if decision.verdict != "uncertain" and random.random() < self.sample_rate
+        ]
+        agreements = await store_gated_batch(items, shadows=shadows, executor=self._executor)
+        self.prefilter.sampled += len(agreements)
+        self.prefilter.agreed += sum(agreements)
+
+    async def _existing_memories(self, job: WriteJob) -> list[dict] | None:
+        try:
+            if job.retrievals:
+                found = [r.for_gatekeeper() for r in await asyncio.gather(*job.retrievals)]
+            else:
+                loop = asyncio.get_running_loop()
+                retrieval = await loop.run_in_executor(self._executor, retrieve_turn_memories, join_utterances(job.texts))
+                found = [retrieval.for_gatekeeper()]
+        except Exception:
+            return None
+
+        merged: dict[str, dict] = {}
+        for results in found:
+            for m in results:
+                mid = m.get("id")
+                if isinstance(mid, str) and mid not in merged:
+                    merged[mid] = m
+        return list(merged.values())
+
+
+def join_utterances(texts: list[str]) -> str:
+    """Joins utterances as sentences so the sentence-level heuristics still see each one."""
+    parts = [t.strip() for t in texts if t and t.strip()]
+    if len(parts) <= 1:
+        return "".join(parts)
+    return " ".join(p if p[-1] in ".!?" else f"{p}." for p in parts)
+
+
+def store_normal(texts: list[str]) -> None:
+    try:
+        result = mem0_client.add(
+            [{"role": "user", "content": t} for t in texts],
+            user_id=MEM0_USER_ID,
+        )
+        sync_mirror(add_result=result)
+    except Exception as e:
+        logger.warning(f"Failed to store user message in Mem0: {e}")
+
+
+def store_heuristic(user_text: str, existing_list: list[dict] | None = None) -> None:
+    decision = gatekeep_durable_memories(user_text)
+    if not decision.should_store:
+        return
+    known = [
+        m["memory"]
+        for m in existing_list or ()
+        if isinstance(m, dict) and isinstance(m.get("memory"), str)
+    ]
+    for item in decision.items:
+        if any(texts_similar(memory, item.text, _DEDUP_SIMILARITY) for memory in known):
+            continue
+        added = mem0_client.add(
+            [{"role": "user", "content": item.text}],
+            user_id=MEM0_USER_ID,
+            metadata={"category": item.category.value, "mode": "gated", "source": "heuristic"},
+            infer=False,
+        )
+        sync_mirror(add_result=added)
+
+
+def apply_gatekeeper_actions(result: GatekeeperResult, existing_list: list[dict]) -> None:
+    id_to_has_category: dict[str, bool] = {}
+    for m in existing_list:
+        mid = m.get("id")
+        md = m.get("metadata") if isinstance(m.get("metadata"), dict) else {}
+        has_cat = isinstance(md.get("category"), str)
+        if isinstance(mid, str):
+            id_to_has_category[mid] = has_cat
+
+    for action in result.actions:
+        if action.op == "update" and action.memory_id and id_to_has_category.get(action.memory_id):
+            mem0_client.update(action.memory_id, action.text)
+            sync_mirror(updated=(action.memory_id,))
+            continue
+
+        added = mem0_client.add(
+            [{"role": "user", "content": action.text}],
+            user_id=MEM0_USER_ID,
+            metadata={"category": action.category.value, "mode": "gated", "source": "llm"},
+            infer=False,
+        )
+        sync_mirror(add_result=added)
+
+
+async def store_gated_batch(
+    items: list[tuple[str, list[dict] | None, PrefilterDecision | None]],
+    *,
+    shadows: list[tuple[str, PrefilterDecision]] = (),
+    executor: ThreadPoolExecutor | None = None,
+) -> list[bool]:
+    """Stores a batch of turns with one gatekeeper call.
+
+    Uncertain turns with related memories, and local stores that collide with one, go to
+    the LLM; the rest use the heuristic. ``shadows`` only report LLM agreement.
+    """
+    loop = asyncio.get_running_loop()
+    gated = [(text, existing) for text, existing, local in items if existing is not None and _needs_llm(local, existing)]
+    fallback = [(text, existing) for text, existing, local in items if existing is None or not _needs_llm(local, existing)]
+    agreements: list[bool] = []
+
+    if gated or shadows:
+        requests = [GatekeeperItem(user_text=text, existing_memories=existing) for text, existing in gated]
+        requests += [GatekeeperItem(user_text=text, existing_memories=[]) for text, _ in shadows]
+        try:
+            results = await arun_llm_gatekeeper_batch(requests)
+        except Exception as e:
+            logger.warning(f"Failed to store gated memories in Mem0 (LLM): {e}")
+            results = [GatekeeperResult(actions=(), reason="exception", status="error")] * len(requests)
+
+        for (text, existing), result in zip(gated, results):
+            if result.status == "error":
+                fallback.append((text, existing))
+                continue
+            if result.status == "skip":
+                continue
+            try:
+                await loop.run_in_executor(executor, apply_gatekeeper_actions, result, existing)
+            except Exception as e:
+                logger.warning(f"Failed to store gated memories in Mem0 (LLM): {e}")
+                fallback.append((text, existing))
+
+        for (text, local), result in zip(shadows, results[len(gated):]):
+            if result.status == "error":
+                continue
+            agreements.append(result.status == local.verdict)
+            if result.status != local.verdict:
+                logger.info(f"Memory prefilter disagreement: local={local.verdict} ({local.reason}) llm={result.status} text={text!r}")
+
+    for text, existing in fallback:
+        try:
+            await loop.run_in_executor(executor, store_heuristic, text, existing)
+        except Exception as fallback_err:
+            logger.warning(f"Heuristic fallback failed: {fallback_err}")
+
+    return agreements
+
+
+def _needs_llm(local: PrefilterDecision | None, existing: list[dict]) -> bool:
+    if local is None or local.verdict == "uncertain":
+        return True
+    return local.verdict == "store" and any(memory_collides(item, existing) for item in local.items)
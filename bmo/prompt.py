@@ -1,6 +1,12 @@
+import hashlib
 import json
+import logging
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
+logger = logging.getLogger("bmo-agent")
+
 
 def load_prompt(path: Path) -> dict:
     try:
@@ -8,6 +14,10 @@ def load_prompt(path: Path) -> dict:
     except FileNotFoundError as exc:
         raise RuntimeError(f"Missing prompt JSON at: {path}") from exc
 
+    return _parse_prompt(raw, path)
+
+
+def _parse_prompt(raw: str, path: Path) -> dict:
     try:
         prompt = json.loads(raw)
     except json.JSONDecodeError as exc:
@@ -19,6 +29,100 @@ def load_prompt(path: Path) -> dict:
     return prompt
 
 
+class PromptRegistry:
+    """Composed instructions cached per prompt file version (content hash).
+
+    ``instructions()`` only stats the file and re-reads it when mtime or size changed,
+    so every new session picks up persona edits without a worker restart. A malformed
+    edit is logged and the last good version stays in use.
+    """
+
+    def __init__(self, path: Path, *, poll_interval: float = 2.0, max_versions: int = 4) -> None:
+        self.path = path
+        self.poll_interval = poll_interval
+        self.max_versions = max(max_versions, 1)
+        self.version: str | None = None
+        self.reloads = 0
+        self.failures = 0
+        self._signature: tuple[int, int] | None = None
+        self._compiled: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: threading.Thread | None = None
+
+    def instructions(self) -> str:
+        self.refresh()
+        with self._lock:
+            return self._compiled[self.version]
+
+    def refresh(self) -> bool:
+        """Loads a changed file; returns True when a new version became current."""
+        try:
+            st = self.path.stat()
+            signature = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            signature = None
+
+        with self._lock:
+            if self.version is not None and signature == self._signature:
+                return False
+            self._signature = signature
+
+            try:
+                raw = self.path.read_bytes()
+            except OSError as exc:
+                return self._reject(RuntimeError(f"Missing prompt JSON at: {self.path}"), exc)
+
+            digest = hashlib.sha256(raw).hexdigest()
+            if digest == self.version:
+                return False
+
+            if digest not in self._compiled:
+                try:
+                    text = raw.decode("utf-8")
+                    self._compiled[digest] = compose_instructions(_parse_prompt(text, self.path))
+                except (RuntimeError, UnicodeDecodeError) as exc:
+                    return self._reject(exc)
+                while len(self._compiled) > self.max_versions:
+                    self._compiled.popitem(last=False)
+            self._compiled.move_to_end(digest)
+
+            previous, self.version = self.version, digest
+            if previous is not None:
+                self.reloads += 1
+                logger.info(f"Prompt reloaded: {self.path.name} version={digest[:12]}")
+            return True
+
+    def start_watching(self) -> None:
+        """Loads the prompt now and polls for edits on a daemon thread."""
+        self.refresh()
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="prompt-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=self.poll_interval + 1)
+            self._watcher = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Prompt watcher failed: {e}")
+
+    def _reject(self, exc: Exception, cause: Exception | None = None) -> bool:
+        self.failures += 1
+        if self.version is None:
+            raise exc from cause
+        logger.warning(f"Keeping prompt version {self.version[:12]}: {exc}")
+        return False
+
+
 def compose_instructions(prompt: dict) -> str:
     persona = prompt.get("persona") if isinstance(prompt.get("persona"), dict) else {}
     audio_control = (
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import TypeVar
+
+T = TypeVar("T")
+
+_MIN_SAMPLES = 20
+
+
+class LatencyTracker:
+    """Rolling window of successful request latencies driving timeouts and hedge delays.
+
+    Until ``_MIN_SAMPLES`` requests have been seen, the timeout is ``max_timeout`` and
+    nothing is hedged. Calls that hit the timeout are recorded as censored samples at the
+    limit, so a service that slows down past the learned timeout pushes it back up.
+    """
+
+    def __init__(self, *, window: int = 200, min_timeout: float, max_timeout: float, min_hedge: float = 0.25) -> None:
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.min_hedge = min_hedge
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def observe_timeout(self, limit: float) -> None:
+        """Records a call cut off at ``limit``: it took at least that long."""
+        self._samples.append(limit)
+
+    def percentile(self, q: float) -> float | None:
+        if len(self._samples) < _MIN_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+    def timeout(self) -> float:
+        p99 = self.percentile(0.99)
+        if p99 is None:
+            return self.max_timeout
+        return min(max(p99 * 2, self.min_timeout), self.max_timeout)
+
+    def hedge_delay(self) -> float | None:
+        p95 = self.percentile(0.95)
+        return None if p95 is None else max(p95, self.min_hedge)
+
+
+class CircuitBreaker:
+    """Closed -> open after ``failure_threshold`` consecutive failures.
+
+    While open, calls fail fast. After ``reset_timeout`` seconds a single probe is let
+    through (half-open): success closes the breaker, failure opens it again. A probe that
+    ends with neither (cancelled by a caller's timeout) must call ``release`` so the next
+    call can probe instead.
+    """
+
+    def __init__(self, *, name: str, failure_threshold: int, reset_timeout: float) -> None:
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.rejected = 0
+        self.opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def probing(self) -> bool:
+        """True while the single half-open probe is in flight."""
+        return self.state == "half_open" and self._probing
+
+    def allow(self) -> bool:
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = "half_open"
+            self._probing = False
+        if self.state == "closed":
+            return True
+        if self.state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def release(self) -> None:
+        """Gives back an admitted call that was cancelled before it produced a verdict."""
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+@dataclass
+class HedgeStats:
+    requests: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+
+
+async def hedged(
+    call: Callable[[], Awaitable[T]],
+    *,
+    hedge_after: float | None,
+    timeout: float,
+    stats: HedgeStats | None = None,
+) -> T:
+    """Runs ``call``; if it has not finished after ``hedge_after`` seconds, races a second one.
+
+    The first successful result wins and the other attempt is cancelled. The whole race is
+    bounded by ``timeout``.
+    """
+    stats = stats or HedgeStats()
+    stats.requests += 1
+
+    async def race() -> T:
+        first = asyncio.ensure_future(call())
+        tasks = [first]
+        error: BaseException | None = None
+        try:
+            if hedge_after is not None:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+                if not done:
+                    stats.hedged += 1
+                    tasks.append(asyncio.ensure_future(call()))
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tasks.remove(task)
+                    if task.exception() is None:
+                        if task is not first:
+                            stats.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return await asyncio.wait_for(race(), timeout=timeout)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from bmo.config import logger
+
+_STATS_LOG_EVERY = 25
+
+
+@dataclass
+class _Entry:
+    value: str
+    stored_at: float
+    ttl: float
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    bypassed: int = 0
+    refreshes: int = 0
+    evictions: int = 0
+    uncacheable: int = 0
+
+
+class ResultCache:
+    """In-process cache for tool results with TTL and stale-while-revalidate.
+
+    A fresh entry is returned as-is. An entry past its TTL but inside ``stale_ttl`` is
+    returned immediately while one background task refreshes it. Concurrent misses for
+    the same key share one fetch. Results rejected by ``cacheable`` (error payloads) are
+    returned but never stored, and the least recently used entry is evicted past
+    ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        ttl: float,
+        stale_ttl: float,
+        max_entries: int,
+        cacheable: Callable[[str], bool] = lambda value: True,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max(max_entries, 1)
+        self.stats = CacheStats()
+        self._cacheable = cacheable
+        self._clock = clock
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[str]],
+        *,
+        ttl: float | None = None,
+        bypass: bool = False,
+    ) -> str:
+        ttl = self.ttl if ttl is None else ttl
+        if bypass:
+            self.stats.bypassed += 1
+            return await self._fetch(key, fetch, ttl)
+
+        entry = self._entries.get(key)
+        now = self._clock()
+        if entry is not None:
+            age = now - entry.stored_at
+            if age <= entry.ttl:
+                self._entries.move_to_end(key)
+                self._count("hits")
+                return entry.value
+            if age <= entry.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                self._count("stale_hits")
+                if key not in self._inflight:
+                    self.stats.refreshes += 1
+                    self._start(key, fetch, ttl)
+                return entry.value
+            del self._entries[key]
+
+        self._count("misses")
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        return await self._fetch(key, fetch, ttl)
+
+    def invalidate(self, key: str | None = None) -> None:
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def log_stats(self) -> None:
+        s = self.stats
+        logger.info(
+            f"{self.name} cache: hits={s.hits} stale_hits={s.stale_hits} misses={s.misses} "
+            f"bypassed={s.bypassed} refreshes={s.refreshes} evictions={s.evictions} "
+            f"uncacheable={s.uncacheable} size={len(self._entries)}"
+        )
+
+    async def _fetch(self, key: str, fetch: Callable[[], Awaitable[str]], ttl: float) -> str:
+        return await asyncio.shield(self._start(key, fetch, ttl))
+
+    def _start(self, key: str, fetch: Callable[[], Awaitable[str]], ttl: float) -> asyncio.Future[str]:
+        task = asyncio.ensure_future(self._fetch_and_store(key, fetch, ttl))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._finish(key, t))
+        return task
+
+    async def _fetch_and_store(self, key: str, fetch: Callable[[], Awaitable[str]], ttl: float) -> str:
+        value = await fetch()
+        if self._cacheable(value):
+            self._entries[key] = _Entry(value=value, stored_at=self._clock(), ttl=ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+        else:
+            self.stats.uncacheable += 1
+        return value
+
+    def _finish(self, key: str, task: asyncio.Future[str]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"{self.name} cache refresh failed: {task.exception()}")
+
+    def _count(self, field: str) -> None:
+        setattr(self.stats, field, getattr(self.stats, field) + 1)
+        s = self.stats
+        if (s.hits + s.stale_hits + s.misses) % _STATS_LOG_EVERY == 0:
+            self.log_stats()
+
+
+def normalize_query(query: str) -> str:
+    return " ".join((query or "").casefold().split())
@@ -1,52 +1,152 @@
 import asyncio
 import json
 import os
+import time
 
-import httpx
+from bmo.config import (
+    OBSIDIAN_BREAKER_FAILURES,
+    OBSIDIAN_BREAKER_RESET,
+    OBSIDIAN_CACHE_SIZE,
+    OBSIDIAN_CACHE_STALE_TTL,
+    OBSIDIAN_CACHE_TTL,
+    OBSIDIAN_SEARCH_URL_DEFAULT,
+    OBSIDIAN_TIMEOUT,
+    OBSIDIAN_TIMEOUT_MIN,
+    TAVILY_BACKEND,
+    TAVILY_CACHE_SIZE,
+    TAVILY_TTL_FINANCE,
+    TAVILY_TTL_GENERAL,
+    TAVILY_TTL_NEWS,
+    logger,
+)
+from bmo.http_clients import http_clients
+from bmo.resilience import CircuitBreaker, HedgeStats, LatencyTracker, hedged
+from bmo.result_cache import ResultCache, normalize_query
 
-from bmo.config import OBSIDIAN_SEARCH_URL_DEFAULT, logger
 
+def obsidian_health() -> dict:
+    p95 = obsidian_latency.percentile(0.95)
+    return {
+        "breaker": obsidian_breaker.state,
+        "consecutive_failures": obsidian_breaker.failures,
+        "rejected": obsidian_breaker.rejected,
+        "p95_ms": round(p95 * 1000) if p95 is not None else None,
+        "timeout_ms": round(obsidian_latency.timeout() * 1000),
+        "hedged": obsidian_hedges.hedged,
+        "hedge_wins": obsidian_hedges.hedge_wins,
+    }
+
+
+def _is_success_payload(payload: str) -> bool:
+    try:
+        parsed = json.loads(payload)
+    except (TypeError, ValueError):
+        return False
+    return isinstance(parsed, dict) and "error" not in parsed
+
+
+obsidian_breaker = CircuitBreaker(
+    name="obsidian",
+    failure_threshold=OBSIDIAN_BREAKER_FAILURES,
+    reset_timeout=OBSIDIAN_BREAKER_RESET,
+)
+obsidian_latency = LatencyTracker(min_timeout=OBSIDIAN_TIMEOUT_MIN, max_timeout=OBSIDIAN_TIMEOUT)
+obsidian_hedges = HedgeStats()
 
-async def fetch_obsidian_search(query: str) -> str:
-    """Query Ghegi's Obsidian RAG service. Returns JSON with top-level 'results' array."""
+obsidian_cache = ResultCache(
+    name="Obsidian",
+    ttl=OBSIDIAN_CACHE_TTL,
+    stale_ttl=OBSIDIAN_CACHE_STALE_TTL,
+    max_entries=OBSIDIAN_CACHE_SIZE,
+    cacheable=_is_success_payload,
+)
+
+
+async def fetch_obsidian_search(query: str, *, use_cache: bool = True) -> str:
+    """Query Ghegi's Obsidian RAG service. Returns JSON with top-level 'results' array.
+
+    Answers are cached per normalized query; ``use_cache=False`` always asks the service
+    (and refreshes the cached answer).
+    """
     cleaned = query.strip()
     if not cleaned:
         return json.dumps({"results": [], "error": "empty query"})
 
+    return await obsidian_cache.get_or_fetch(
+        normalize_query(cleaned),
+        lambda: _fetch_obsidian_search(cleaned),
+        bypass=not use_cache,
+    )
+
+
+async def _fetch_obsidian_search(cleaned: str) -> str:
     url = os.environ.get("OBSIDIAN_SEARCH_URL", OBSIDIAN_SEARCH_URL_DEFAULT)
-    try:
-        async with httpx.AsyncClient(timeout=8) as client:
-            resp = await client.get(url, params={"query": cleaned})
+    if not obsidian_breaker.allow():
+        return json.dumps({"results": [], "error": "obsidian service unavailable"})
+
+    client = http_clients.get("obsidian")
+
+    async def attempt():
+        started = time.monotonic()
+        resp = await client.get(url, params={"query": cleaned})
+        if resp.status_code >= 500:
             resp.raise_for_status()
-            try:
-                payload = resp.json()
-            except Exception:
-                return json.dumps({"results": [], "error": "invalid json from obsidian service"})
-
-            if not isinstance(payload, dict):
-                return json.dumps({"results": [], "error": "unexpected response from obsidian service"})
-
-            results = payload.get("results")
-            if not isinstance(results, list):
-                return json.dumps({"results": [], "error": "missing results from obsidian service"})
-
-            normalized_results: list[dict] = []
-            for item in results:
-                if isinstance(item, dict):
-                    normalized_item = dict(item)
-                    normalized_item.setdefault("source_path", None)
-                    normalized_item.setdefault("text", None)
-                    normalized_item.setdefault("score", None)
-                else:
-                    normalized_item = {
-                        "source_path": None,
-                        "text": None if item is None else str(item),
-                        "score": None,
-                    }
-                normalized_results.append(normalized_item)
-
-            payload["results"] = normalized_results
-            return json.dumps(payload)
+        obsidian_latency.observe(time.monotonic() - started)
+        return resp
+
+    # The half-open probe gets the static ceiling: the learned timeout is what failed.
+    if obsidian_breaker.probing:
+        hedge_after, timeout = None, OBSIDIAN_TIMEOUT
+    else:
+        hedge_after, timeout = obsidian_latency.hedge_delay(), obsidian_latency.timeout()
+
+    try:
+        resp = await hedged(attempt, hedge_after=hedge_after, timeout=timeout, stats=obsidian_hedges)
+    except asyncio.CancelledError:
+        obsidian_breaker.release()
+        raise
+    except asyncio.TimeoutError:
+        obsidian_latency.observe_timeout(timeout)
+        obsidian_breaker.record_failure()
+        logger.warning(f"Obsidian query timed out after {timeout:.1f}s (breaker={obsidian_breaker.state})")
+        return json.dumps({"results": [], "error": "obsidian query failed"})
+    except Exception as e:
+        obsidian_breaker.record_failure()
+        logger.warning(f"Obsidian query failed: {type(e).__name__} (breaker={obsidian_breaker.state})")
+        return json.dumps({"results": [], "error": "obsidian query failed"})
+    obsidian_breaker.record_success()
+
+    try:
+        resp.raise_for_status()
+        try:
+            payload = resp.json()
+        except Exception:
+            return json.dumps({"results": [], "error": "invalid json from obsidian service"})
+
+        if not isinstance(payload, dict):
+            return json.dumps({"results": [], "error": "unexpected response from obsidian service"})
+
+        results = payload.get("results")
+        if not isinstance(results, list):
+            return json.dumps({"results": [], "error": "missing results from obsidian service"})
+
+        normalized_results: list[dict] = []
+        for item in results:
+            if isinstance(item, dict):
+                normalized_item = dict(item)
+                normalized_item.setdefault("source_path", None)
+                normalized_item.setdefault("text", None)
+                normalized_item.setdefault("score", None)
+            else:
+                normalized_item = {
+                    "source_path": None,
+                    "text": None if item is None else str(item),
+                    "score": None,
+                }
+            normalized_results.append(normalized_item)
+
+        payload["results"] = normalized_results
+        return json.dumps(payload)
     except Exception as e:
         logger.warning(f"Obsidian query failed: {type(e).__name__}")
         return json.dumps({"results": [], "error": "obsidian query failed"})
@@ -57,16 +157,75 @@ _VALID_TIME_RANGES = {"day", "week", "month", "year", "d", "w", "m", "y"}
 _RESULT_FIELDS = ("title", "url", "content", "score")
 
 
-def _run_tavily_search(
+_TIME_RANGE_ALIASES = {"d": "day", "w": "week", "m": "month", "y": "year"}
+_TOPIC_TTLS = {"general": TAVILY_TTL_GENERAL, "news": TAVILY_TTL_NEWS, "finance": TAVILY_TTL_FINANCE}
+_TIME_RANGE_TTL_CAPS = {"day": TAVILY_TTL_NEWS, "week": TAVILY_TTL_GENERAL / 6}
+
+tavily_cache = ResultCache(
+    name="Tavily",
+    ttl=TAVILY_TTL_GENERAL,
+    stale_ttl=0,
+    max_entries=TAVILY_CACHE_SIZE,
+    cacheable=_is_success_payload,
+)
+
+_tavily_backend = None
+
+
+class StubTavilyBackend:
+    """Offline stand-in for ``AsyncTavilyClient`` (TAVILY_BACKEND=STUB), for tests and benchmarks."""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.calls: list[dict] = []
+
+    async def search(self, query: str, **kwargs) -> dict:
+        self.calls.append({"query": query, **kwargs})
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        topic = kwargs.get("topic") or "general"
+        return {
+            "query": query,
+            "results": [
+                {
+                    "title": f"Stub result {i + 1} for {query}",
+                    "url": f"https://example.com/{topic}/{i + 1}",
+                    "content": f"Offline {topic} result {i + 1} for '{query}'.",
+                    "score": round(1 - i * 0.1, 2),
+                }
+                for i in range(kwargs.get("max_results") or 5)
+            ],
+        }
+
+
+def get_tavily_backend():
+    """Returns the process-wide Tavily client, creating it on first use."""
+    global _tavily_backend
+    if _tavily_backend is None:
+        if TAVILY_BACKEND == "STUB":
+            _tavily_backend = StubTavilyBackend()
+        else:
+            api_key = os.environ.get("TAVILY_API_KEY", "")
+            if not api_key:
+                return None
+            from tavily import AsyncTavilyClient
+
+            _tavily_backend = AsyncTavilyClient(api_key=api_key)
+    return _tavily_backend
+
+
+def tavily_cache_ttl(topic: str, time_range: str | None) -> float:
+    ttl = _TOPIC_TTLS.get(topic, TAVILY_TTL_GENERAL)
+    return min(ttl, _TIME_RANGE_TTL_CAPS.get(time_range or "", ttl))
+
+
+async def _run_tavily_search(
     query: str, topic: str, max_results: int, time_range: str | None
 ) -> dict:
-    from tavily import TavilyClient
-
-    api_key = os.environ.get("TAVILY_API_KEY", "")
-    if not api_key:
+    backend = get_tavily_backend()
+    if backend is None:
         return {"results": [], "error": "TAVILY_API_KEY not set"}
 
-    client = TavilyClient(api_key=api_key)
     kwargs: dict = {
         "query": query,
         "topic": topic,
@@ -75,7 +234,7 @@ def _run_tavily_search(
     }
     if time_range:
         kwargs["time_range"] = time_range
-    return client.search(**kwargs)
+    return await backend.search(**kwargs)
 
 
 def _normalize_tavily_results(raw_response: dict) -> list[dict]:
@@ -101,9 +260,19 @@ async def search_tavily(
     max_results = min(max(max_results, 1), 20)
     if time_range and time_range not in _VALID_TIME_RANGES:
         time_range = None
+    time_range = _TIME_RANGE_ALIASES.get(time_range, time_range) if time_range else None
+
+    key = json.dumps([normalize_query(cleaned), topic, max_results, time_range])
+    return await tavily_cache.get_or_fetch(
+        key,
+        lambda: _search_tavily(cleaned, topic, max_results, time_range),
+        ttl=tavily_cache_ttl(topic, time_range),
+    )
+
 
+async def _search_tavily(cleaned: str, topic: str, max_results: int, time_range: str | None) -> str:
     try:
-        raw = await asyncio.to_thread(_run_tavily_search, cleaned, topic, max_results, time_range)
+        raw = await _run_tavily_search(cleaned, topic, max_results, time_range)
         if "error" in raw and not raw.get("results"):
             return json.dumps(raw)
         results = _normalize_tavily_results(raw)
@@ -1,15 +1,27 @@
 import asyncio
 import json
 import os
+import random
+import time
+from collections.abc import Awaitable, Callable
 from datetime import datetime
 
 import httpx
 
-from bmo.config import GMT_PLUS_8, logger
+from bmo.config import (
+    GMT_PLUS_8,
+    STATUS_REFRESH_INTERVAL,
+    STATUS_REFRESH_JITTER,
+    STATUS_REFRESH_MAX_BACKOFF,
+    logger,
+)
+from bmo.http_clients import http_clients
+from bmo.services import obsidian_health
 
 _llm_request_count: int = 0
 _llm_request_date: str = ""
 _deepgram_project_id: str | None = None
+_context_size: dict[str, int] = {"tokens": 0, "items": 0, "summary_tokens": 0}
 
 
 def increment_llm_counter() -> None:
@@ -21,80 +33,165 @@ def increment_llm_counter() -> None:
     _llm_request_count += 1
 
 
+def record_context_size(*, tokens: int, items: int, summary_tokens: int) -> None:
+    _context_size.update(tokens=tokens, items=items, summary_tokens=summary_tokens)
+
+
 async def fetch_fish_audio_balance() -> float | None:
     api_key = os.environ.get("FISH_API_KEY", "")
     if not api_key:
         return None
-    try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(
-                "https://api.fish.audio/wallet/self/api-credit",
-                headers={"Authorization": f"Bearer {api_key}"},
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            return float(data.get("credit", 0))
-    except Exception as e:
-        logger.warning(f"Fish Audio balance fetch failed: {e}")
+    resp = await http_clients.get("fish_audio").get(
+        "https://api.fish.audio/wallet/self/api-credit",
+        headers={"Authorization": f"Bearer {api_key}"},
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    return float(data.get("credit", 0))
+
+
+async def _fetch_deepgram_project_balance(client: httpx.AsyncClient, headers: dict, project_id: str) -> float | None:
+    resp = await client.get(
+        f"https://api.deepgram.com/v1/projects/{project_id}/balances",
+        headers=headers,
+    )
+    resp.raise_for_status()
+    balances = resp.json().get("balances", [])
+    if not balances:
         return None
+    return float(balances[0].get("amount", 0))
 
 
 async def fetch_deepgram_balance() -> float | None:
+    """Reads balances from the cached project id, listing projects only when there is none yet."""
     global _deepgram_project_id
     api_key = os.environ.get("DEEPGRAM_API_KEY", "")
     if not api_key:
         return None
     headers = {"Authorization": f"Token {api_key}"}
-    try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            project_ids_to_try: list[str] = []
-            if isinstance(_deepgram_project_id, str) and _deepgram_project_id:
-                project_ids_to_try.append(_deepgram_project_id)
-
-            resp = await client.get(
-                "https://api.deepgram.com/v1/projects",
-                headers=headers,
-            )
-            resp.raise_for_status()
-            projects = resp.json().get("projects", [])
-            for proj in projects:
-                pid = proj.get("project_id") if isinstance(proj, dict) else None
-                if isinstance(pid, str) and pid and pid not in project_ids_to_try:
-                    project_ids_to_try.append(pid)
-
-            for project_id in project_ids_to_try:
-                try:
-                    bal_resp = await client.get(
-                        f"https://api.deepgram.com/v1/projects/{project_id}/balances",
-                        headers=headers,
-                    )
-                    bal_resp.raise_for_status()
-                except httpx.HTTPStatusError as status_err:
-                    if status_err.response is not None and status_err.response.status_code == 403:
-                        continue
-                    raise
-
-                balances = bal_resp.json().get("balances", [])
-                if not balances:
-                    _deepgram_project_id = project_id
-                    return None
-
-                _deepgram_project_id = project_id
-                return float(balances[0].get("amount", 0))
-
-            return None
-    except Exception as e:
-        logger.warning(f"DeepGram balance fetch failed: {e}")
-        return None
+    client = http_clients.get("deepgram")
+
+    if _deepgram_project_id:
+        try:
+            return await _fetch_deepgram_project_balance(client, headers, _deepgram_project_id)
+        except httpx.HTTPStatusError as status_err:
+            if status_err.response.status_code not in (403, 404):
+                raise
+            logger.info(f"Cached DeepGram project {_deepgram_project_id} rejected, listing projects")
+            _deepgram_project_id = None
+
+    resp = await client.get(
+        "https://api.deepgram.com/v1/projects",
+        headers=headers,
+    )
+    resp.raise_for_status()
+    for proj in resp.json().get("projects", []):
+        project_id = proj.get("project_id") if isinstance(proj, dict) else None
+        if not isinstance(project_id, str) or not project_id:
+            continue
+        try:
+            balance = await _fetch_deepgram_project_balance(client, headers, project_id)
+        except httpx.HTTPStatusError as status_err:
+            if status_err.response.status_code == 403:
+                continue
+            raise
+        _deepgram_project_id = project_id
+        return balance
+
+    return None
+
+
+class StatusAggregator:
+    """Refreshes provider balances in the background so ``getStatus`` never waits on them.
+
+    Every provider is fetched on each cycle. A failing provider keeps its last good value,
+    and the next cycle is delayed with exponential backoff. Every delay gets +/- ``jitter`` so
+    that restarted agents do not poll in lockstep.
+    """
+
+    def __init__(
+        self,
+        fetchers: dict[str, Callable[[], Awaitable[float | None]]],
+        *,
+        interval: float,
+        max_backoff: float,
+        jitter: float = 0.1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.fetchers = fetchers
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.failures = 0
+        self._clock = clock
+        self._values: dict[str, float | None] = {name: None for name in fetchers}
+        self._updated_at: dict[str, float] = {}
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def refresh(self) -> bool:
+        names = list(self.fetchers)
+        results = await asyncio.gather(*(self.fetchers[n]() for n in names), return_exceptions=True)
+        ok = True
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                ok = False
+                logger.warning(f"{name} balance fetch failed: {result}")
+                continue
+            self._values[name] = result
+            self._updated_at[name] = self._clock()
+        self.failures = 0 if ok else self.failures + 1
+        return ok
+
+    def next_delay(self) -> float:
+        delay = min(self.interval * (2 ** self.failures), max(self.max_backoff, self.interval))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def snapshot(self) -> dict:
+        now = self._clock()
+        ages = [now - self._updated_at[n] for n in self.fetchers if n in self._updated_at]
+        return {
+            **self._values,
+            "balances_age_seconds": round(max(ages), 1) if len(ages) == len(self.fetchers) else None,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                self.failures += 1
+                logger.warning(f"Status refresh failed: {e}")
+            await asyncio.sleep(self.next_delay())
+
+
+status_aggregator = StatusAggregator(
+    {"tts_balance": fetch_fish_audio_balance, "stt_balance": fetch_deepgram_balance},
+    interval=STATUS_REFRESH_INTERVAL,
+    max_backoff=STATUS_REFRESH_MAX_BACKOFF,
+    jitter=STATUS_REFRESH_JITTER,
+)
 
 
 async def build_status_response() -> str:
-    tts_balance, stt_balance = await asyncio.gather(
-        fetch_fish_audio_balance(),
-        fetch_deepgram_balance(),
-    )
+    status_aggregator.start()
     return json.dumps({
-        "tts_balance": tts_balance,
-        "stt_balance": stt_balance,
+        **status_aggregator.snapshot(),
         "llm_requests_today": _llm_request_count,
+        "context_tokens": _context_size["tokens"],
+        "context_items": _context_size["items"],
+        "context_summary_tokens": _context_size["summary_tokens"],
+        "obsidian": obsidian_health(),
     })
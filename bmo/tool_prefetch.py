@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from bmo.config import (
+    OBSIDIAN_PREFETCH_MATCH,
+    OBSIDIAN_PREFETCH_TRIGGERS,
+    OBSIDIAN_PREFETCH_TTL,
+    logger,
+)
+from bmo.services import fetch_obsidian_search
+
+_STOPWORDS = frozenset(
+    "a an and are as at be bmo can could do does for from get give hey i is it me my of on "
+    "please s show tell that the to what whats where which who with you your".split()
+)
+
+
+@dataclass
+class ToolPrefetchStats:
+    started: int = 0
+    hits: int = 0
+    misses: int = 0
+    expired: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.started if self.started else 0.0
+
+
+@dataclass
+class _Pending:
+    query: str
+    terms: frozenset[str]
+    task: asyncio.Task[str]
+    started_at: float
+
+
+class ObsidianPrefetcher:
+    """Starts the Obsidian search speculatively when a finished user turn matches a trigger.
+
+    The search for the user's own words runs in parallel with the LLM. When the model
+    then calls ``obsidian-query``, ``take`` hands over the in-flight or finished result
+    if most of the model's query terms appear in the user's turn. A prefetch that was
+    not taken is cancelled by the next turn or after ``ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        *,
+        triggers: tuple[str, ...] = OBSIDIAN_PREFETCH_TRIGGERS,
+        ttl: float = OBSIDIAN_PREFETCH_TTL,
+        min_match: float = OBSIDIAN_PREFETCH_MATCH,
+        fetch: Callable[[str], Awaitable[str]] = fetch_obsidian_search,
+    ) -> None:
+        self.ttl = ttl
+        self.min_match = min_match
+        self.stats = ToolPrefetchStats()
+        self._fetch = fetch
+        self._trigger = (
+            re.compile(r"\b(?:" + "|".join(re.escape(t) for t in triggers) + r")\b", re.IGNORECASE)
+            if triggers
+            else None
+        )
+        self._pending: _Pending | None = None
+
+    def on_user_turn(self, user_text: str) -> None:
+        self._discard()
+        query = " ".join((user_text or "").split())
+        if self._trigger is None or not query or not self._trigger.search(query):
+            return
+        self.stats.started += 1
+        self._pending = _Pending(
+            query=query,
+            terms=_terms(query),
+            task=asyncio.create_task(self._fetch(query)),
+            started_at=time.monotonic(),
+        )
+
+    async def take(self, query: str) -> str | None:
+        """Result of a matching prefetch, or None when the tool should fetch itself."""
+        pending = self._pending
+        if pending is None or time.monotonic() - pending.started_at > self.ttl:
+            self._discard()
+            self.stats.misses += 1
+            return None
+
+        wanted = _terms(query)
+        coverage = len(wanted & pending.terms) / len(wanted) if wanted else 0.0
+        if coverage < self.min_match:
+            self.stats.misses += 1
+            return None
+
+        self._pending = None
+        try:
+            result = await pending.task
+        except Exception as e:
+            logger.warning(f"Obsidian prefetch failed: {e}")
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        saved = time.monotonic() - pending.started_at
+        logger.info(f"Obsidian prefetch hit: query={query!r} head_start={saved:.2f}s")
+        return result
+
+    def log_stats(self) -> None:
+        s = self.stats
+        logger.info(
+            f"Obsidian prefetch: started={s.started} hits={s.hits} misses={s.misses} "
+            f"expired={s.expired} hit_rate={s.hit_rate:.2f}"
+        )
+
+    def close(self) -> None:
+        self._discard()
+
+    def _discard(self) -> None:
+        pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        self.stats.expired += 1
+        if not pending.task.done():
+            pending.task.cancel()
+
+
+def _terms(text: str) -> frozenset[str]:
+    words = re.findall(r"[a-z0-9]+", text.casefold())
+    return frozenset(w for w in words if w not in _STOPWORDS)
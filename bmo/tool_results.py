@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+
+from bmo.config import OBSIDIAN_RESULT_TOKEN_BUDGET, TAVILY_RESULT_TOKEN_BUDGET, logger
+from bmo.memory_injection import estimate_tokens
+
+
+@dataclass(frozen=True)
+class CompactionProfile:
+    tool: str
+    fields: tuple[str, ...]
+    text_field: str
+    budget: int
+    max_passage_chars: int
+    dedupe_fields: tuple[str, ...] = ()
+    keep_keys: tuple[str, ...] = ()
+
+
+OBSIDIAN_PROFILE = CompactionProfile(
+    tool="obsidian-query",
+    fields=("source_path", "text", "score"),
+    text_field="text",
+    budget=OBSIDIAN_RESULT_TOKEN_BUDGET,
+    max_passage_chars=1200,
+)
+
+TAVILY_PROFILE = CompactionProfile(
+    tool="search_internet",
+    fields=("title", "url", "content", "score"),
+    text_field="content",
+    budget=TAVILY_RESULT_TOKEN_BUDGET,
+    max_passage_chars=800,
+    dedupe_fields=("url",),
+    keep_keys=("topic", "query"),
+)
+
+
+def compact_tool_result(raw: str, profile: CompactionProfile) -> str:
+    """Shrinks a tool's JSON payload to what the LLM needs, within ``profile.budget`` tokens.
+
+    Keeps only ``profile.fields``, sorts by score, drops duplicate passages, truncates
+    long passages and then adds results best-first until the budget is spent. Error
+    payloads and anything that is not a ``{"results": [...]}`` object pass through.
+    """
+    try:
+        payload = json.loads(raw)
+    except (TypeError, ValueError):
+        return raw
+    if not isinstance(payload, dict) or "error" in payload or not isinstance(payload.get("results"), list):
+        return raw
+
+    items = [r for r in payload["results"] if isinstance(r, dict)]
+    items.sort(key=lambda r: _score(r.get("score")), reverse=True)
+
+    seen: set[str] = set()
+    passages: list[dict] = []
+    for item in items:
+        text = item.get(profile.text_field)
+        text = " ".join(text.split()) if isinstance(text, str) else ""
+        keys = [text.casefold()] if text else []
+        keys += [f"{f}:{item[f]}" for f in profile.dedupe_fields if isinstance(item.get(f), str) and item[f]]
+        if not keys or any(k in seen for k in keys):
+            continue
+        seen.update(keys)
+
+        compact = {f: item.get(f) for f in profile.fields if item.get(f) is not None}
+        compact[profile.text_field] = _truncate(text, profile.max_passage_chars)
+        if isinstance(compact.get("score"), float):
+            compact["score"] = round(compact["score"], 3)
+        passages.append(compact)
+
+    out: dict = {k: payload[k] for k in profile.keep_keys if k in payload}
+    out["results"] = []
+    used = estimate_tokens(_dump(out))
+    for passage in passages:
+        cost = estimate_tokens(_dump(passage)) + 1
+        if used + cost > profile.budget:
+            if out["results"]:
+                break
+            passage = _fit(passage, profile, profile.budget - used)
+            cost = estimate_tokens(_dump(passage)) + 1
+        out["results"].append(passage)
+        used += cost
+
+    omitted = len(passages) - len(out["results"])
+    if omitted:
+        out["omitted_results"] = omitted
+
+    compacted = _dump(out)
+    logger.info(
+        f"{profile.tool} result compacted: raw={estimate_tokens(raw)} -> {estimate_tokens(compacted)} tokens, "
+        f"results {len(payload['results'])} -> {len(out['results'])}"
+    )
+    return compacted
+
+
+def _fit(passage: dict, profile: CompactionProfile, budget: int) -> dict:
+    overhead = estimate_tokens(_dump({**passage, profile.text_field: ""}))
+    chars = max((budget - overhead) * 4, 80)
+    return {**passage, profile.text_field: _truncate(passage.get(profile.text_field) or "", chars)}
+
+
+def _truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    cut = text[:limit].rsplit(" ", 1)[0] if " " in text[:limit] else text[:limit]
+    return cut.rstrip(" ,.;:") + "…"
+
+
+def _score(value) -> float:
+    return float(value) if isinstance(value, (int, float)) else float("-inf")
+
+
+def _dump(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
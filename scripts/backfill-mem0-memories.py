@@ -22,12 +22,13 @@ def main() -> int:
     parser.add_argument("--dry-run", action="store_true")
     parser.add_argument("--keep-original", action="store_true")
     parser.add_argument("--progress-every", type=int, default=25)
+    parser.add_argument("--batch-size", type=int, default=20, help="Memories classified per gatekeeper call.")
     args = parser.parse_args()
 
     delete_original = not args.keep_original
 
     from bmo.config import mem0_client  # noqa: E402
-    from bmo.llm_gatekeeper import run_llm_gatekeeper  # noqa: E402
+    from bmo.llm_gatekeeper import GatekeeperItem, GatekeeperResult, run_llm_gatekeeper_batch  # noqa: E402
     from bmo.memory_policy import gatekeep_durable_memories  # noqa: E402
 
     if mem0_client is None:
@@ -53,86 +54,124 @@ def main() -> int:
     deleted = 0
     errors = 0
 
-    for mem in results:
-        processed += 1
-        if not isinstance(mem, dict):
-            continue
-
-        memory_id = mem.get("id")
-        text = mem.get("memory")
-        metadata = mem.get("metadata") if isinstance(mem.get("metadata"), dict) else {}
-        category = metadata.get("category")
-
-        if not isinstance(memory_id, str) or not isinstance(text, str) or not text.strip():
-            continue
-
-        if isinstance(category, str) and category.strip():
-            skipped_already_categorized += 1
-            continue
-
-        try:
-            related = mem0_client.search(text, user_id=args.user_id, limit=args.related_limit)
-            related_list = related.get("results", []) if isinstance(related, dict) else related
-            if not isinstance(related_list, list):
-                related_list = []
-
-            gate = run_llm_gatekeeper(user_text=text, existing_memories=related_list)
-
-            stored_any = False
-            if gate.status == "store":
-                for action in gate.actions:
+    def _store(memory_id: str, text: str, gate: GatekeeperResult) -> None:
+        nonlocal kept_skip, converted, deleted
+
+        stored_any = False
+        if gate.status == "store":
+            for action in gate.actions:
+                if not args.dry_run:
+                    mem0_client.add(
+                        [{"role": "user", "content": action.text}],
+                        user_id=args.user_id,
+                        metadata={
+                            "category": action.category.value,
+                            "mode": "gated",
+                            "source": "backfill_llm",
+                            "backfill_from": memory_id,
+                        },
+                        infer=False,
+                    )
+                stored_any = True
+
+        elif gate.status == "error":
+            decision = gatekeep_durable_memories(text)
+            if decision.should_store:
+                for item in decision.items:
                     if not args.dry_run:
                         mem0_client.add(
-                            [{"role": "user", "content": action.text}],
+                            [{"role": "user", "content": item.text}],
                             user_id=args.user_id,
                             metadata={
-                                "category": action.category.value,
+                                "category": item.category.value,
                                 "mode": "gated",
-                                "source": "backfill_llm",
+                                "source": "backfill_heuristic",
                                 "backfill_from": memory_id,
                             },
                             infer=False,
                         )
                     stored_any = True
 
-            elif gate.status == "error":
-                decision = gatekeep_durable_memories(text)
-                if decision.should_store:
-                    for item in decision.items:
-                        if not args.dry_run:
-                            mem0_client.add(
-                                [{"role": "user", "content": item.text}],
-                                user_id=args.user_id,
-                                metadata={
-                                    "category": item.category.value,
-                                    "mode": "gated",
-                                    "source": "backfill_heuristic",
-                                    "backfill_from": memory_id,
-                                },
-                                infer=False,
-                            )
-                        stored_any = True
-
-            else:
-                kept_skip += 1
-
-            if stored_any:
-                converted += 1
-                if delete_original:
-                    if not args.dry_run:
-                        mem0_client.delete(memory_id)
-                    deleted += 1
+        else:
+            kept_skip += 1
 
-        except Exception as e:
-            errors += 1
-            print(f"[{processed}/{total}] error on {memory_id}: {e}")
+        if stored_any:
+            converted += 1
+            if delete_original:
+                if not args.dry_run:
+                    mem0_client.delete(memory_id)
+                deleted += 1
 
+    def _report_progress() -> None:
         if args.progress_every > 0 and processed % args.progress_every == 0:
             print(
                 f"progress {processed}/{total} | converted={converted} deleted={deleted} "
                 f"categorized_skip={skipped_already_categorized} skip={kept_skip} errors={errors}"
             )
 
+    def _flush(chunk: list[tuple[str, str]]) -> None:
+        nonlocal processed, errors
+
+        items: list[tuple[str, str]] = []
+        gate_items: list[GatekeeperItem] = []
+        for memory_id, text in chunk:
+            try:
+                related = mem0_client.search(text, user_id=args.user_id, limit=args.related_limit)
+                related_list = related.get("results", []) if isinstance(related, dict) else related
+                if not isinstance(related_list, list):
+                    related_list = []
+            except Exception as e:
+                processed += 1
+                errors += 1
+                print(f"[{processed}/{total}] error on {memory_id}: {e}")
+                _report_progress()
+                continue
+            items.append((memory_id, text))
+            gate_items.append(GatekeeperItem(user_text=text, existing_memories=related_list))
+
+        try:
+            gates = run_llm_gatekeeper_batch(gate_items)
+        except Exception as e:
+            print(f"batch gatekeeper failed, using heuristic for {len(gate_items)} memories: {e}")
+            gates = [GatekeeperResult(actions=(), reason="exception", status="error")] * len(gate_items)
+
+        for (memory_id, text), gate in zip(items, gates):
+            processed += 1
+            try:
+                _store(memory_id, text, gate)
+            except Exception as e:
+                errors += 1
+                print(f"[{processed}/{total}] error on {memory_id}: {e}")
+            _report_progress()
+
+    chunk: list[tuple[str, str]] = []
+    for mem in results:
+        if not isinstance(mem, dict):
+            processed += 1
+            continue
+
+        memory_id = mem.get("id")
+        text = mem.get("memory")
+        metadata = mem.get("metadata") if isinstance(mem.get("metadata"), dict) else {}
+        category = metadata.get("category")
+
+        if not isinstance(memory_id, str) or not isinstance(text, str) or not text.strip():
+            processed += 1
+            continue
+
+        if isinstance(category, str) and category.strip():
+            processed += 1
+            skipped_already_categorized += 1
+            continue
+
+        chunk.append((memory_id, text))
+        if len(chunk) >= args.batch_size:
+            _flush(chunk)
+            chunk = []
+
+    if chunk:
+        _flush(chunk)
+
     print("---")
     print(f"total={total}")
     print(f"processed={processed}")
@@ -141,6 +180,9 @@ def main() -> int:
     print(f"deleted_original={deleted if delete_original else 0}")
     print(f"kept_skip={kept_skip}")
     print(f"errors={errors}")
+    embedder = getattr(mem0_client, "embedding_model", None)
+    if hasattr(embedder, "hit_ratio"):
+        print(f"embedding_cache_hit_ratio={embedder.hit_ratio:.2f}")
     if args.dry_run:
         print("dry_run=true")
 
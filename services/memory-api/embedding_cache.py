@@ -0,0 +1,205 @@
+"""Caching wrapper for Mem0 embedders.
+
+This file is duplicated byte for byte as services/memory-api/embedding_cache.py, because the
+memory API's Docker build context cannot see bmo/. tests/test_embedding_cache.py fails if
+the two copies drift.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_STATS_LOG_EVERY = 100
+_EMBED_BATCH_MAX = 100
+_DISK_TRIM_EVERY = 64
+
+
+class CachingEmbedder:
+    """Wraps a Mem0 embedder with an in-memory LRU and an optional SQLite tier.
+
+    Keys are the model name plus whitespace/case-normalized text. Gemini ignores
+    ``memory_action``, so search and add share cache entries. The disk tier keeps at most
+    ``max_disk_entries`` rows; the least recently stored or read ones are trimmed.
+    """
+
+    def __init__(
+        self,
+        embedder,
+        *,
+        model: str,
+        max_entries: int = 2048,
+        disk_path: Path | None = None,
+        max_disk_entries: int = 50_000,
+    ) -> None:
+        self._embedder = embedder
+        self.model = model
+        self.max_entries = max_entries
+        self.max_disk_entries = max(max_disk_entries, 1)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, list[float]] = OrderedDict()
+        self._db: sqlite3.Connection | None = None
+        self._disk_writes = 0
+        if disk_path is not None:
+            disk_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(disk_path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL, used_at REAL NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(embeddings)")}
+            if "used_at" not in columns:
+                self._db.execute("ALTER TABLE embeddings ADD COLUMN used_at REAL NOT NULL DEFAULT 0")
+            self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_used_at ON embeddings (used_at)")
+            self._trim_disk()
+            self._db.commit()
+
+    def __getattr__(self, name: str):
+        return getattr(self._embedder, name)
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / lookups if lookups else 0.0
+
+    def embed(self, text, memory_action=None):
+        key = self._key(text)
+        vector = self._lookup(key)
+        if vector is not None:
+            return vector
+
+        vector = list(self._embedder.embed(text, memory_action))
+        self._store(key, vector)
+        return vector
+
+    def embed_batch(self, texts, memory_action="add"):
+        keys = [self._key(t) for t in texts]
+        vectors: list[list[float] | None] = [self._lookup(k) for k in keys]
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if missing:
+            fresh = _embed_many(self._embedder, [texts[i] for i in missing], memory_action)
+            for i, vector in zip(missing, fresh):
+                vectors[i] = list(vector)
+                self._store(keys[i], vectors[i])
+        return vectors
+
+    def log_stats(self) -> None:
+        logger.info(
+            f"Embedding cache: hits={self.hits} disk_hits={self.disk_hits} misses={self.misses} "
+            f"hit_ratio={self.hit_ratio:.2f} size={len(self._entries)}"
+        )
+
+    def _key(self, text: str) -> str:
+        normalized = " ".join(str(text or "").casefold().split())
+        return hashlib.sha256(f"{self.model}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, key: str) -> list[float] | None:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self._maybe_log()
+                return vector
+
+            if self._db is not None:
+                row = self._db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    vector = array("f", row[0]).tolist()
+                    self._remember(key, vector)
+                    self._db.execute("UPDATE embeddings SET used_at = ? WHERE key = ?", (time.time(), key))
+                    self._db.commit()
+                    self.disk_hits += 1
+                    self._maybe_log()
+                    return vector
+
+            self.misses += 1
+            self._maybe_log()
+            return None
+
+    def _store(self, key: str, vector: list[float]) -> None:
+        with self._lock:
+            self._remember(key, vector)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO embeddings (key, vector, used_at) VALUES (?, ?, ?)",
+                        (key, array("f", vector).tobytes(), time.time()),
+                    )
+                    self._disk_writes += 1
+                    if self._disk_writes % _DISK_TRIM_EVERY == 0:
+                        self._trim_disk()
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Embedding cache disk write failed: {e}")
+
+    def _trim_disk(self) -> None:
+        (count,) = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        if count > self.max_disk_entries:
+            self._db.execute(
+                "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY used_at LIMIT ?)",
+                (count - self.max_disk_entries,),
+            )
+
+    def _remember(self, key: str, vector: list[float]) -> None:
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _maybe_log(self) -> None:
+        if (self.hits + self.disk_hits + self.misses) % _STATS_LOG_EVERY == 0:
+            self.log_stats()
+
+
+def install_embedding_cache(
+    memory,
+    *,
+    model: str,
+    max_entries: int,
+    disk_path: Path | None,
+    max_disk_entries: int = 50_000,
+) -> None:
+    """Swaps the embedder on a constructed ``Memory``; Mem0's factory has no hook for wrappers."""
+    if isinstance(memory.embedding_model, CachingEmbedder):
+        return
+    memory.embedding_model = CachingEmbedder(
+        memory.embedding_model,
+        model=model,
+        max_entries=max_entries,
+        disk_path=disk_path,
+        max_disk_entries=max_disk_entries,
+    )
+
+
+def _embed_many(embedder, texts: list[str], memory_action: str) -> list[list[float]]:
+    """Batch-embeds on Mem0 releases without ``embed_batch`` when the embedder is Gemini-shaped."""
+    batch = getattr(embedder, "embed_batch", None)
+    if batch is not None:
+        return batch(texts, memory_action)
+
+    client, config = getattr(embedder, "client", None), getattr(embedder, "config", None)
+    if client is None or config is None or not hasattr(client, "models"):
+        return [embedder.embed(t, memory_action) for t in texts]
+    vectors: list[list[float]] = []
+    for start in range(0, len(texts), _EMBED_BATCH_MAX):
+        chunk = [t.replace("\n", " ") for t in texts[start:start + _EMBED_BATCH_MAX]]
+        response = client.models.embed_content(
+            model=config.model,
+            contents=chunk,
+            config={"output_dimensionality": config.embedding_dims},
+        )
+        vectors.extend(e.values for e in response.embeddings)
+    if len(vectors) != len(texts):
+        raise ValueError(f"embedder returned {len(vectors)} vectors for {len(texts)} texts")
+    return vectors
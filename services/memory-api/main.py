@@ -1,13 +1,30 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import os
 import logging
-
-from fastapi import FastAPI, Query, HTTPException
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Literal
+
+from fastapi import FastAPI, Header, Query, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from mem0 import Memory
-from qdrant_client import QdrantClient
+from qdrant_client import QdrantClient, models
+
+from embedding_cache import install_embedding_cache
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("memory-api")
@@ -16,6 +33,19 @@ API_PIN = os.getenv("API_PIN", "4869")
 USER_ID = os.getenv("USER_ID", "glenn")
 QDRANT_HOST = os.getenv("QDRANT_HOST", "qdrant")
 QDRANT_PORT = int(os.getenv("QDRANT_PORT", "6333"))
+QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "true").strip().lower() in {"1", "true", "yes", "on"}
+MEM0_WORKERS = int(os.getenv("MEM0_WORKERS", "8"))
+COLLECTION_NAME = "mem0"
+SCROLL_PAGE_SIZE = int(os.getenv("SCROLL_PAGE_SIZE", "256"))
+MAX_PAGE_SIZE = 1000
+MAX_BATCH_OPERATIONS = 500
+SNAPSHOT_PROBE_INTERVAL = float(os.getenv("SNAPSHOT_PROBE_INTERVAL", "2"))
+SNAPSHOT_MAX_AGE = float(os.getenv("SNAPSHOT_MAX_AGE", "300"))
+EMBEDDING_MODEL = "models/gemini-embedding-001"
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "2048"))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH")
+EMBEDDING_CACHE_DISK_SIZE = int(os.getenv("EMBEDDING_CACHE_DISK_SIZE", "50000"))
 
 MEM0_CONFIG = {
     "vector_store": {
@@ -32,24 +62,74 @@ MEM0_CONFIG = {
     },
     "embedder": {
         "provider": "gemini",
-        "config": {"model": "models/gemini-embedding-001"},
+        "config": {"model": EMBEDDING_MODEL},
     },
 }
 
 try:
     mem0_client = Memory.from_config(MEM0_CONFIG)
+    install_embedding_cache(
+        mem0_client,
+        model=EMBEDDING_MODEL,
+        max_entries=EMBEDDING_CACHE_SIZE,
+        disk_path=Path(EMBEDDING_CACHE_PATH) if EMBEDDING_CACHE_PATH else None,
+        max_disk_entries=EMBEDDING_CACHE_DISK_SIZE,
+    )
     logger.info("mem0 client initialized (qdrant=%s:%d)", QDRANT_HOST, QDRANT_PORT)
 except Exception as exc:
     logger.warning("Failed to init mem0: %s", exc)
     mem0_client = None
 
-app = FastAPI(title="BMO Memory API")
+_qdrant_client: QdrantClient | None = None
+_qdrant_lock = threading.Lock()
+_mem0_executor: ThreadPoolExecutor | None = None
+
+
+def _qdrant() -> QdrantClient:
+    """Shared Qdrant client; gRPC on QDRANT_GRPC_PORT unless QDRANT_PREFER_GRPC is off."""
+    global _qdrant_client
+    with _qdrant_lock:
+        if _qdrant_client is None:
+            _qdrant_client = QdrantClient(
+                host=QDRANT_HOST,
+                port=QDRANT_PORT,
+                grpc_port=QDRANT_GRPC_PORT,
+                prefer_grpc=QDRANT_PREFER_GRPC,
+            )
+        return _qdrant_client
+
+
+async def _run_blocking(fn, /, *args, **kwargs):
+    """Runs blocking Mem0/Qdrant calls on a MEM0_WORKERS-sized executor instead of Starlette's threadpool."""
+    global _mem0_executor
+    if _mem0_executor is None:
+        _mem0_executor = ThreadPoolExecutor(max_workers=MEM0_WORKERS, thread_name_prefix="mem0")
+    return await asyncio.get_running_loop().run_in_executor(_mem0_executor, partial(fn, *args, **kwargs))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _qdrant_client, _mem0_executor
+    await _run_blocking(_qdrant)
+    await _run_blocking(_ensure_version_index)
+    yield
+    with _qdrant_lock:
+        if _qdrant_client is not None:
+            _qdrant_client.close()
+            _qdrant_client = None
+    if _mem0_executor is not None:
+        _mem0_executor.shutdown(wait=False)
+        _mem0_executor = None
+
+
+app = FastAPI(title="BMO Memory API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 
@@ -74,41 +154,249 @@ class AddBody(BaseModel):
     category: str = "uncategorized"
 
 
+class BatchOperation(BaseModel):
+    op: Literal["add", "update", "delete", "recategorize"]
+    id: str | None = None
+    memory: str | None = None
+    category: str | None = None
+
+
+class BatchBody(BaseModel):
+    operations: list[BatchOperation] = Field(min_length=1, max_length=MAX_BATCH_OPERATIONS)
+
+
+def _scroll_filter(category: str | None) -> models.Filter:
+    must = [models.FieldCondition(key="user_id", match=models.MatchValue(value=USER_ID))]
+    if category:
+        must.append(models.FieldCondition(key="category", match=models.MatchValue(value=category)))
+    return models.Filter(must=must)
+
+
+def _normalize_point(point) -> dict | None:
+    payload = point.payload if isinstance(point.payload, dict) else {}
+    memory_id = str(point.id) if point.id is not None else None
+    text = payload.get("data")
+    if not memory_id or not isinstance(text, str):
+        return None
+    return {
+        "id": memory_id,
+        "memory": text,
+        "category": payload.get("category") or "uncategorized",
+        "created_at": payload.get("created_at") or "",
+        "updated_at": payload.get("updated_at") or "",
+    }
+
+
+def _parse_cursor(cursor: str | None) -> int | str | None:
+    """Qdrant point ids are unsigned integers or UUIDs; anything else is a client error."""
+    if cursor is None:
+        return None
+    if cursor.isascii() and cursor.isdigit():
+        return int(cursor)
+    try:
+        return str(uuid.UUID(cursor))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid cursor") from None
+
+
+def _scroll_page(qdrant: QdrantClient, *, cursor: int | str | None, limit: int, category: str | None) -> tuple[list[dict], str | None]:
+    points, next_offset = qdrant.scroll(
+        collection_name=COLLECTION_NAME,
+        scroll_filter=_scroll_filter(category),
+        limit=limit,
+        offset=cursor,
+        with_payload=True,
+        with_vectors=False,
+    )
+    memories = [m for m in (_normalize_point(p) for p in points) if m is not None]
+    return memories, None if next_offset is None else str(next_offset)
+
+
+def _iter_memories(category: str | None, cursor: int | str | None = None) -> Iterator[dict]:
+    qdrant = _qdrant()
+    while True:
+        memories, cursor = _scroll_page(qdrant, cursor=cursor, limit=SCROLL_PAGE_SIZE, category=category)
+        yield from memories
+        if cursor is None:
+            return
+
+
+def _ensure_version_index() -> None:
+    """Datetime index on ``updated_at`` so the snapshot probe can order by it."""
+    try:
+        _qdrant().create_payload_index(
+            collection_name=COLLECTION_NAME,
+            field_name="updated_at",
+            field_schema=models.PayloadSchemaType.DATETIME,
+        )
+    except Exception as exc:
+        logger.warning("could not index updated_at, in-place edits fall back to max_age: %s", exc)
+
+
+def _collection_version() -> tuple[int | None, str | None]:
+    """Point count plus the newest ``updated_at``.
+
+    Adds and deletes from any writer change the count; Mem0 stamps ``updated_at`` on
+    every in-place update, including the agent's gatekeeper ``op=update`` path.
+    """
+    qdrant = _qdrant()
+    points_count = qdrant.get_collection(COLLECTION_NAME).points_count
+    try:
+        points, _ = qdrant.scroll(
+            collection_name=COLLECTION_NAME,
+            scroll_filter=_scroll_filter(None),
+            limit=1,
+            order_by=models.OrderBy(key="updated_at", direction=models.Direction.DESC),
+            with_payload=["updated_at"],
+            with_vectors=False,
+        )
+    except Exception as exc:
+        logger.debug("updated_at probe failed: %s", exc)
+        return points_count, None
+    payload = points[0].payload if points and isinstance(points[0].payload, dict) else {}
+    return points_count, payload.get("updated_at")
+
+
+@dataclass
+class _Snapshot:
+    memories: list[dict]
+    version: tuple[int | None, str | None]
+    generation: int
+    built_at: float
+    bodies: dict[str | None, tuple[bytes, str]] = field(default_factory=dict)
+
+    def render(self, category: str | None) -> tuple[bytes, str]:
+        """Serialized body and strong ETag, memoized per category filter.
+
+        The ETag carries the write generation the snapshot was built at, so it changes
+        after every write through this API even when the body hash would not.
+        """
+        rendered = self.bodies.get(category)
+        if rendered is None:
+            memories = [m for m in self.memories if m["category"] == category] if category else self.memories
+            body = json.dumps({"memories": memories}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            rendered = (body, f'"{self.generation}-{hashlib.sha256(body).hexdigest()[:32]}"')
+            self.bodies[category] = rendered
+        return rendered
+
+
+class SnapshotCache:
+    """Normalized full memory list, rebuilt after our own writes or when the collection changes.
+
+    Every write endpoint calls ``invalidate``, which bumps a generation counter; a snapshot
+    from an older generation is never served. Writes made elsewhere (the agent) are detected
+    by probing the collection's point count and newest ``updated_at`` at most every
+    ``probe_interval`` seconds. ``max_age`` bounds staleness if the probe cannot order by
+    ``updated_at`` (index missing).
+    """
+
+    def __init__(self, *, probe_interval: float, max_age: float, clock=time.monotonic) -> None:
+        self.probe_interval = probe_interval
+        self.max_age = max_age
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._generation_lock = threading.Lock()
+        self._generation = 0
+        self._snapshot: _Snapshot | None = None
+        self._probed_at = 0.0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def invalidate(self) -> None:
+        """Marks the current snapshot stale without waiting for a rebuild in progress."""
+        with self._generation_lock:
+            self._generation += 1
+
+    def get(self) -> _Snapshot:
+        with self._lock:
+            now = self._clock()
+            snapshot = self._snapshot
+            if (
+                snapshot is not None
+                and snapshot.generation == self._generation
+                and now - snapshot.built_at < self.max_age
+            ):
+                if now - self._probed_at < self.probe_interval:
+                    return snapshot
+                self._probed_at = now
+                if _collection_version() == snapshot.version:
+                    return snapshot
+
+            # Read the generation before scrolling: a write that lands mid-rebuild bumps it
+            # again, so the next request rebuilds instead of trusting this snapshot.
+            generation = self._generation
+            version = _collection_version()
+            self._snapshot = _Snapshot(list(_iter_memories(None)), version, generation, now)
+            self._probed_at = now
+            logger.info("memory snapshot rebuilt (%d memories)", len(self._snapshot.memories))
+            return self._snapshot
+
+
+memory_snapshot = SnapshotCache(probe_interval=SNAPSHOT_PROBE_INTERVAL, max_age=SNAPSHOT_MAX_AGE)
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
 @app.get("/api/memories")
-def get_memories(pin: str | None = Query(default=None)):
+async def get_memories(
+    pin: str | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    category: str | None = Query(default=None),
+    if_none_match: str | None = Header(default=None),
+):
+    """Without ``cursor``/``limit`` returns every memory from the snapshot, honouring
+    ``If-None-Match``; otherwise one page plus ``next_cursor``."""
     _check_pin(pin)
-    client = _require_client()
-
-    raw = client.get_all(user_id=USER_ID, limit=5000)
-    results = raw.get("results", []) if isinstance(raw, dict) else raw
-    if not isinstance(results, list):
-        results = []
+    offset = _parse_cursor(cursor)
+    if cursor is None and limit is None:
+        snapshot = await _run_blocking(memory_snapshot.get)
+        body, etag = snapshot.render(category)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    memories, next_cursor = await _run_blocking(
+        _scroll_page, _qdrant(), cursor=offset, limit=limit or SCROLL_PAGE_SIZE, category=category
+    )
+    return {"memories": memories, "next_cursor": next_cursor}
+
+
+@app.get("/api/memories/stream")
+async def stream_memories(
+    pin: str | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    category: str | None = Query(default=None),
+):
+    """NDJSON, one memory per line, emitted page by page as Qdrant scrolls."""
+    _check_pin(pin)
+    offset = _parse_cursor(cursor)
 
-    memories = []
-    for item in results:
-        if not isinstance(item, dict):
-            continue
-        memory_id = item.get("id")
-        text = item.get("memory", "")
-        metadata = item.get("metadata") if isinstance(item.get("metadata"), dict) else {}
-        category = metadata.get("category", "uncategorized") if isinstance(metadata, dict) else "uncategorized"
-        created_at = item.get("created_at", "")
-        updated_at = item.get("updated_at", "")
-        if not isinstance(memory_id, str) or not isinstance(text, str):
-            continue
-        memories.append({
-            "id": memory_id,
-            "memory": text,
-            "category": category or "uncategorized",
-            "created_at": created_at or "",
-            "updated_at": updated_at or "",
-        })
+    async def lines():
+        qdrant = _qdrant()
+        next_cursor = offset
+        while True:
+            memories, next_cursor = await _run_blocking(
+                _scroll_page, qdrant, cursor=next_cursor, limit=SCROLL_PAGE_SIZE, category=category
+            )
+            for memory in memories:
+                yield json.dumps(memory, ensure_ascii=False) + "\n"
+            if next_cursor is None:
+                return
 
-    return {"memories": memories}
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 
 @app.post("/api/memories")
-def add_memory(body: AddBody, pin: str | None = Query(default=None)):
+async def add_memory(body: AddBody, pin: str | None = Query(default=None)):
     _check_pin(pin)
     client = _require_client()
 
@@ -117,7 +405,10 @@ def add_memory(body: AddBody, pin: str | None = Query(default=None)):
         raise HTTPException(status_code=400, detail="missing or empty memory field")
 
     category = body.category.strip() or "uncategorized"
-    result = client.add(text, user_id=USER_ID, metadata={"category": category})
+    try:
+        result = await _run_blocking(client.add, text, user_id=USER_ID, metadata={"category": category})
+    finally:
+        memory_snapshot.invalidate()
 
     new_id = ""
     if isinstance(result, dict):
@@ -129,7 +420,7 @@ def add_memory(body: AddBody, pin: str | None = Query(default=None)):
 
 
 @app.put("/api/memories/{memory_id}")
-def update_memory(memory_id: str, body: UpdateBody, pin: str | None = Query(default=None)):
+async def update_memory(memory_id: str, body: UpdateBody, pin: str | None = Query(default=None)):
     _check_pin(pin)
     client = _require_client()
 
@@ -137,20 +428,192 @@ def update_memory(memory_id: str, body: UpdateBody, pin: str | None = Query(defa
     if not text:
         raise HTTPException(status_code=400, detail="missing or empty memory field")
 
-    client.update(memory_id, text)
-    if body.category is not None:
-        qdrant = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
-        qdrant.set_payload(
-            collection_name="mem0",
-            payload={"category": body.category},
-            points=[memory_id],
-        )
+    try:
+        await _run_blocking(client.update, memory_id, text)
+        if body.category is not None:
+            await _run_blocking(
+                _qdrant().set_payload,
+                collection_name=COLLECTION_NAME,
+                payload={"category": body.category},
+                points=[memory_id],
+            )
+    finally:
+        memory_snapshot.invalidate()
     return {"ok": True, "id": memory_id, "memory": text, "category": body.category}
 
 
 @app.delete("/api/memories/{memory_id}")
-def delete_memory(memory_id: str, pin: str | None = Query(default=None)):
+async def delete_memory(memory_id: str, pin: str | None = Query(default=None)):
     _check_pin(pin)
     client = _require_client()
-    client.delete(memory_id)
+    try:
+        await _run_blocking(client.delete, memory_id)
+    finally:
+        memory_snapshot.invalidate()
     return {"ok": True, "id": memory_id}
+
+
+def _validate_operation(op: BatchOperation, seen_ids: set[str]) -> str | None:
+    if op.op == "add":
+        return None if (op.memory or "").strip() else "missing or empty memory field"
+    if not op.id:
+        return "missing id"
+    try:
+        uuid.UUID(op.id)
+    except ValueError:
+        return "invalid id"
+    if op.id in seen_ids:
+        return "duplicate id in batch"
+    seen_ids.add(op.id)
+    if op.op == "update" and not (op.memory or "").strip():
+        return "missing or empty memory field"
+    if op.op == "recategorize" and not (op.category or "").strip():
+        return "missing category"
+    return None
+
+
+def _apply_batch(client: Memory, operations: list[BatchOperation]) -> list[dict]:
+    """Applies mixed operations in a fixed number of round trips.
+
+    New texts are embedded with one ``embed_batch`` call, adds and updates go to Qdrant as
+    one upsert, deletes as one ``PointIdsList`` delete and category changes as one
+    ``batch_update_points``. Payloads mirror what ``Memory.add``/``Memory.update`` write
+    and each change gets the same row in Mem0's history store.
+
+    Unlike ``POST /api/memories``, batch adds are stored verbatim: there is no LLM
+    extraction or deduplication against existing memories, which is what makes a single
+    upsert possible.
+    """
+    results = [{"index": i, "op": op.op, "id": op.id, "ok": False} for i, op in enumerate(operations)]
+    seen_ids: set[str] = set()
+    valid: list[int] = []
+    for i, op in enumerate(operations):
+        error = _validate_operation(op, seen_ids)
+        if error:
+            results[i]["error"] = error
+        else:
+            valid.append(i)
+
+    qdrant = _qdrant()
+    existing_ids = [operations[i].id for i in valid if operations[i].op != "add"]
+    existing: dict[str, dict] = {}
+    if existing_ids:
+        for point in qdrant.retrieve(collection_name=COLLECTION_NAME, ids=existing_ids, with_payload=True):
+            payload = point.payload if isinstance(point.payload, dict) else {}
+            if payload.get("user_id") == USER_ID:
+                existing[str(point.id)] = payload
+    for i in list(valid):
+        if operations[i].op != "add" and operations[i].id not in existing:
+            results[i]["error"] = "not found"
+            valid.remove(i)
+
+    written = [i for i in valid if operations[i].op in ("add", "update")]
+    vectors: list[list[float]] = []
+    if written:
+        try:
+            vectors = client.embedding_model.embed_batch([operations[i].memory.strip() for i in written], "add")
+        except Exception as exc:
+            logger.warning("batch embedding failed: %s", exc)
+            for i in written:
+                results[i]["error"] = "embedding failed"
+            valid = [i for i in valid if i not in written]
+            written = []
+
+    now = datetime.now(timezone.utc).isoformat()
+    points: list[models.PointStruct] = []
+    history: list[tuple] = []
+    for i, vector in zip(written, vectors):
+        op = operations[i]
+        text = op.memory.strip()
+        if op.op == "add":
+            memory_id = str(uuid.uuid4())
+            category = (op.category or "").strip() or "uncategorized"
+            payload = {"user_id": USER_ID, "category": category, "created_at": now}
+            results[i].update(id=memory_id, memory=text, category=category)
+            history.append((memory_id, None, text, "ADD", payload["created_at"], now, 0))
+        else:
+            memory_id = op.id
+            previous = existing[memory_id]
+            payload = dict(previous)
+            if op.category is not None:
+                payload["category"] = op.category.strip() or "uncategorized"
+                results[i]["category"] = payload["category"]
+            results[i]["memory"] = text
+            history.append((memory_id, previous.get("data"), text, "UPDATE", previous.get("created_at"), now, 0))
+        payload.update(data=text, hash=hashlib.md5(text.encode()).hexdigest(), updated_at=now)
+        points.append(models.PointStruct(id=memory_id, vector=vector, payload=payload))
+
+    deleted = [i for i in valid if operations[i].op == "delete"]
+    for i in deleted:
+        previous = existing[operations[i].id]
+        history.append((operations[i].id, previous.get("data"), None, "DELETE", previous.get("created_at"), now, 1))
+
+    recategorized: dict[str, list[int]] = {}
+    for i in valid:
+        if operations[i].op == "recategorize":
+            recategorized.setdefault(operations[i].category.strip(), []).append(i)
+
+    def apply(label: str, indexes: list[int], call) -> set[str]:
+        try:
+            call()
+        except Exception as exc:
+            logger.warning("batch %s failed: %s", label, exc)
+            for i in indexes:
+                results[i]["error"] = f"{operations[i].op} failed"
+            return set()
+        for i in indexes:
+            results[i]["ok"] = True
+        return {results[i]["id"] for i in indexes}
+
+    applied: set[str] = set()
+    if points:
+        applied |= apply("upsert", written, lambda: qdrant.upsert(collection_name=COLLECTION_NAME, points=points))
+    if deleted:
+        applied |= apply(
+            "delete",
+            deleted,
+            lambda: qdrant.delete(
+                collection_name=COLLECTION_NAME,
+                points_selector=models.PointIdsList(points=[operations[i].id for i in deleted]),
+            ),
+        )
+    if recategorized:
+        updates = [
+            models.SetPayloadOperation(
+                set_payload=models.SetPayload(payload={"category": category}, points=[operations[i].id for i in indexes])
+            )
+            for category, indexes in recategorized.items()
+        ]
+        apply(
+            "recategorize",
+            [i for indexes in recategorized.values() for i in indexes],
+            lambda: qdrant.batch_update_points(collection_name=COLLECTION_NAME, update_operations=updates),
+        )
+        for category, indexes in recategorized.items():
+            for i in indexes:
+                if results[i]["ok"]:
+                    results[i]["category"] = category
+
+    for memory_id, old, new, event, created_at, updated_at, is_deleted in history:
+        if memory_id not in applied:
+            continue
+        try:
+            client.db.add_history(
+                memory_id, old, new, event, created_at=created_at, updated_at=updated_at, is_deleted=is_deleted
+            )
+        except Exception as exc:
+            logger.warning("batch history write failed for %s: %s", memory_id, exc)
+
+    logger.info("batch applied: %d/%d operations", sum(r["ok"] for r in results), len(results))
+    return results
+
+
+@app.post("/api/memories:batch")
+async def batch_memories(body: BatchBody, pin: str | None = Query(default=None)):
+    _check_pin(pin)
+    client = _require_client()
+    try:
+        results = await _run_blocking(_apply_batch, client, body.operations)
+    finally:
+        memory_snapshot.invalidate()
+    return {"ok": all(r["ok"] for r in results), "results": results}
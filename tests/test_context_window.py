@@ -0,0 +1,85 @@
+"""Tests for the chat-context window manager."""
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from livekit.agents.llm import ChatContext
+
+from bmo.context_window import SUMMARY_MESSAGE_ID, ContextWindow, foldable_items
+
+
+def _history(turns: int) -> ChatContext:
+    history = ChatContext.empty()
+    history.add_message(role="system", content="You are BMO.", id="lk.agent_task.instructions")
+    for i in range(turns):
+        history.add_message(role="user", content=f"question {i} " + "word " * 40)
+        history.add_message(role="assistant", content=f"answer {i} " + "word " * 40)
+    return history
+
+
+class ContextWindowTests(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+
+    async def _summarize(self, previous, lines):
+        self.calls.append((previous, lines))
+        return f"summary of {len(lines)} lines"
+
+    def _compact(self, window: ContextWindow, history: ChatContext) -> ChatContext:
+        state = {"history": history}
+
+        async def apply(edit):
+            state["history"] = edit(state["history"])
+
+        async def run():
+            window.maybe_compact(state["history"], apply)
+            if window._task is not None:
+                await window._task
+
+        asyncio.run(run())
+        return state["history"]
+
+    def test_under_budget_is_untouched(self):
+        window = ContextWindow(budget=100_000, keep_turns=2, summarizer=self._summarize)
+        history = _history(5)
+        self.assertIs(self._compact(window, history), history)
+        self.assertEqual(self.calls, [])
+        self.assertGreater(window.stats.tokens, 0)
+
+    def test_folds_old_turns_and_keeps_instructions_and_recent(self):
+        window = ContextWindow(budget=100, keep_turns=2, summarizer=self._summarize)
+        history = self._compact(window, _history(5))
+
+        ids = [item.id for item in history.items]
+        self.assertEqual(ids[:2], ["lk.agent_task.instructions", SUMMARY_MESSAGE_ID])
+        texts = [m.text_content for m in history.messages() if m.role == "user"]
+        self.assertEqual([t.split()[1] for t in texts], ["3", "4"])
+        self.assertEqual(len(self.calls[0][1]), 6)
+
+        history.add_message(role="user", content="question 5 " + "word " * 40)
+        history.add_message(role="assistant", content="answer 5")
+        history = self._compact(window, history)
+        self.assertEqual(self.calls[1][0], "summary of 6 lines")
+        self.assertEqual(sum(1 for item in history.items if item.id == SUMMARY_MESSAGE_ID), 1)
+
+    def test_failed_summary_keeps_history_below_hard_limit(self):
+        async def failing(previous, lines):
+            raise RuntimeError("boom")
+
+        window = ContextWindow(budget=400, keep_turns=2, summarizer=failing)
+        history = _history(5)
+        self.assertEqual(len(self._compact(window, history).items), len(history.items))
+        self.assertEqual(window.stats.failures, 1)
+
+    def test_recent_turns_are_never_foldable(self):
+        history = _history(2)
+        self.assertEqual(foldable_items(history, keep_turns=2), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""Tests for the caching Mem0 embedder wrapper."""
+
+import itertools
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bmo.embedding_cache import CachingEmbedder, install_embedding_cache
+
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _fake_embedder() -> MagicMock:
+    embedder = MagicMock()
+    embedder.embed.side_effect = lambda text, action=None: [float(len(text)), 1.0]
+    embedder.embed_batch.side_effect = lambda texts, action="add": [[float(len(t)), 2.0] for t in texts]
+    return embedder
+
+
+class CachingEmbedderTests(unittest.TestCase):
+
+    def test_repeat_phrase_hits_cache(self):
+        inner = _fake_embedder()
+        cache = CachingEmbedder(inner, model="m")
+        first = cache.embed("I like coffee", "search")
+        second = cache.embed("  i like   COFFEE ", "add")
+        self.assertEqual(first, second)
+        self.assertEqual(inner.embed.call_count, 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertAlmostEqual(cache.hit_ratio, 0.5)
+
+    def test_model_is_part_of_key(self):
+        inner = _fake_embedder()
+        a = CachingEmbedder(inner, model="a")
+        b = CachingEmbedder(inner, model="b")
+        self.assertNotEqual(a._key("hello"), b._key("hello"))
+
+    def test_lru_eviction(self):
+        inner = _fake_embedder()
+        cache = CachingEmbedder(inner, model="m", max_entries=2)
+        cache.embed("one")
+        cache.embed("two")
+        cache.embed("one")
+        cache.embed("three")
+        cache.embed("two")
+        self.assertEqual(inner.embed.call_count, 4)
+
+    def test_disk_tier_survives_restart(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "cache" / "embeddings.sqlite"
+            inner = _fake_embedder()
+            CachingEmbedder(inner, model="m", disk_path=path).embed("remember me")
+
+            restarted = CachingEmbedder(inner, model="m", disk_path=path)
+            vector = restarted.embed("remember me")
+            self.assertEqual(vector, [11.0, 1.0])
+            self.assertEqual(inner.embed.call_count, 1)
+            self.assertEqual(restarted.disk_hits, 1)
+
+    def test_disk_tier_trims_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "embeddings.sqlite"
+            inner = _fake_embedder()
+            with patch("bmo.embedding_cache.time.time", side_effect=itertools.count()):
+                cache = CachingEmbedder(inner, model="m", max_entries=1, disk_path=path, max_disk_entries=5)
+                for i in range(70):
+                    cache.embed(f"phrase {i}")
+                cache.embed("phrase 66")  # disk hit refreshes its recency
+                restarted = CachingEmbedder(inner, model="m", disk_path=path, max_disk_entries=3)
+
+            rows = sqlite3.connect(str(path)).execute("SELECT key FROM embeddings").fetchall()
+            kept = {key for (key,) in rows}
+            self.assertEqual(kept, {restarted._key(f"phrase {i}") for i in (68, 69, 66)})
+
+    def test_memory_api_copy_is_identical(self):
+        shared = (_REPO_ROOT / "bmo" / "embedding_cache.py").read_bytes()
+        service = (_REPO_ROOT / "services" / "memory-api" / "embedding_cache.py").read_bytes()
+        self.assertEqual(shared, service, "services/memory-api/embedding_cache.py drifted from bmo/embedding_cache.py")
+
+    def test_embed_batch_only_sends_misses(self):
+        inner = _fake_embedder()
+        cache = CachingEmbedder(inner, model="m")
+        cache.embed("cached")
+        vectors = cache.embed_batch(["cached", "new one"])
+        self.assertEqual(vectors, [[6.0, 1.0], [7.0, 2.0]])
+        inner.embed_batch.assert_called_once_with(["new one"], "add")
+
+    def test_embed_batch_without_native_batch_uses_one_gemini_call(self):
+        client = MagicMock()
+        client.models.embed_content.side_effect = lambda model, contents, config: SimpleNamespace(
+            embeddings=[SimpleNamespace(values=[float(len(t))]) for t in contents]
+        )
+        inner = SimpleNamespace(
+            client=client,
+            config=SimpleNamespace(model="models/gemini-embedding-001", embedding_dims=768),
+            embed=MagicMock(),
+        )
+        cache = CachingEmbedder(inner, model="m")
+        self.assertEqual(cache.embed_batch(["one", "three"]), [[3.0], [5.0]])
+        client.models.embed_content.assert_called_once()
+        inner.embed.assert_not_called()
+        self.assertEqual(cache.embed("one"), [3.0])
+
+    def test_install_wraps_once(self):
+        memory = MagicMock()
+        inner = memory.embedding_model
+        install_embedding_cache(memory, model="m", max_entries=8, disk_path=None)
+        install_embedding_cache(memory, model="m", max_entries=8, disk_path=None)
+        self.assertIsInstance(memory.embedding_model, CachingEmbedder)
+        self.assertIs(memory.embedding_model._embedder, inner)
+
+
+if __name__ == "__main__":
+    unittest.main()
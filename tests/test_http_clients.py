@@ -0,0 +1,55 @@
+"""Tests for the pooled outbound HTTP client registry."""
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+
+from bmo.http_clients import HttpClientRegistry, ServiceConfig
+
+
+class HttpClientRegistryTests(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = HttpClientRegistry({"svc": ServiceConfig(timeout=3), "other": ServiceConfig(timeout=5)})
+
+    def test_same_client_within_a_loop_and_per_service_timeouts(self):
+        async def run():
+            first = self.registry.get("svc")
+            self.assertIs(self.registry.get("svc"), first)
+            self.assertEqual(first.timeout.read, 3)
+            self.assertEqual(self.registry.get("other").timeout.read, 5)
+            await self.registry.aclose()
+            self.assertTrue(first.is_closed)
+            self.assertIsNot(self.registry.get("svc"), first)
+            await self.registry.aclose()
+
+        asyncio.run(run())
+
+    def test_client_from_closed_loop_is_replaced(self):
+        async def get():
+            return self.registry.get("svc")
+
+        first = asyncio.run(get())
+        second = asyncio.run(get())
+        self.assertIsNot(first, second)
+
+    def test_requests_are_counted(self):
+        async def run():
+            client = self.registry.get("svc")
+            client._transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"ok": True}))
+            for _ in range(3):
+                resp = await client.get("http://example.invalid/")
+                self.assertEqual(resp.json(), {"ok": True})
+            await self.registry.aclose()
+
+        asyncio.run(run())
+        self.assertEqual(self.registry.stats["svc"].requests, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
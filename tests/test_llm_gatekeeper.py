@@ -0,0 +1,218 @@
+"""Tests for gatekeeper batch parsing and the decision cache."""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bmo import llm_gatekeeper
+from bmo.llm_gatekeeper import DecisionCache, GatekeeperItem, GatekeeperResult
+from bmo.memory_policy import MemoryCategory
+
+
+def _response(payload: dict) -> SimpleNamespace:
+    return SimpleNamespace(parts=None, text=json.dumps(payload))
+
+
+class DecisionCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "decisions.sqlite"
+        self.cache = DecisionCache(ttl=60, max_entries=8, path=self.path)
+        self.client = MagicMock()
+        patches = [
+            patch.object(llm_gatekeeper, "decision_cache", self.cache),
+            patch.object(llm_gatekeeper, "init_gatekeeper_client", return_value=self.client),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_trivially_different_utterances_share_a_decision(self):
+        self.client.models.generate_content.return_value = _response({"store": False, "reason": "transient"})
+        first = llm_gatekeeper.run_llm_gatekeeper(user_text="I like coffee", existing_memories=[{"id": "a"}])
+        second = llm_gatekeeper.run_llm_gatekeeper(user_text="i like coffee.", existing_memories=[{"id": "a"}])
+        self.assertEqual(first.status, "skip")
+        self.assertEqual(first, second)
+        self.assertEqual(self.client.models.generate_content.call_count, 1)
+
+    def test_different_memory_set_misses(self):
+        self.client.models.generate_content.return_value = _response({"store": False, "reason": "transient"})
+        llm_gatekeeper.run_llm_gatekeeper(user_text="I like coffee", existing_memories=[{"id": "a"}])
+        llm_gatekeeper.run_llm_gatekeeper(user_text="I like coffee", existing_memories=[{"id": "b"}])
+        self.assertEqual(self.client.models.generate_content.call_count, 2)
+
+    def test_errors_are_not_cached(self):
+        self.client.models.generate_content.return_value = SimpleNamespace(parts=None, text="not json")
+        llm_gatekeeper.run_llm_gatekeeper(user_text="I like coffee", existing_memories=[])
+        llm_gatekeeper.run_llm_gatekeeper(user_text="I like coffee", existing_memories=[])
+        self.assertEqual(self.client.models.generate_content.call_count, 2)
+
+    def test_store_decision_survives_restart(self):
+        self.client.models.generate_content.return_value = _response(
+            {"store": True, "actions": [{"op": "add", "category": "preferences", "text": "Likes coffee."}]}
+        )
+        llm_gatekeeper.run_llm_gatekeeper(user_text="I like coffee", existing_memories=[])
+
+        restarted = DecisionCache(ttl=60, max_entries=8, path=self.path)
+        cached = restarted.get(DecisionCache.key("I like coffee", [], llm_gatekeeper._DEFAULT_MODEL))
+        self.assertIsNotNone(cached)
+        self.assertEqual(cached.actions[0].category, MemoryCategory.PREFERENCES)
+
+    def test_database_is_opened_lazily(self):
+        path = Path(self.tmp.name) / "lazy" / "decisions.sqlite"
+        cache = DecisionCache(ttl=60, max_entries=8, path=path)
+        self.assertFalse(path.exists())
+        cache.put("k", GatekeeperResult(actions=(), reason="skip", status="skip"))
+        self.assertTrue(path.exists())
+
+    def test_async_access_keeps_disk_work_off_the_loop(self):
+        cache = DecisionCache(ttl=60, max_entries=8, path=self.path)
+        restarted = DecisionCache(ttl=60, max_entries=8, path=self.path)
+        result = GatekeeperResult(actions=(), reason="skip", status="skip")
+
+        async def run():
+            await cache.aput("a", result)
+            with patch("bmo.llm_gatekeeper.asyncio.to_thread", wraps=asyncio.to_thread) as to_thread:
+                hit = await cache.aget("a")
+                self.assertEqual(to_thread.call_count, 0)
+                from_disk = await restarted.aget("a")
+                self.assertEqual(to_thread.call_count, 1)
+            return hit, from_disk
+
+        self.assertEqual(asyncio.run(run()), (result, result))
+
+    def test_batch_decisions_are_stored_in_one_flush(self):
+        self.client.models.generate_content.return_value = _response(
+            {"results": [{"index": 0, "store": False}, {"index": 1, "store": False}]}
+        )
+        items = [GatekeeperItem(user_text=t, existing_memories=[]) for t in ("first one", "second one")]
+        with patch.object(self.cache, "flush", wraps=self.cache.flush) as flush:
+            llm_gatekeeper.run_llm_gatekeeper_batch(items)
+        flush.assert_called_once()
+
+        restarted = DecisionCache(ttl=60, max_entries=8, path=self.path)
+        model = llm_gatekeeper._DEFAULT_MODEL
+        self.assertEqual([restarted.get(restarted.key(i.user_text, [], model)).status for i in items], ["skip", "skip"])
+
+    def test_expired_entries_miss(self):
+        cache = DecisionCache(ttl=-1, max_entries=8, path=None)
+        key = DecisionCache.key("hello", [], "m")
+        cache.put(key, GatekeeperResult(actions=(), reason="skip", status="skip"))
+        self.assertIsNone(cache.get(key))
+
+
+class AsyncGatekeeperTests(unittest.TestCase):
+
+    def setUp(self):
+        self.client = MagicMock()
+        self.active = 0
+        self.peak = 0
+        self.delay = 0.0
+        self.client.aio.models.generate_content = self._generate
+        patches = [
+            patch.object(llm_gatekeeper, "decision_cache", DecisionCache(ttl=60, max_entries=32, path=None)),
+            patch.object(llm_gatekeeper, "init_gatekeeper_client", return_value=self.client),
+            patch.object(llm_gatekeeper, "_semaphore", None),
+            patch.object(llm_gatekeeper, "_MAX_CONCURRENCY", 2),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    async def _generate(self, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        return _response({"store": False, "reason": "transient"})
+
+    def test_slow_model_call_times_out_into_an_error(self):
+        self.delay = 1.0
+
+        async def run():
+            return await llm_gatekeeper.arun_llm_gatekeeper(
+                user_text="I like coffee", existing_memories=[], timeout=0.05
+            )
+
+        result = asyncio.run(run())
+        self.assertEqual((result.status, result.reason), ("error", "timeout"))
+        self.assertEqual(self.active, 0)
+        cache = llm_gatekeeper.decision_cache
+        self.assertIsNone(cache.get(cache.key("I like coffee", [], llm_gatekeeper._DEFAULT_MODEL)))
+
+    def test_concurrent_calls_never_exceed_the_limit(self):
+        self.delay = 0.02
+
+        async def run():
+            return await asyncio.gather(
+                *(
+                    llm_gatekeeper.arun_llm_gatekeeper(user_text=f"utterance {i}", existing_memories=[], timeout=5)
+                    for i in range(8)
+                )
+            )
+
+        results = asyncio.run(run())
+        self.assertEqual([r.status for r in results], ["skip"] * 8)
+        self.assertEqual(self.peak, 2)
+
+
+class BatchGatekeeperTests(unittest.TestCase):
+
+    def setUp(self):
+        self.client = MagicMock()
+        patches = [
+            patch.object(llm_gatekeeper, "decision_cache", DecisionCache(ttl=60, max_entries=8, path=None)),
+            patch.object(llm_gatekeeper, "init_gatekeeper_client", return_value=self.client),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_batch_isolates_bad_items(self):
+        self.client.models.generate_content.return_value = _response(
+            {
+                "results": [
+                    {"index": 1, "store": False, "reason": "transient"},
+                    {"index": 0, "store": True, "actions": [{"op": "add", "category": "goals", "text": "Goal: ship."}]},
+                    {"index": 2, "store": True, "actions": [{"op": "bogus"}]},
+                ]
+            }
+        )
+        items = [GatekeeperItem(user_text=f"utterance {i}", existing_memories=[]) for i in range(4)]
+        results = llm_gatekeeper.run_llm_gatekeeper_batch(items)
+
+        self.assertEqual([r.status for r in results], ["store", "skip", "error", "error"])
+        self.assertEqual(results[3].reason, "missing_batch_result")
+        self.client.models.generate_content.assert_called_once()
+
+    def test_batch_only_sends_cache_misses(self):
+        self.client.models.generate_content.return_value = _response({"store": False, "reason": "transient"})
+        llm_gatekeeper.run_llm_gatekeeper(user_text="cached one", existing_memories=[])
+
+        self.client.models.generate_content.return_value = _response(
+            {"results": [{"index": 0, "store": False}, {"index": 1, "store": False}]}
+        )
+        items = [GatekeeperItem(user_text=t, existing_memories=[]) for t in ("cached one", "new a", "new b")]
+        results = llm_gatekeeper.run_llm_gatekeeper_batch(items)
+
+        self.assertEqual([r.status for r in results], ["skip", "skip", "skip"])
+        sent = json.loads(self.client.models.generate_content.call_args.kwargs["contents"][1]["parts"][0]["text"])
+        self.assertEqual([item["user_text"] for item in sent["items"]], ["new a", "new b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,12 @@
 """Tests for the FastAPI memory API service."""
 
+import hashlib
+import json
 import sys
 import os
 import unittest
+import uuid
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "services", "memory-api"))
@@ -14,20 +18,47 @@ with patch.dict(os.environ, {"QDRANT_HOST": "localhost", "GOOGLE_API_KEY": "fake
 from fastapi.testclient import TestClient
 
 
+def _point(point_id: str, text: str, **payload) -> SimpleNamespace:
+    return SimpleNamespace(id=point_id, payload={"data": text, "user_id": "glenn", **payload})
+
+
+def _scrolling(*pages):
+    """Patches ``main.QdrantClient`` so ``scroll`` walks ``pages`` (lists of points) by cursor."""
+    def scroll(**kwargs):
+        if kwargs.get("order_by") is not None:
+            return qdrant.latest_update(**kwargs)
+        index = int(kwargs["offset"] or 0)
+        next_offset = str(index + 1) if index + 1 < len(pages) else None
+        return pages[index], next_offset
+
+    qdrant = MagicMock()
+    qdrant.scroll.side_effect = scroll
+    qdrant.latest_update.return_value = ([], None)
+    return patch("main.QdrantClient", return_value=qdrant), qdrant
+
+
+def _page_scrolls(qdrant: MagicMock) -> int:
+    """Scroll calls that walked memory pages, not the snapshot's ``updated_at`` probe."""
+    return sum(1 for c in qdrant.scroll.call_args_list if c.kwargs.get("order_by") is None)
+
+
 class MemoryApiTests(unittest.TestCase):
 
     def setUp(self):
         self.client = TestClient(memory_api_main.app)
+        memory_api_main.memory_snapshot.invalidate()
+        self.addCleanup(memory_api_main.memory_snapshot.invalidate)
+        qdrant_patch = patch.object(memory_api_main, "_qdrant_client", None)
+        qdrant_patch.start()
+        self.addCleanup(qdrant_patch.stop)
 
-    @patch.object(memory_api_main, "mem0_client")
-    def test_get_memories_valid_pin(self, mock_client: MagicMock):
-        mock_client.get_all.return_value = {
-            "results": [
-                {"id": "a1", "memory": "Likes coffee", "metadata": {"category": "preferences"}},
-                {"id": "a2", "memory": "Name is Glenn", "metadata": {"category": "personal_facts"}},
-            ]
-        }
-        resp = self.client.get("/api/memories?pin=4869")
+    def test_get_memories_valid_pin(self):
+        patcher, _ = _scrolling([
+            _point("a1", "Likes coffee", category="preferences"),
+            _point("a2", "Name is Glenn", category="personal_facts"),
+        ])
+        with patcher:
+            resp = self.client.get("/api/memories?pin=4869")
         self.assertEqual(resp.status_code, 200)
         body = resp.json()
         self.assertIn("memories", body)
@@ -70,37 +101,324 @@ class MemoryApiTests(unittest.TestCase):
         )
         self.assertEqual(resp.status_code, 401)
 
-    @patch.object(memory_api_main, "mem0_client")
-    def test_get_memories_uncategorized_fallback(self, mock_client: MagicMock):
-        mock_client.get_all.return_value = {
-            "results": [
-                {"id": "b1", "memory": "Some note", "metadata": {}},
-            ]
-        }
-        resp = self.client.get("/api/memories?pin=4869")
+    def test_get_memories_uncategorized_fallback(self):
+        patcher, _ = _scrolling([_point("b1", "Some note")])
+        with patcher:
+            resp = self.client.get("/api/memories?pin=4869")
         self.assertEqual(resp.status_code, 200)
         body = resp.json()
         self.assertEqual(body["memories"][0]["category"], "uncategorized")
 
-    @patch.object(memory_api_main, "mem0_client")
-    def test_get_memories_includes_timestamps(self, mock_client: MagicMock):
-        mock_client.get_all.return_value = {
-            "results": [
-                {
-                    "id": "t1",
-                    "memory": "Test",
-                    "metadata": {"category": "goals"},
-                    "created_at": "2025-01-15T10:00:00Z",
-                    "updated_at": "2025-01-16T12:00:00Z",
-                },
-            ]
-        }
-        resp = self.client.get("/api/memories?pin=4869")
+    def test_get_memories_includes_timestamps(self):
+        patcher, _ = _scrolling([
+            _point(
+                "t1",
+                "Test",
+                category="goals",
+                created_at="2025-01-15T10:00:00Z",
+                updated_at="2025-01-16T12:00:00Z",
+            ),
+        ])
+        with patcher:
+            resp = self.client.get("/api/memories?pin=4869")
         self.assertEqual(resp.status_code, 200)
         mem = resp.json()["memories"][0]
         self.assertEqual(mem["created_at"], "2025-01-15T10:00:00Z")
         self.assertEqual(mem["updated_at"], "2025-01-16T12:00:00Z")
 
+    def test_get_memories_without_cursor_walks_every_page(self):
+        patcher, qdrant = _scrolling([_point("p1", "One")], [_point("p2", "Two")], [_point("p3", "Three")])
+        with patcher:
+            resp = self.client.get("/api/memories?pin=4869")
+        self.assertEqual([m["id"] for m in resp.json()["memories"]], ["p1", "p2", "p3"])
+        self.assertNotIn("next_cursor", resp.json())
+        self.assertEqual(_page_scrolls(qdrant), 3)
+
+    def test_get_memories_cursor_pagination(self):
+        patcher, qdrant = _scrolling([_point("p1", "One")], [_point("p2", "Two")])
+        with patcher:
+            first = self.client.get("/api/memories?pin=4869&limit=1").json()
+            second = self.client.get(f"/api/memories?pin=4869&limit=1&cursor={first['next_cursor']}").json()
+        self.assertEqual((first["memories"][0]["id"], first["next_cursor"]), ("p1", "1"))
+        self.assertEqual((second["memories"][0]["id"], second["next_cursor"]), ("p2", None))
+        self.assertEqual(qdrant.scroll.call_args.kwargs["limit"], 1)
+
+    def test_malformed_cursor_is_rejected(self):
+        patcher, qdrant = _scrolling([_point("p1", "One")])
+        with patcher:
+            for path in (
+                "/api/memories?pin=4869&limit=1&cursor=not-an-id",
+                "/api/memories?pin=4869&limit=1&cursor=%C2%B2",
+                "/api/memories?pin=4869&limit=1&cursor=%D9%A3",
+                "/api/memories/stream?pin=4869&cursor=-1",
+            ):
+                resp = self.client.get(path)
+                self.assertEqual(resp.status_code, 400, path)
+                self.assertEqual(resp.json()["detail"], "invalid cursor")
+        qdrant.scroll.assert_not_called()
+
+    def test_uuid_cursor_is_passed_to_qdrant(self):
+        point_id = str(uuid.uuid4())
+        patcher, qdrant = _scrolling([])
+        qdrant.scroll.side_effect = None
+        qdrant.scroll.return_value = ([], None)
+        with patcher:
+            resp = self.client.get(f"/api/memories?pin=4869&limit=1&cursor={point_id.upper()}")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(qdrant.scroll.call_args.kwargs["offset"], point_id)
+
+    def test_get_memories_category_filter(self):
+        patcher, qdrant = _scrolling([_point("g1", "Goal", category="goals")])
+        with patcher:
+            self.client.get("/api/memories?pin=4869&category=goals&limit=10")
+        conditions = qdrant.scroll.call_args.kwargs["scroll_filter"].must
+        self.assertEqual([(c.key, c.match.value) for c in conditions], [("user_id", "glenn"), ("category", "goals")])
+
+    def test_stream_memories_ndjson(self):
+        patcher, _ = _scrolling([_point("s1", "One"), _point("s2", "Two")], [_point("s3", "Three")])
+        with patcher:
+            resp = self.client.get("/api/memories/stream?pin=4869")
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.headers["content-type"].startswith("application/x-ndjson"))
+        lines = [json.loads(line) for line in resp.text.splitlines()]
+        self.assertEqual([m["id"] for m in lines], ["s1", "s2", "s3"])
+
+    def test_unchanged_list_answers_304(self):
+        patcher, qdrant = _scrolling([_point("e1", "One", category="goals")])
+        with patcher:
+            first = self.client.get("/api/memories?pin=4869")
+            etag = first.headers["etag"]
+            again = self.client.get("/api/memories?pin=4869", headers={"If-None-Match": etag})
+            filtered = self.client.get("/api/memories?pin=4869&category=other", headers={"If-None-Match": etag})
+        self.assertTrue(etag.startswith('"'))
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.headers["etag"], etag)
+        self.assertEqual(filtered.status_code, 200)
+        self.assertEqual(filtered.json(), {"memories": []})
+        self.assertEqual(_page_scrolls(qdrant), 1)
+
+    @patch.object(memory_api_main, "mem0_client")
+    def test_own_write_invalidates_snapshot(self, mock_client: MagicMock):
+        mock_client.add.return_value = {"results": [{"id": "new1"}]}
+        patcher, qdrant = _scrolling([_point("e1", "One")])
+        with patcher:
+            etag = self.client.get("/api/memories?pin=4869").headers["etag"]
+            qdrant.scroll.side_effect = None
+            qdrant.scroll.return_value = ([_point("e1", "One"), _point("new1", "New")], None)
+            self.client.post("/api/memories?pin=4869", json={"memory": "New"})
+            resp = self.client.get("/api/memories?pin=4869", headers={"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp.headers["etag"], etag)
+        self.assertEqual(len(resp.json()["memories"]), 2)
+
+    @patch.object(memory_api_main, "mem0_client")
+    def test_every_write_endpoint_changes_the_etag(self, mock_client: MagicMock):
+        existing = str(uuid.uuid4())
+        mock_client.add.return_value = {"results": [{"id": "new1"}]}
+        writes = (
+            ("put", f"/api/memories/{existing}?pin=4869", {"memory": "One, edited"}),
+            ("delete", f"/api/memories/{existing}?pin=4869", None),
+            ("post", "/api/memories?pin=4869", {"memory": "New"}),
+            ("post", "/api/memories:batch?pin=4869", {"operations": [{"op": "delete", "id": existing}]}),
+        )
+        # Qdrant keeps returning the same list: only the generation can change the ETag.
+        patcher, qdrant = _scrolling([_point(existing, "One")])
+        qdrant.retrieve.return_value = [_point(existing, "One")]
+        with patcher:
+            etag = self.client.get("/api/memories?pin=4869").headers["etag"]
+            for method, path, body in writes:
+                with self.subTest(path=path, method=method):
+                    kwargs = {"json": body} if body is not None else {}
+                    self.assertEqual(getattr(self.client, method)(path, **kwargs).status_code, 200)
+                    resp = self.client.get("/api/memories?pin=4869", headers={"If-None-Match": etag})
+                    self.assertEqual(resp.status_code, 200)
+                    self.assertNotEqual(resp.headers["etag"], etag)
+                    etag = resp.headers["etag"]
+
+    def test_failed_write_still_invalidates(self):
+        generation = memory_api_main.memory_snapshot.generation
+        with patch.object(memory_api_main, "mem0_client") as mock_client:
+            mock_client.delete.side_effect = RuntimeError("qdrant down")
+            with self.assertRaises(RuntimeError):
+                self.client.delete("/api/memories/abc?pin=4869")
+        self.assertEqual(memory_api_main.memory_snapshot.generation, generation + 1)
+
+    def test_write_during_rebuild_is_not_served_stale(self):
+        cache = memory_api_main.SnapshotCache(probe_interval=300, max_age=300)
+        patcher, qdrant = _scrolling([_point("e1", "One")])
+        with patcher:
+            qdrant.get_collection.return_value = SimpleNamespace(points_count=1)
+            qdrant.scroll.side_effect = lambda **kwargs: (cache.invalidate(), ([_point("e1", "One")], None))[1]
+            first = cache.get()
+            qdrant.scroll.side_effect = None
+            qdrant.scroll.return_value = ([_point("e1", "One, edited")], None)
+            second = cache.get()
+        self.assertIsNot(second, first)
+        self.assertEqual(second.memories[0]["memory"], "One, edited")
+        self.assertIs(cache.get(), second)
+
+    def test_collection_probe_detects_external_writes(self):
+        cache = memory_api_main.SnapshotCache(probe_interval=0, max_age=300)
+        patcher, qdrant = _scrolling([_point("e1", "One")])
+        with patcher:
+            qdrant.get_collection.return_value = SimpleNamespace(points_count=1)
+            first = cache.get()
+            self.assertIs(cache.get(), first)
+            qdrant.get_collection.return_value = SimpleNamespace(points_count=2)
+            self.assertIsNot(cache.get(), first)
+        self.assertEqual(_page_scrolls(qdrant), 2)
+
+    def test_collection_probe_detects_in_place_agent_edits(self):
+        cache = memory_api_main.SnapshotCache(probe_interval=0, max_age=300)
+        patcher, qdrant = _scrolling([_point("e1", "One")])
+        stamped = lambda ts: ([SimpleNamespace(id="e1", payload={"updated_at": ts})], None)
+        with patcher:
+            qdrant.get_collection.return_value = SimpleNamespace(points_count=1)
+            qdrant.latest_update.return_value = stamped("2025-01-16T12:00:00-08:00")
+            first = cache.get()
+            self.assertIs(cache.get(), first)
+            # Same point count, newer updated_at: Memory.update from the agent.
+            qdrant.latest_update.return_value = stamped("2025-01-16T12:05:00-08:00")
+            self.assertIsNot(cache.get(), first)
+
+        probe = qdrant.latest_update.call_args.kwargs
+        self.assertEqual((probe["order_by"].key, probe["order_by"].direction), ("updated_at", "desc"))
+        self.assertEqual(probe["limit"], 1)
+
+    def test_probe_without_updated_at_index_falls_back_to_count(self):
+        patcher, qdrant = _scrolling([_point("e1", "One")])
+        qdrant.latest_update.side_effect = RuntimeError("no range index for order_by key")
+        with patcher:
+            qdrant.get_collection.return_value = SimpleNamespace(points_count=4)
+            self.assertEqual(memory_api_main._collection_version(), (4, None))
+
+    @patch.object(memory_api_main, "mem0_client")
+    def test_lifespan_shares_one_grpc_qdrant_client(self, mock_client: MagicMock):
+        with patch("main.QdrantClient") as MockQdrant:
+            with TestClient(memory_api_main.app) as client:
+                for _ in range(3):
+                    client.put("/api/memories/abc123?pin=4869", json={"memory": "Updated", "category": "goals"})
+            MockQdrant.assert_called_once()
+            self.assertTrue(MockQdrant.call_args.kwargs["prefer_grpc"])
+            self.assertEqual(MockQdrant.return_value.set_payload.call_count, 3)
+            MockQdrant.return_value.close.assert_called_once()
+            index = MockQdrant.return_value.create_payload_index.call_args.kwargs
+            self.assertEqual((index["field_name"], index["field_schema"]), ("updated_at", "datetime"))
+        self.assertIsNone(memory_api_main._qdrant_client)
+
+    @patch.object(memory_api_main, "mem0_client")
+    def test_batch_mixed_operations(self, mock_client: MagicMock):
+        keep, drop, move = (str(uuid.UUID(int=n)) for n in (1, 2, 3))
+        mock_client.embedding_model.embed_batch.return_value = [[0.1, 0.2], [0.3, 0.4]]
+        with patch("main.QdrantClient") as MockQdrant:
+            qdrant = MockQdrant.return_value
+            qdrant.retrieve.return_value = [
+                _point(keep, "Old text", category="misc", created_at="2025-01-01T00:00:00Z"),
+                _point(drop, "Stale"),
+                _point(move, "Moving"),
+            ]
+            resp = self.client.post(
+                "/api/memories:batch?pin=4869",
+                json={
+                    "operations": [
+                        {"op": "add", "memory": " New fact ", "category": "personal_facts"},
+                        {"op": "update", "id": keep, "memory": "New text", "category": "goals"},
+                        {"op": "delete", "id": drop},
+                        {"op": "recategorize", "id": move, "category": "preferences"},
+                        {"op": "delete", "id": str(uuid.UUID(int=9))},
+                        {"op": "delete", "id": "not-a-uuid"},
+                        {"op": "add", "memory": "  "},
+                    ]
+                },
+            )
+
+        self.assertEqual(resp.status_code, 200)
+        body = resp.json()
+        self.assertFalse(body["ok"])
+        self.assertEqual([r["ok"] for r in body["results"]], [True, True, True, True, False, False, False])
+        self.assertEqual(
+            [r.get("error") for r in body["results"][4:]],
+            ["not found", "invalid id", "missing or empty memory field"],
+        )
+        new_id = body["results"][0]["id"]
+        uuid.UUID(new_id)
+        self.assertEqual(body["results"][1]["category"], "goals")
+
+        # One embedding call and one Qdrant call per kind of write; Mem0's per-item paths are unused.
+        mock_client.embedding_model.embed_batch.assert_called_once_with(["New fact", "New text"], "add")
+        mock_client.add.assert_not_called()
+        mock_client.update.assert_not_called()
+        mock_client.delete.assert_not_called()
+        points = qdrant.upsert.call_args.kwargs["points"]
+        self.assertEqual([(p.id, p.vector) for p in points], [(new_id, [0.1, 0.2]), (keep, [0.3, 0.4])])
+        added, updated = (p.payload for p in points)
+        self.assertEqual((added["data"], added["user_id"], added["category"]), ("New fact", "glenn", "personal_facts"))
+        self.assertEqual(added["created_at"], added["updated_at"])
+        self.assertEqual((updated["data"], updated["category"]), ("New text", "goals"))
+        self.assertEqual(updated["created_at"], "2025-01-01T00:00:00Z")
+        self.assertEqual(updated["hash"], hashlib.md5(b"New text").hexdigest())
+        self.assertEqual(qdrant.delete.call_args.kwargs["points_selector"].points, [drop])
+        operations = qdrant.batch_update_points.call_args.kwargs["update_operations"]
+        self.assertEqual(
+            [(o.set_payload.payload, o.set_payload.points) for o in operations],
+            [({"category": "preferences"}, [move])],
+        )
+        self.assertEqual(
+            [(c.args[0], c.args[1], c.args[2], c.args[3]) for c in mock_client.db.add_history.call_args_list],
+            [(new_id, None, "New fact", "ADD"), (keep, "Old text", "New text", "UPDATE"), (drop, "Stale", None, "DELETE")],
+        )
+
+    @patch.object(memory_api_main, "mem0_client")
+    def test_batch_failures_are_reported_per_item(self, mock_client: MagicMock):
+        target, other, edited = str(uuid.UUID(int=4)), str(uuid.UUID(int=5)), str(uuid.UUID(int=6))
+        mock_client.embedding_model.embed_batch.return_value = [[0.5, 0.5]]
+        with patch("main.QdrantClient") as MockQdrant:
+            qdrant = MockQdrant.return_value
+            qdrant.retrieve.return_value = [_point(target, "Stale"), _point(other, "Other"), _point(edited, "Old")]
+            qdrant.delete.side_effect = RuntimeError("qdrant down")
+            qdrant.batch_update_points.side_effect = RuntimeError("qdrant down")
+            resp = self.client.post(
+                "/api/memories:batch?pin=4869",
+                json={
+                    "operations": [
+                        {"op": "delete", "id": target},
+                        {"op": "delete", "id": target},
+                        {"op": "recategorize", "id": other, "category": "goals"},
+                        {"op": "update", "id": edited, "memory": "New"},
+                    ]
+                },
+            )
+        results = resp.json()["results"]
+        self.assertEqual(
+            [r.get("error") for r in results], ["delete failed", "duplicate id in batch", "recategorize failed", None]
+        )
+        self.assertEqual([r["ok"] for r in results], [False, False, False, True])
+        # Only the applied update gets a history row.
+        self.assertEqual([c.args[3] for c in mock_client.db.add_history.call_args_list], ["UPDATE"])
+
+    @patch.object(memory_api_main, "mem0_client")
+    def test_batch_embedding_failure_fails_only_text_writes(self, mock_client: MagicMock):
+        target = str(uuid.UUID(int=7))
+        mock_client.embedding_model.embed_batch.side_effect = RuntimeError("quota")
+        with patch("main.QdrantClient") as MockQdrant:
+            qdrant = MockQdrant.return_value
+            qdrant.retrieve.return_value = [_point(target, "Stale")]
+            resp = self.client.post(
+                "/api/memories:batch?pin=4869",
+                json={"operations": [{"op": "add", "memory": "New"}, {"op": "delete", "id": target}]},
+            )
+        results = resp.json()["results"]
+        self.assertEqual([(r["ok"], r.get("error")) for r in results], [(False, "embedding failed"), (True, None)])
+        qdrant.upsert.assert_not_called()
+
+    def test_batch_wrong_pin(self):
+        resp = self.client.post("/api/memories:batch?pin=0000", json={"operations": [{"op": "delete", "id": "x"}]})
+        self.assertEqual(resp.status_code, 401)
+
+    def test_stream_memories_wrong_pin(self):
+        resp = self.client.get("/api/memories/stream?pin=0000")
+        self.assertEqual(resp.status_code, 401)
+
     @patch.object(memory_api_main, "mem0_client")
     def test_add_memory_valid(self, mock_client: MagicMock):
         mock_client.add.return_value = {"results": [{"id": "new1"}]}
@@ -0,0 +1,84 @@
+"""Tests for cross-turn deduplication of injected Mem0 memories."""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from livekit.agents.llm import ChatContext
+
+from bmo.memory_injection import (
+    MEMORY_BLOCK_ID,
+    MemoryInjector,
+    apply_memory_message,
+    estimate_tokens,
+    known_memories,
+    memory_tokens,
+)
+
+COFFEE = {"id": "a", "memory": "Likes coffee."}
+BROTHER = {"id": "b", "memory": "Has a brother named Elp."}
+CEBU = {"id": "c", "memory": "Lives in Cebu."}
+
+
+def _run_turns(injector: MemoryInjector, turns: list[list[dict]]) -> ChatContext:
+    history = ChatContext.empty()
+    history.add_message(role="system", content="You are BMO.")
+    for hits in turns:
+        message = injector.build(history, hits)
+        if message is not None:
+            apply_memory_message(history, message)
+        history.add_message(role="user", content="hello")
+    return history
+
+
+class MemoryInjectorTests(unittest.TestCase):
+
+    def test_append_injects_only_new_memories(self):
+        injector = MemoryInjector(mode="APPEND")
+        history = _run_turns(injector, [[COFFEE, BROTHER], [COFFEE, CEBU], [COFFEE]])
+
+        blocks = [m.text_content for m in history.messages() if m.role == "system"][1:]
+        self.assertEqual(blocks, ["Mem0 Memories:\n- Likes coffee.\n- Has a brother named Elp.", "Mem0 Memories:\n- Lives in Cebu."])
+        self.assertEqual((injector.stats.injected, injector.stats.repeated), (3, 2))
+        # Persisted blocks are the cost: the last turn carries both, against one hit's worth.
+        self.assertEqual(injector.stats.memory_tokens, sum(estimate_tokens(b) for b in blocks))
+        self.assertEqual(injector.stats.memory_tokens, memory_tokens(history))
+        self.assertEqual(
+            injector.stats.last_saved_tokens,
+            estimate_tokens("Mem0 Memories:\n- Likes coffee.") - injector.stats.memory_tokens,
+        )
+        self.assertLess(injector.stats.saved_tokens, 0)
+
+    def test_rolling_cost_stays_bounded(self):
+        injector = MemoryInjector(mode="ROLLING", max_block=2)
+        history = _run_turns(injector, [[COFFEE], [BROTHER], [CEBU], [COFFEE]])
+
+        block = history.get_by_id(MEMORY_BLOCK_ID)
+        self.assertEqual(injector.stats.memory_tokens, estimate_tokens(block.text_content))
+        self.assertEqual(memory_tokens(history), injector.stats.memory_tokens)
+        self.assertEqual(list(known_memories(history)), ["c", "a"])
+
+    def test_rolling_is_the_default_mode(self):
+        self.assertEqual(MemoryInjector().mode, "ROLLING")
+
+    def test_rolling_block_is_replaced_in_place(self):
+        injector = MemoryInjector(mode="ROLLING", max_block=2)
+        history = _run_turns(injector, [[COFFEE], [BROTHER], [CEBU]])
+
+        system = [m for m in history.messages() if m.role == "system"]
+        self.assertEqual(len(system), 2)
+        self.assertEqual(history.index_by_id(MEMORY_BLOCK_ID), 1)
+        self.assertEqual(list(known_memories(history)), ["b", "c"])
+
+    def test_trimmed_memories_become_eligible_again(self):
+        injector = MemoryInjector(mode="APPEND")
+        history = _run_turns(injector, [[COFFEE]])
+        history.items[:] = [m for m in history.items if not (m.type == "message" and m.extra)]
+
+        self.assertIsNotNone(injector.build(history, [COFFEE]))
+
+
+if __name__ == "__main__":
+    unittest.main()
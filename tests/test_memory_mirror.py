@@ -0,0 +1,161 @@
+"""Tests for the in-process Mem0 vector mirror, using an in-memory Qdrant collection."""
+
+import os
+import sys
+import time
+import unittest
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, FieldCondition, Filter, MatchValue, PointStruct, VectorParams
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bmo import memory_mirror
+from bmo.memory_mirror import MemoryMirror
+
+_COLLECTION = "mem0"
+_USER = "glenn"
+
+# Fixed 4-d vectors; several are close to each other so ranking order matters.
+_MEMORIES = {
+    "Likes iced coffee.": [0.9, 0.1, 0.0, 0.1],
+    "Prefers oat milk.": [0.8, 0.3, 0.1, 0.0],
+    "Lives in Cebu City.": [0.0, 1.0, 0.2, 0.0],
+    "Works as an engineer.": [0.1, 0.2, 1.0, 0.3],
+    "Goal: ship the memory service.": [0.2, 0.0, 0.9, 0.8],
+    "Has a brother named Elp.": [0.0, 0.1, 0.1, 1.0],
+    "Dislikes waking up early.": [-0.5, 0.5, 0.0, 0.2],
+}
+
+
+def _memory_id(text: str) -> str:
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, text))
+
+
+class MemoryMirrorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.qdrant = QdrantClient(":memory:")
+        self.qdrant.create_collection(_COLLECTION, vectors_config=VectorParams(size=4, distance=Distance.COSINE))
+        self._upsert(_MEMORIES)
+        self._upsert({"Someone else's memory.": [0.9, 0.1, 0.0, 0.1]}, user_id="other")
+
+        store = SimpleNamespace(client=self.qdrant, collection_name=_COLLECTION)
+        p = patch.object(memory_mirror, "_vector_store", lambda: store)
+        p.start()
+        self.addCleanup(p.stop)
+
+        self.mirror = MemoryMirror(user_id=_USER, reconcile_seconds=3600)
+        self.mirror.load()
+
+    def _upsert(self, memories: dict, *, user_id: str = _USER) -> None:
+        self.qdrant.upsert(
+            _COLLECTION,
+            points=[
+                PointStruct(id=_memory_id(text), vector=vector, payload={"data": text, "user_id": user_id, "category": "x"})
+                for text, vector in memories.items()
+            ],
+        )
+
+    def _qdrant_top(self, query: list[float], limit: int) -> list[tuple[str, float]]:
+        hits = self.qdrant.query_points(
+            _COLLECTION,
+            query=query,
+            query_filter=Filter(must=[FieldCondition(key="user_id", match=MatchValue(value=_USER))]),
+            limit=limit,
+        ).points
+        return [(str(hit.id), hit.score) for hit in hits]
+
+    def _assert_matches_qdrant(self, query: list[float], limit: int) -> None:
+        expected = self._qdrant_top(query, limit)
+        got = self.mirror.search(query, limit)
+        self.assertEqual([row["id"] for row in got], [mid for mid, _ in expected])
+        for row, (_, score) in zip(got, expected):
+            self.assertAlmostEqual(row["score"], score, places=5)
+
+    def test_load_keeps_only_the_users_memories(self):
+        self.assertTrue(self.mirror.ready)
+        self.assertEqual(len(self.mirror), len(_MEMORIES))
+        row = self.mirror.search([0.9, 0.1, 0.0, 0.1], 1)[0]
+        self.assertEqual(row["memory"], "Likes iced coffee.")
+        self.assertEqual(row["metadata"], {"category": "x"})
+
+    def test_top_k_matches_qdrant_search(self):
+        queries = ([1.0, 0.2, 0.0, 0.0], [0.0, 0.0, 1.0, 1.0], [0.3, 0.3, 0.3, 0.3], [-1.0, 0.0, 0.0, 0.0])
+        for query in queries:
+            for limit in (1, 3, len(_MEMORIES), len(_MEMORIES) + 5):
+                with self.subTest(query=query, limit=limit):
+                    self._assert_matches_qdrant(query, limit)
+
+    def test_refresh_picks_up_updates_and_new_points(self):
+        self._upsert({"Likes iced coffee.": [0.0, 0.0, 0.0, 1.0], "Has a cat named Mochi.": [1.0, 0.0, 0.0, 0.0]})
+        self.mirror.refresh([_memory_id("Likes iced coffee."), _memory_id("Has a cat named Mochi.")])
+
+        self.assertEqual(len(self.mirror), len(_MEMORIES) + 1)
+        self._assert_matches_qdrant([1.0, 0.0, 0.0, 0.0], 4)
+        self._assert_matches_qdrant([0.0, 0.0, 0.0, 1.0], 4)
+
+    def test_refresh_ignores_other_users(self):
+        self.mirror.refresh([_memory_id("Someone else's memory.")])
+        self.assertEqual(len(self.mirror), len(_MEMORIES))
+
+    def test_remove_drops_rows(self):
+        removed = [_memory_id("Likes iced coffee."), _memory_id("Prefers oat milk.")]
+        self.qdrant.delete(_COLLECTION, points_selector=removed)
+        self.mirror.remove(removed)
+
+        self.assertEqual(len(self.mirror), len(_MEMORIES) - 2)
+        self._assert_matches_qdrant([1.0, 0.2, 0.0, 0.0], 3)
+
+    def test_remove_everything_leaves_an_empty_mirror(self):
+        self.mirror.remove([_memory_id(text) for text in _MEMORIES])
+        self.assertEqual(self.mirror.search([1.0, 0.0, 0.0, 0.0], 3), [])
+
+    def test_apply_write_result_routes_events(self):
+        self._upsert({"Has a cat named Mochi.": [1.0, 0.0, 0.0, 0.0]})
+        self.mirror.apply_write_result(
+            {
+                "results": [
+                    {"id": _memory_id("Has a cat named Mochi."), "event": "ADD"},
+                    {"id": _memory_id("Prefers oat milk."), "event": "DELETE"},
+                ]
+            }
+        )
+        ids = {row["id"] for row in self.mirror.search([1.0, 0.0, 0.0, 0.0], 10)}
+        self.assertIn(_memory_id("Has a cat named Mochi."), ids)
+        self.assertNotIn(_memory_id("Prefers oat milk."), ids)
+
+    def _wait_for_reconcile(self) -> None:
+        deadline = time.monotonic() + 5
+        while self.mirror._reloading and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(self.mirror._reloading)
+
+    def test_reconcile_reloads_in_the_background(self):
+        self._upsert({"Has a cat named Mochi.": [1.0, 0.0, 0.0, 0.0]})
+        self.mirror.maybe_reconcile()
+        self._wait_for_reconcile()
+        self.assertEqual(len(self.mirror), len(_MEMORIES))
+
+        self.mirror.reconcile_seconds = 0
+        self.mirror.maybe_reconcile()
+        self._wait_for_reconcile()
+        self.assertEqual(len(self.mirror), len(_MEMORIES) + 1)
+        self._assert_matches_qdrant([1.0, 0.0, 0.0, 0.0], 3)
+
+    def test_failed_reconcile_keeps_the_old_rows(self):
+        self.mirror.reconcile_seconds = 0
+        loaded_at = self.mirror._loaded_at
+        with patch.object(memory_mirror, "_vector_store", side_effect=RuntimeError("qdrant down")):
+            self.mirror.maybe_reconcile()
+            self._wait_for_reconcile()
+
+        self.assertEqual(len(self.mirror), len(_MEMORIES))
+        self.assertGreater(self.mirror._loaded_at, loaded_at)
+
+
+if __name__ == "__main__":
+    unittest.main()
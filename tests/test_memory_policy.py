@@ -0,0 +1,183 @@
+"""Tests for the local memory policy heuristics."""
+
+import os
+import random
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bmo import memory_policy
+from bmo.memory_policy import MemoryCategory, MemoryItem, gatekeep_durable_memories, memory_collides, prefilter_memory_turn
+
+
+# Frozen copy of the per-category extractors the rule engine replaced. Do not update this
+# alongside bmo/memory_policy.py: it is the behaviour the single-scan engine must keep.
+_NAME = r"([A-Za-z][A-Za-z0-9_\-']{1,40})"
+_REL = r"(brother|sister|mom|mother|dad|father|partner|wife|husband|girlfriend|boyfriend)"
+_BASELINE_RELATIONSHIPS = (
+    re.compile(rf"\bmy\s+{_REL}\s+(?:is\s+named|is\s+called|is|named|called)\s+{_NAME}\b", re.IGNORECASE),
+    re.compile(rf"\bI\s+have\s+(?:a|an)\s+{_REL}\s+(?:named|called)\s+{_NAME}\b", re.IGNORECASE),
+    re.compile(rf"\bmy\s+{_REL}(?:'s)?\s+name\s+is\s+{_NAME}\b", re.IGNORECASE),
+)
+_BASELINE_PREFERENCES = (
+    re.compile(r"\bI\s+(love|like|enjoy)\s+(.+)$", re.IGNORECASE),
+    re.compile(r"\bI\s+(hate|dislike)\s+(.+)$", re.IGNORECASE),
+    re.compile(r"\bI\s+prefer\s+(.+)$", re.IGNORECASE),
+    re.compile(r"\bmy\s+favorite\s+([^\n]{1,40})\s+is\s+(.+)$", re.IGNORECASE),
+    re.compile(r"\bfavorite\s+([^\n]{1,40})\s+is\s+(.+)$", re.IGNORECASE),
+)
+_BASELINE_GOALS = (
+    re.compile(r"\bmy\s+goal\s+is\s+(.+)$", re.IGNORECASE),
+    re.compile(r"\bI\s+want\s+to\s+(.+)$", re.IGNORECASE),
+    re.compile(r"\bI\s+am\s+trying\s+to\s+(.+)$", re.IGNORECASE),
+    re.compile(r"\bremember\s+to\s+(.+)$", re.IGNORECASE),
+)
+_BASELINE_FACTS = (
+    re.compile(rf"\bmy\s+name\s+is\s+{_NAME}\b", re.IGNORECASE),
+    re.compile(r"\bI\s+live\s+in\s+([^\n]{2,60})$", re.IGNORECASE),
+    re.compile(r"\bI\s+am\s+from\s+([^\n]{2,60})$", re.IGNORECASE),
+    re.compile(r"\bI\s+work\s+as\s+([^\n]{2,60})$", re.IGNORECASE),
+)
+
+
+def _baseline_chunk_items(text: str) -> list:
+    compact, titlecase = memory_policy._compact, memory_policy._titlecase_name
+    out = []
+    for pattern in _BASELINE_RELATIONSHIPS:
+        match = pattern.search(text)
+        if match:
+            relation = match.group(1).lower()
+            relation = {"mom": "mother", "dad": "father"}.get(relation, relation)
+            out.append(MemoryItem(f"Has a {relation} named {titlecase(match.group(2))}.", MemoryCategory.RELATIONSHIPS))
+    for index, pattern in enumerate(_BASELINE_PREFERENCES):
+        match = pattern.search(text)
+        if not match:
+            continue
+        if index >= 3:
+            thing, value = compact(match.group(1)), compact(match.group(2))
+            if thing and value:
+                out.append(MemoryItem(f"Favorite {thing}: {value}.", MemoryCategory.PREFERENCES))
+            continue
+        verb = match.group(1).lower() if match.lastindex and match.lastindex >= 2 else ""
+        tail = compact(match.group(2) if match.lastindex and match.lastindex >= 2 else match.group(1))
+        if not tail:
+            continue
+        if verb in {"hate", "dislike"}:
+            out.append(MemoryItem(f"Dislikes {tail}.", MemoryCategory.PREFERENCES))
+        elif verb in {"love", "like", "enjoy"}:
+            out.append(MemoryItem(f"Likes {tail}.", MemoryCategory.PREFERENCES))
+        else:
+            out.append(MemoryItem(f"Prefers {tail}.", MemoryCategory.PREFERENCES))
+    for pattern in _BASELINE_GOALS:
+        match = pattern.search(text)
+        if match and compact(match.group(1)):
+            out.append(MemoryItem(f"Goal: {compact(match.group(1))}.", MemoryCategory.GOALS))
+    for index, pattern in enumerate(_BASELINE_FACTS):
+        match = pattern.search(text)
+        if not match:
+            continue
+        if index == 0:
+            out.append(MemoryItem(f"Name is {titlecase(match.group(1))}.", MemoryCategory.PERSONAL_FACTS))
+            continue
+        fact = compact(match.group(1))
+        if fact:
+            template = ("Lives in {}.", "From {}.", "Works as {}.")[index - 1]
+            out.append(MemoryItem(template.format(fact), MemoryCategory.PERSONAL_FACTS))
+    return out
+
+
+def _reference_items(message: str) -> tuple:
+    text = memory_policy._strip_trailing_punct((message or "").strip())
+    chunks = [c.strip() for c in re.split(r"[.!?]+", text) if c.strip()] or [text]
+    items = []
+    for chunk in chunks:
+        items.extend(_baseline_chunk_items(chunk))
+    return tuple(memory_policy._dedupe(items))
+
+
+class ExtractorEngineTests(unittest.TestCase):
+
+    def test_known_outputs(self):
+        decision = gatekeep_durable_memories("My favorite color is blue. I live in Cebu City! my dad is named Rex")
+        self.assertEqual(
+            [i.text for i in decision.items],
+            ["Favorite color: blue.", "Lives in Cebu City.", "Has a father named Rex."],
+        )
+        self.assertEqual(gatekeep_durable_memories("okay cool").reason, "no_durable_match")
+        self.assertEqual(gatekeep_durable_memories("  ").reason, "empty")
+
+    def test_single_scan_matches_reference(self):
+        fragments = (
+            "my brother is named elp", "I have an uncle named Bo", "my mom's name is Joy", "I love",
+            "i hate mondays", "MY FAVORITE game is zelda", "favorite food is adobo", "my goal is to ship",
+            "I want to learn rust", "I am trying to sleep", "Remember to buy milk", "my name is glenn",
+            "I am from Manila", "I work as an engineer", "okay", "my brothers are cool", "myfavorite is x",
+            "I  like\n it", "Ilike", "favorite", "I", "",
+        )
+        rng = random.Random(7)
+        for _ in range(2000):
+            message = "".join(
+                rng.choice(fragments) + rng.choice((". ", "! ", "? ", " ", ", ", "\n", ""))
+                for _ in range(rng.randint(0, 10))
+            )
+            self.assertEqual(gatekeep_durable_memories(message).items, _reference_items(message), message)
+
+
+class PrefilterTests(unittest.TestCase):
+
+    def test_skip_examples_are_skipped(self):
+        for text in ("I'm pooping.", "pick a random cassette", "Turn the volume up!"):
+            self.assertEqual(prefilter_memory_turn(text).verdict, "skip", text)
+
+    def test_commands_and_questions_are_skipped(self):
+        self.assertEqual(prefilter_memory_turn("Play some lo-fi music").reason, "command")
+        self.assertEqual(prefilter_memory_turn("Can you look that up").reason, "command")
+        self.assertEqual(prefilter_memory_turn("What's my favorite color?").reason, "question")
+        self.assertEqual(prefilter_memory_turn("how is the weather").reason, "question")
+
+    def test_prefixes_match_whole_words_only(self):
+        for text in (
+            "However, I recently moved to Davao for good.",
+            "Whatever, I am allergic to shellfish now.",
+            "Stopping coffee for good, doctor said so.",
+            "Skipping meat from now on, I went vegetarian.",
+        ):
+            self.assertEqual(prefilter_memory_turn(text).verdict, "uncertain", text)
+
+    def test_short_and_first_person_turns_go_to_the_llm(self):
+        self.assertEqual(prefilter_memory_turn("I'm vegan").verdict, "uncertain")
+        self.assertEqual(prefilter_memory_turn("I'm vegan").reason, "first_person")
+        self.assertEqual(prefilter_memory_turn("okay").verdict, "uncertain")
+        self.assertEqual(prefilter_memory_turn("Skip it, I'm lactose intolerant").verdict, "uncertain")
+
+    def test_clean_durable_statement_is_stored_locally(self):
+        decision = prefilter_memory_turn("My brother is named Elp.")
+        self.assertEqual(decision.verdict, "store")
+        self.assertEqual(decision.items[0].category, MemoryCategory.RELATIONSHIPS)
+
+    def test_ambiguous_turns_escalate(self):
+        self.assertEqual(prefilter_memory_turn("I just moved to Cebu with my family").verdict, "uncertain")
+        multi = prefilter_memory_turn("I like coffee. Also my sister is named Ann.")
+        self.assertEqual(multi.verdict, "uncertain")
+
+    def test_local_store_collides_with_same_slot(self):
+        item = prefilter_memory_turn("My favorite color is green now.").items[0]
+        existing = [{"id": "a", "memory": "Favorite color: blue.", "metadata": {"category": "preferences"}}]
+        self.assertTrue(memory_collides(item, existing))
+        self.assertFalse(memory_collides(item, [{"id": "b", "memory": "Favorite food: adobo.", "metadata": {"category": "preferences"}}]))
+        self.assertFalse(memory_collides(item, [{"id": "c", "memory": "Favorite color: blue.", "metadata": {"category": "goals"}}]))
+
+    def test_near_duplicate_collides(self):
+        item = MemoryItem(text="Likes strong black coffee.", category=MemoryCategory.PREFERENCES)
+        self.assertTrue(memory_collides(item, [{"id": "a", "memory": "Likes strong black coffee", "metadata": {}}]))
+        self.assertFalse(memory_collides(item, [{"id": "a", "memory": "Likes hiking.", "metadata": {}}]))
+
+    def test_custom_lexicon(self):
+        lexicon = ("Brb.",)
+        self.assertEqual(prefilter_memory_turn("brb", skip_lexicon=lexicon).reason, "skip_lexicon")
+
+
+if __name__ == "__main__":
+    unittest.main()
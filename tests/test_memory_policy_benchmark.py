@@ -0,0 +1,78 @@
+"""Benchmarks for the durable-memory extractor over long transcripts.
+
+Run with ``pytest tests/test_memory_policy_benchmark.py``; pytest-benchmark comes with the
+``dev`` dependency group (``uv sync`` installs it). Compare runs with
+``--benchmark-autosave`` / ``--benchmark-compare``.
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bmo.memory_policy import gatekeep_durable_memories, prefilter_memory_turn
+
+_DURABLE = (
+    "My brother is named Elp",
+    "I have a sister called Ann",
+    "My mom's name is Joy",
+    "I really like iced coffee with oat milk",
+    "I hate waking up early on weekends",
+    "I prefer mechanical keyboards",
+    "My favorite color is blue",
+    "My goal is to ship the memory service this month",
+    "I want to become a better backend engineer",
+    "I am trying to sleep before midnight",
+    "Remember to water the plants",
+    "My name is Glenn",
+    "I live in Cebu City",
+    "I am from Manila",
+    "I work as a software engineer",
+)
+
+_CHATTER = (
+    "Okay so anyway",
+    "What time is it",
+    "Hmm let me think about that for a second",
+    "That was actually pretty funny",
+    "Pick a random cassette",
+    "Turn the volume up",
+    "I'm hungry right now",
+    "Can you search the internet for the weather in Cebu tomorrow",
+    "Yeah yeah I know, I know",
+    "So the thing is the build kept failing and nobody knew why until Friday",
+)
+
+
+def _transcript(seed: int, sentences: int, durable_ratio: float, *, run_on: bool = False) -> str:
+    rng = random.Random(seed)
+    parts = []
+    for _ in range(sentences):
+        pool = _DURABLE if rng.random() < durable_ratio else _CHATTER
+        parts.append(rng.choice(pool) if run_on else rng.choice(pool) + rng.choice((".", "!", "?", "...")))
+    return ", and ".join(parts) if run_on else " ".join(parts)
+
+
+CHATTY = _transcript(1, 400, 0.05)
+DENSE = _transcript(2, 400, 0.6)
+# One run-on sentence: the `.+$` tails see the whole remainder of the transcript.
+RUN_ON = _transcript(3, 200, 0.3, run_on=True)
+
+
+@pytest.mark.parametrize("transcript", [CHATTY, DENSE, RUN_ON], ids=["chatty", "dense", "run_on"])
+def test_gatekeep_long_transcript(benchmark, transcript):
+    decision = benchmark(gatekeep_durable_memories, transcript)
+    assert decision.reason in {"durable_match", "no_durable_match"}
+
+
+def test_prefilter_per_turn(benchmark):
+    turns = [s.strip() for s in DENSE.split(". ") if s.strip()][:200]
+
+    def run():
+        return [prefilter_memory_turn(t) for t in turns]
+
+    verdicts = benchmark(run)
+    assert {d.verdict for d in verdicts} <= {"skip", "store", "uncertain"}
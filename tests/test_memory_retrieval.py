@@ -0,0 +1,270 @@
+"""Tests for the Mem0 retrieval gate, cache and interim-transcript prefetch."""
+
+import asyncio
+import os
+import sys
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bmo import memory_retrieval
+from bmo.config import MEM0_GATEKEEPER_LIMIT, MEM0_INJECT_LIMIT
+from bmo.memory_retrieval import RetrievalPrefetcher, TurnRetrieval, retrieve_turn_memories
+
+
+class _FakeSearch:
+    """Stands in for ``retrieve_turn_memories``; records queries and can be slowed down."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.queries: list[str] = []
+
+    def __call__(self, text: str) -> TurnRetrieval:
+        self.queries.append(text)
+        if self.delay:
+            time.sleep(self.delay)
+        return TurnRetrieval(user_text=text, results=({"id": text},))
+
+
+def _hits(n: int) -> list[dict]:
+    return [{"id": f"m{i}", "memory": f"Memory {i}.", "score": 1 - i / 1000} for i in range(n)]
+
+
+class RetrieveTurnMemoriesTests(unittest.TestCase):
+
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.search.return_value = {"results": _hits(120)}
+        self.mirror = MagicMock(ready=False)
+        for target, value in (("mem0_client", self.client), ("memory_mirror", self.mirror)):
+            p = patch.object(memory_retrieval, target, value)
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_one_search_feeds_injection_and_writer(self):
+        retrieval = retrieve_turn_memories("what's my brother's name")
+
+        self.client.search.assert_called_once_with(
+            "what's my brother's name", user_id="glenn", limit=max(MEM0_INJECT_LIMIT, MEM0_GATEKEEPER_LIMIT)
+        )
+        injection, gatekeeper = retrieval.for_injection(), retrieval.for_gatekeeper()
+        self.assertEqual(len(injection), min(120, MEM0_INJECT_LIMIT))
+        self.assertEqual(len(gatekeeper), MEM0_GATEKEEPER_LIMIT)
+        self.assertEqual(gatekeeper, injection[:MEM0_GATEKEEPER_LIMIT])
+        self.assertEqual(gatekeeper[0]["id"], "m0")
+
+    def test_list_shaped_results_are_filtered(self):
+        self.client.search.return_value = [{"id": "a", "memory": "Likes coffee."}, "junk", None]
+        self.assertEqual(retrieve_turn_memories("coffee").results, ({"id": "a", "memory": "Likes coffee."},))
+
+    def test_ready_mirror_answers_without_mem0_search(self):
+        self.mirror.ready = True
+        self.mirror.search.return_value = _hits(3)
+        self.client.embedding_model.embed.return_value = [0.1, 0.2]
+
+        retrieval = retrieve_turn_memories("coffee")
+
+        self.client.embedding_model.embed.assert_called_once_with("coffee", "search")
+        self.mirror.search.assert_called_once_with([0.1, 0.2], max(MEM0_INJECT_LIMIT, MEM0_GATEKEEPER_LIMIT))
+        self.mirror.maybe_reconcile.assert_called_once()
+        self.client.search.assert_not_called()
+        self.assertEqual([r["id"] for r in retrieval.results], ["m0", "m1", "m2"])
+
+    def test_mirror_failure_falls_back_to_mem0(self):
+        self.mirror.ready = True
+        self.mirror.search.side_effect = RuntimeError("shape mismatch")
+
+        retrieval = retrieve_turn_memories("coffee")
+
+        self.client.search.assert_called_once()
+        self.assertEqual(len(retrieval.results), 120)
+
+    def test_no_client_returns_empty_retrieval(self):
+        with patch.object(memory_retrieval, "mem0_client", None):
+            retrieval = retrieve_turn_memories("coffee")
+        self.assertEqual(retrieval, TurnRetrieval(user_text="coffee", results=()))
+        self.assertEqual((retrieval.for_injection(), retrieval.for_gatekeeper()), ([], []))
+        self.mirror.search.assert_not_called()
+
+
+class _RetrievalTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.search = _FakeSearch()
+        p = patch.object(memory_retrieval, "retrieve_turn_memories", self.search)
+        p.start()
+        self.addCleanup(p.stop)
+
+
+class RetrievalGateTests(_RetrievalTestCase):
+
+    def test_always_mode_searches_every_non_empty_turn(self):
+        prefetcher = RetrievalPrefetcher(mode="ALWAYS")
+        self.assertTrue(prefetcher.should_retrieve("turn the volume up"))
+        self.assertFalse(prefetcher.should_retrieve("   "))
+
+    def test_heuristic_mode_only_searches_memory_turns(self):
+        prefetcher = RetrievalPrefetcher(mode="HEURISTIC")
+        for text in ("do you remember my dog?", "what's my favorite color?", "my brother said hi"):
+            self.assertTrue(prefetcher.should_retrieve(text), text)
+        for text in ("turn the volume up", "tell me a joke", "good morning"):
+            self.assertFalse(prefetcher.should_retrieve(text), text)
+
+    def test_skipped_turn_returns_none_and_counts(self):
+        async def run():
+            prefetcher = RetrievalPrefetcher(mode="HEURISTIC")
+            self.assertIsNone(prefetcher.take("tell me a joke"))
+            return prefetcher.stats
+
+        stats = asyncio.run(run())
+        self.assertEqual((stats.skipped, stats.misses), (1, 0))
+        self.assertEqual(self.search.queries, [])
+
+    def test_cached_mode_reuses_repeated_queries_until_invalidated(self):
+        async def run():
+            prefetcher = RetrievalPrefetcher(mode="HEURISTIC_CACHED", cache_ttl=60)
+            first = await prefetcher.take("What do you remember about me?")
+            second = await prefetcher.take("what do you remember about me")
+            prefetcher.invalidate()
+            await prefetcher.take("what do you remember about me")
+            return prefetcher.stats, first, second
+
+        stats, first, second = asyncio.run(run())
+        self.assertIs(first, second)
+        self.assertEqual((stats.misses, stats.cached), (2, 1))
+        self.assertEqual(len(self.search.queries), 2)
+        self.assertAlmostEqual(stats.saved_seconds, stats.cached * stats.avg_latency)
+
+    def test_cache_entries_expire(self):
+        async def run():
+            prefetcher = RetrievalPrefetcher(mode="HEURISTIC_CACHED", cache_ttl=-1)
+            await prefetcher.take("do you remember my dog?")
+            await prefetcher.take("do you remember my dog?")
+            return prefetcher.stats
+
+        stats = asyncio.run(run())
+        self.assertEqual((stats.misses, stats.cached), (2, 0))
+
+    def test_heuristic_mode_does_not_cache(self):
+        async def run():
+            prefetcher = RetrievalPrefetcher(mode="HEURISTIC")
+            await prefetcher.take("do you remember my dog?")
+            await prefetcher.take("do you remember my dog?")
+            return prefetcher.stats
+
+        self.assertEqual(asyncio.run(run()).misses, 2)
+
+
+class PrefetchTests(_RetrievalTestCase):
+
+    def test_slow_search_times_out_but_keeps_running(self):
+        self.search.delay = 0.3
+
+        async def run():
+            prefetcher = RetrievalPrefetcher(mode="ALWAYS", deadline=0.05)
+            task = prefetcher.take("what is my brother's name")
+            waited = await prefetcher.wait(task)
+            self.assertFalse(task.done())
+            return prefetcher.stats, waited, await task
+
+        stats, waited, finished = asyncio.run(run())
+        self.assertIsNone(waited)
+        self.assertEqual(stats.timeouts, 1)
+        self.assertEqual(finished.user_text, "what is my brother's name")
+
+    def test_interim_prefetch_is_reused_by_the_final_turn(self):
+        async def run():
+            prefetcher = RetrievalPrefetcher(mode="ALWAYS", similarity=0.8)
+            prefetcher.on_transcript("what is my brother's", is_final=False)
+            prefetcher.on_transcript("what is my brother's name", is_final=False)
+            in_flight = prefetcher._pending
+            taken = prefetcher.take("What is my brother's name?")
+            self.assertIs(taken, in_flight)
+            return prefetcher.stats, await prefetcher.wait(taken)
+
+        stats, retrieval = asyncio.run(run())
+        self.assertEqual((stats.hits, stats.misses), (1, 0))
+        self.assertEqual(retrieval.user_text, "what is my brother's")
+        self.assertEqual(self.search.queries, ["what is my brother's"])
+
+    def test_final_segments_accumulate_into_one_prefetch(self):
+        async def run():
+            prefetcher = RetrievalPrefetcher(mode="ALWAYS")
+            prefetcher.on_transcript("remind me what", is_final=True)
+            await prefetcher._pending
+            prefetcher.on_transcript("my sister likes", is_final=True)
+            taken = prefetcher.take("remind me what my sister likes")
+            await taken
+            return prefetcher.stats
+
+        self.assertEqual(asyncio.run(run()).hits, 1)
+        self.assertEqual(self.search.queries[-1], "remind me what my sister likes")
+
+    def test_drifting_interims_coalesce_into_one_follow_up(self):
+        self.search.delay = 0.05
+        interims = (
+            "so what was the name of",
+            "so what was the name of the place my sister",
+            "so what was the name of the place my sister went to last summer",
+            "so what was the name of the place my sister went to last summer with her friends",
+            "so what was the name of the place my sister went to last summer with her friends from work",
+        )
+
+        async def run():
+            prefetcher = RetrievalPrefetcher(mode="ALWAYS", similarity=0.8)
+            for text in interims:
+                prefetcher.on_transcript(text, is_final=False)
+            self.assertEqual(prefetcher._turn_prefetches, 1)
+            first = prefetcher._pending
+            await first
+            await asyncio.sleep(0)
+            follow_up = prefetcher._pending
+            self.assertIsNot(follow_up, first)
+            await follow_up
+            # Per-turn cap: a third drift does not start another search.
+            prefetcher.on_transcript(interims[0] + " and why", is_final=False)
+            taken = prefetcher.take(interims[-1])
+            self.assertIs(taken, follow_up)
+            return prefetcher.stats
+
+        stats = asyncio.run(run())
+        self.assertEqual(self.search.queries, [interims[0], interims[-1]])
+        self.assertEqual(stats.hits, 1)
+
+    def test_dissimilar_final_text_starts_a_new_search(self):
+        async def run():
+            prefetcher = RetrievalPrefetcher(mode="ALWAYS", similarity=0.8)
+            prefetcher.on_transcript("what is my brother's name", is_final=False)
+            pending = prefetcher._pending
+            taken = prefetcher.take("what did I say about my vacation plans")
+            self.assertIsNot(taken, pending)
+            await asyncio.gather(pending, taken)
+            return prefetcher.stats
+
+        stats = asyncio.run(run())
+        self.assertEqual((stats.hits, stats.misses), (0, 1))
+
+    def test_similarity_threshold_decides_reuse(self):
+        prefetcher = RetrievalPrefetcher(mode="ALWAYS", similarity=0.9)
+        self.assertTrue(prefetcher._matches("What's my dog's name?", "whats my dogs name"))
+        self.assertFalse(prefetcher._matches("what's my dog's name", "what's my cat's age"))
+        self.assertTrue(RetrievalPrefetcher(mode="ALWAYS", similarity=0.5)._matches("what's my dog's name", "what's my cat's age"))
+
+    def test_failed_prefetch_is_not_reused(self):
+        async def run():
+            prefetcher = RetrievalPrefetcher(mode="ALWAYS")
+            failed = asyncio.get_running_loop().create_future()
+            failed.set_exception(RuntimeError("qdrant down"))
+            prefetcher._pending, prefetcher._pending_text = failed, "what is my name"
+            taken = prefetcher.take("what is my name")
+            self.assertIsNot(taken, failed)
+            await taken
+            return prefetcher.stats
+
+        self.assertEqual(asyncio.run(run()).misses, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,216 @@
+"""Tests for the background Mem0 writer and the gated store path."""
+
+import asyncio
+import os
+import sys
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bmo import memory_writer
+from bmo.llm_gatekeeper import GatekeeperAction, GatekeeperResult
+from bmo.memory_policy import MemoryCategory, prefilter_memory_turn
+from bmo.memory_writer import MemoryWriter
+
+
+class _WriterTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.mem0 = MagicMock()
+        self.mem0.add.return_value = {"results": []}
+        for name, value in (("mem0_client", self.mem0), ("sync_mirror", MagicMock())):
+            p = patch.object(memory_writer, name, value)
+            p.start()
+            self.addCleanup(p.stop)
+
+
+class MemoryWriterQueueTests(_WriterTestCase):
+
+    def _writer(self, **kwargs) -> tuple[MemoryWriter, list[list[str]]]:
+        batches: list[list[str]] = []
+        writer = MemoryWriter(mode="NORMAL", **kwargs)
+
+        async def record(batch):
+            batches.append([t for job in batch for t in job.texts])
+
+        writer._process = record
+        return writer, batches
+
+    def test_full_queue_merges_into_newest_then_drops_oldest(self):
+        async def run():
+            writer, _ = self._writer(queue_size=2, coalesce_max=2, batch_window=0)
+            for text in ("a", "b", "c", "d", "e"):
+                writer.submit(text, None)
+            queued = [job.texts for job in writer._jobs]
+            stats = writer.stats
+            await writer.aclose()
+            return queued, stats
+
+        queued, stats = asyncio.run(run())
+        self.assertEqual(queued, [["b", "c"], ["d", "e"]])
+        self.assertEqual((stats.submitted, stats.merged, stats.dropped), (5, 2, 1))
+
+    def test_batch_window_coalesces_up_to_coalesce_max(self):
+        async def run():
+            writer, batches = self._writer(queue_size=10, workers=1, coalesce_max=3, batch_window=0.05)
+            for text in ("a", "b", "c", "d", "e"):
+                writer.submit(text, None)
+            await writer.aclose()
+            return batches
+
+        self.assertEqual(asyncio.run(run()), [["a", "b", "c"], ["d", "e"]])
+
+    def test_aclose_drains_queue_and_rejects_new_work(self):
+        async def run():
+            writer, batches = self._writer(queue_size=10, workers=1, coalesce_max=1, batch_window=0)
+            original = writer._process
+
+            async def slow(batch):
+                await asyncio.sleep(0.01)
+                await original(batch)
+
+            writer._process = slow
+            for text in ("a", "b", "c"):
+                writer.submit(text, None)
+            await writer.aclose()
+            writer.submit("late", None)
+            return writer, batches
+
+        writer, batches = asyncio.run(run())
+        self.assertEqual(batches, [["a"], ["b"], ["c"]])
+        self.assertEqual(writer.depth, 0)
+        self.assertEqual(writer.stats.submitted, 3)
+        self.assertEqual(writer._tasks, [])
+
+
+class PrefilterSamplingTests(_WriterTestCase):
+
+    def test_shadow_sampling_measures_agreement(self):
+        captured = {}
+
+        async def fake_store(items, *, shadows, executor):
+            captured["items"], captured["shadows"] = items, shadows
+            return [True, False]
+
+        async def run():
+            writer = MemoryWriter(mode="GATED", sample_rate=1.0)
+            writer._existing_memories = AsyncMock(return_value=[])
+            jobs = [memory_writer.WriteJob(texts=[t], retrievals=[]) for t in (
+                "Turn the volume up.",
+                "My brother is named Elp.",
+                "I just moved to Cebu with my family",
+            )]
+            with patch.object(memory_writer, "store_gated_batch", fake_store):
+                await writer._process_gated(jobs)
+            return writer
+
+        writer = asyncio.run(run())
+        p = writer.prefilter
+        self.assertEqual((p.skip, p.store, p.uncertain), (1, 1, 1))
+        self.assertEqual([text for text, _ in captured["shadows"]], ["Turn the volume up.", "My brother is named Elp."])
+        self.assertEqual([text for text, _, _ in captured["items"]], ["My brother is named Elp.", "I just moved to Cebu with my family"])
+        self.assertEqual((p.sampled, p.agreed, p.agreement), (2, 1, 0.5))
+        writer._existing_memories.assert_awaited()
+        self.assertEqual(writer._existing_memories.await_count, 2)
+
+    def test_no_sampling_at_zero_rate(self):
+        async def fake_store(items, *, shadows, executor):
+            self.assertEqual(list(shadows), [])
+            return []
+
+        async def run():
+            writer = MemoryWriter(mode="GATED", sample_rate=0.0)
+            writer._existing_memories = AsyncMock(return_value=[])
+            with patch.object(memory_writer, "store_gated_batch", fake_store):
+                await writer._process_gated([memory_writer.WriteJob(texts=["Turn the volume up."], retrievals=[])])
+            return writer
+
+        self.assertEqual(asyncio.run(run()).prefilter.sampled, 0)
+
+
+class StoreTests(_WriterTestCase):
+
+    def test_store_heuristic_skips_near_duplicates(self):
+        existing = [{"id": "m1", "memory": "Has a brother named Elp", "metadata": {"category": "relationships"}}]
+        memory_writer.store_heuristic("My brother is named Elp.", existing)
+        self.mem0.add.assert_not_called()
+
+        memory_writer.store_heuristic("My sister is named Ann.", existing)
+        self.assertEqual(self.mem0.add.call_args.args[0], [{"role": "user", "content": "Has a sister named Ann."}])
+
+    def test_apply_gatekeeper_actions_updates_known_ids_and_adds_the_rest(self):
+        existing = [
+            {"id": "m1", "memory": "Favorite color: blue.", "metadata": {"category": "preferences"}},
+            {"id": "m2", "memory": "raw transcript", "metadata": {}},
+        ]
+        result = GatekeeperResult(
+            actions=(
+                GatekeeperAction(op="update", text="Favorite color: green.", category=MemoryCategory.PREFERENCES, memory_id="m1"),
+                GatekeeperAction(op="update", text="Likes tea.", category=MemoryCategory.PREFERENCES, memory_id="m2"),
+                GatekeeperAction(op="add", text="Goal: ship BMO.", category=MemoryCategory.GOALS),
+            ),
+            reason="",
+            status="store",
+        )
+        memory_writer.apply_gatekeeper_actions(result, existing)
+
+        self.mem0.update.assert_called_once_with("m1", "Favorite color: green.")
+        added = [c.args[0][0]["content"] for c in self.mem0.add.call_args_list]
+        self.assertEqual(added, ["Likes tea.", "Goal: ship BMO."])
+        self.assertEqual(self.mem0.add.call_args.kwargs["metadata"]["source"], "llm")
+
+
+
+class StoreGatedBatchTests(unittest.TestCase):
+
+    def setUp(self):
+        self.gatekeeper = AsyncMock(side_effect=lambda items: [GatekeeperResult(actions=(), reason="r", status="store")] * len(items))
+        self.apply = MagicMock()
+        self.heuristic = MagicMock()
+        for name, mock in (
+            ("arun_llm_gatekeeper_batch", self.gatekeeper),
+            ("apply_gatekeeper_actions", self.apply),
+            ("store_heuristic", self.heuristic),
+        ):
+            p = patch.object(memory_writer, name, mock)
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_colliding_local_store_goes_to_gatekeeper(self):
+        text = "My favorite color is green now."
+        existing = [{"id": "m1", "memory": "Favorite color: blue.", "metadata": {"category": "preferences"}}]
+        asyncio.run(memory_writer.store_gated_batch([(text, existing, prefilter_memory_turn(text))]))
+
+        sent = self.gatekeeper.call_args.args[0]
+        self.assertEqual([i.user_text for i in sent], [text])
+        self.apply.assert_called_once()
+        self.heuristic.assert_not_called()
+
+    def test_gatekeeper_errors_and_failed_searches_fall_back_to_heuristic(self):
+        self.gatekeeper.side_effect = lambda items: [GatekeeperResult(actions=(), reason="x", status="error")] * len(items)
+        items = [("I just moved to Cebu", [], prefilter_memory_turn("I just moved to Cebu")), ("I like tea", None, None)]
+        asyncio.run(memory_writer.store_gated_batch(items))
+
+        self.assertEqual([i.user_text for i in self.gatekeeper.call_args.args[0]], ["I just moved to Cebu"])
+        self.assertEqual([c.args[0] for c in self.heuristic.call_args_list], ["I like tea", "I just moved to Cebu"])
+        self.apply.assert_not_called()
+
+    def test_shadow_results_report_agreement(self):
+        skip = prefilter_memory_turn("Turn the volume up.")
+        self.gatekeeper.side_effect = lambda items: [GatekeeperResult(actions=(), reason="x", status="skip")] * len(items)
+        agreements = asyncio.run(memory_writer.store_gated_batch([], shadows=[("Turn the volume up.", skip)]))
+        self.assertEqual(agreements, [True])
+        self.assertEqual(self.gatekeeper.call_args.args[0][0].existing_memories, [])
+
+    def test_non_colliding_local_store_stays_local(self):
+        text = "My favorite color is green now."
+        existing = [{"id": "m1", "memory": "Favorite food: adobo.", "metadata": {"category": "preferences"}}]
+        asyncio.run(memory_writer.store_gated_batch([(text, existing, prefilter_memory_turn(text))]))
+
+        self.gatekeeper.assert_not_called()
+        self.heuristic.assert_called_once_with(text, existing)
+
+
+if __name__ == "__main__":
+    unittest.main()
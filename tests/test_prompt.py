@@ -0,0 +1,67 @@
+"""Tests for the hot-reloadable prompt registry."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bmo import prompt as prompt_module
+from bmo.prompt import PromptRegistry
+
+
+class PromptRegistryTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "bmo.json"
+        self.mtime = 1_000_000_000
+
+    def _write(self, content: str) -> None:
+        self.path.write_text(content, encoding="utf-8")
+        self.mtime += 1
+        os.utime(self.path, (self.mtime, self.mtime))
+
+    def test_composes_once_per_version(self):
+        self._write(json.dumps({"role": "You are BMO."}))
+        registry = PromptRegistry(self.path)
+        with patch.object(prompt_module, "compose_instructions", wraps=prompt_module.compose_instructions) as compose:
+            self.assertEqual(registry.instructions(), "You are BMO.")
+            self.assertEqual(registry.instructions(), "You are BMO.")
+            self.assertEqual(compose.call_count, 1)
+
+            self._write(json.dumps({"role": "You are BMO, a tiny console."}))
+            self.assertEqual(registry.instructions(), "You are BMO, a tiny console.")
+            self.assertEqual(registry.reloads, 1)
+
+            self._write(json.dumps({"role": "You are BMO."}))
+            self.assertEqual(registry.instructions(), "You are BMO.")
+            self.assertEqual(compose.call_count, 2)
+
+    def test_malformed_edit_keeps_last_good_version(self):
+        self._write(json.dumps({"role": "You are BMO."}))
+        registry = PromptRegistry(self.path)
+        registry.instructions()
+
+        self._write("{not json")
+        self.assertEqual(registry.instructions(), "You are BMO.")
+        self.assertEqual(registry.failures, 1)
+
+        self.path.unlink()
+        self.assertEqual(registry.instructions(), "You are BMO.")
+
+    def test_invalid_initial_file_raises(self):
+        self._write("[]")
+        with self.assertRaises(RuntimeError):
+            PromptRegistry(self.path).instructions()
+        with self.assertRaises(RuntimeError):
+            PromptRegistry(self.path.with_name("missing.json")).instructions()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+"""Tests for the circuit breaker, latency tracker and hedged requests."""
+
+import asyncio
+import json
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bmo import services
+from bmo.resilience import CircuitBreaker, HedgeStats, LatencyTracker, hedged
+
+
+class CircuitBreakerTests(unittest.TestCase):
+
+    def test_opens_after_threshold_and_probes_once(self):
+        breaker = CircuitBreaker(name="t", failure_threshold=2, reset_timeout=10)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(breaker.allow())
+
+        with patch("bmo.resilience.time.monotonic", return_value=breaker.opened_at + 11):
+            self.assertTrue(breaker.allow())
+            self.assertEqual(breaker.state, "half_open")
+            self.assertFalse(breaker.allow())
+            breaker.record_failure()
+            self.assertEqual(breaker.state, "open")
+
+        breaker.state = "half_open"
+        breaker.record_success()
+        self.assertEqual((breaker.state, breaker.failures), ("closed", 0))
+        self.assertEqual(breaker.rejected, 2)
+
+    def test_released_probe_lets_the_next_call_probe(self):
+        breaker = CircuitBreaker(name="t", failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.release()
+        self.assertEqual(breaker.state, "half_open")
+        self.assertTrue(breaker.allow())
+
+    def test_cancelled_obsidian_probe_does_not_wedge_the_breaker(self):
+        breaker = CircuitBreaker(name="obsidian", failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+
+        class _HangingClient:
+            async def get(self, url, params=None):
+                await asyncio.Event().wait()
+
+        async def run():
+            with patch.object(services, "obsidian_breaker", breaker), patch.object(
+                services.http_clients, "get", return_value=_HangingClient()
+            ):
+                with self.assertRaises(asyncio.TimeoutError):
+                    await asyncio.wait_for(services._fetch_obsidian_search("sss number"), timeout=0.05)
+
+        asyncio.run(run())
+        self.assertEqual(breaker.state, "half_open")
+        self.assertTrue(breaker.allow())
+
+    def test_timed_out_call_is_recorded_at_the_limit(self):
+        breaker = CircuitBreaker(name="obsidian", failure_threshold=5, reset_timeout=30)
+        tracker = LatencyTracker(min_timeout=0.01, max_timeout=0.02)
+
+        class _HangingClient:
+            async def get(self, url, params=None):
+                await asyncio.Event().wait()
+
+        with patch.object(services, "obsidian_breaker", breaker), patch.object(
+            services, "obsidian_latency", tracker
+        ), patch.object(services.http_clients, "get", return_value=_HangingClient()):
+            payload = json.loads(asyncio.run(services._fetch_obsidian_search("sss number")))
+
+        self.assertEqual(payload["error"], "obsidian query failed")
+        self.assertEqual(list(tracker._samples), [0.02])
+        self.assertEqual(breaker.failures, 1)
+
+    def test_half_open_probe_uses_the_static_timeout(self):
+        breaker = CircuitBreaker(name="obsidian", failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        tracker = LatencyTracker(min_timeout=0.01, max_timeout=0.02)
+
+        class _SlowClient:
+            async def get(self, url, params=None):
+                await asyncio.sleep(0.1)
+                return SimpleNamespace(status_code=200, raise_for_status=lambda: None, json=lambda: {"results": []})
+
+        with patch.object(services, "obsidian_breaker", breaker), patch.object(
+            services, "obsidian_latency", tracker
+        ), patch.object(services, "OBSIDIAN_TIMEOUT", 2), patch.object(
+            services.http_clients, "get", return_value=_SlowClient()
+        ):
+            payload = json.loads(asyncio.run(services._fetch_obsidian_search("sss number")))
+
+        self.assertNotIn("error", payload)
+        self.assertEqual(breaker.state, "closed")
+
+
+class LatencyTrackerTests(unittest.TestCase):
+
+    def test_defaults_until_enough_samples(self):
+        tracker = LatencyTracker(min_timeout=1, max_timeout=8)
+        self.assertEqual(tracker.timeout(), 8)
+        self.assertIsNone(tracker.hedge_delay())
+
+        for i in range(100):
+            tracker.observe(0.1 if i < 95 else 0.9)
+        self.assertAlmostEqual(tracker.hedge_delay(), 0.25)
+        self.assertAlmostEqual(tracker.percentile(0.99), 0.9)
+        self.assertAlmostEqual(tracker.timeout(), 1.8)
+
+    def test_timeouts_back_the_limit_off_when_the_service_slows_down(self):
+        tracker = LatencyTracker(min_timeout=1, max_timeout=8)
+        for _ in range(200):
+            tracker.observe(0.4)
+        self.assertEqual(tracker.timeout(), 1)
+
+        # The service now answers in 1.5s; successes are only recorded if they fit the limit.
+        timeouts = 0
+        while tracker.timeout() < 1.5:
+            tracker.observe_timeout(tracker.timeout())
+            timeouts += 1
+        self.assertLessEqual(timeouts, 3)
+        tracker.observe(1.5)
+        self.assertGreaterEqual(tracker.timeout(), 1.5)
+
+
+class HedgedTests(unittest.TestCase):
+
+    def test_slow_first_attempt_is_hedged(self):
+        delays = [1.0, 0.01]
+        stats = HedgeStats()
+
+        async def call():
+            delay = delays.pop(0)
+            await asyncio.sleep(delay)
+            return delay
+
+        result = asyncio.run(hedged(call, hedge_after=0.02, timeout=2, stats=stats))
+        self.assertEqual(result, 0.01)
+        self.assertEqual((stats.hedged, stats.hedge_wins), (1, 1))
+
+    def test_fast_failure_is_raised_without_hedge(self):
+        async def call():
+            raise ConnectionError("down")
+
+        with self.assertRaises(ConnectionError):
+            asyncio.run(hedged(call, hedge_after=0.5, timeout=1))
+
+    def test_overall_timeout(self):
+        async def call():
+            await asyncio.sleep(1)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(hedged(call, hedge_after=None, timeout=0.05))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+"""Tests for the TTL / stale-while-revalidate tool result cache."""
+
+import asyncio
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bmo import services
+from bmo.result_cache import ResultCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class ResultCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        self.calls = 0
+
+    async def _fetch(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        return json.dumps({"results": [self.calls]})
+
+    def test_fresh_hit_then_stale_served_while_refreshing(self):
+        cache = ResultCache(name="t", ttl=10, stale_ttl=100, max_entries=4, clock=self.clock.monotonic)
+
+        async def run():
+            first = await cache.get_or_fetch("q", self._fetch)
+            self.assertEqual(await cache.get_or_fetch("q", self._fetch), first)
+
+            self.clock.now += 20
+            stale = await cache.get_or_fetch("q", self._fetch)
+            self.assertEqual(stale, first)
+            await asyncio.sleep(0.01)
+            return await cache.get_or_fetch("q", self._fetch)
+
+        refreshed = asyncio.run(run())
+        self.assertEqual(json.loads(refreshed), {"results": [2]})
+        self.assertEqual((cache.stats.hits, cache.stats.stale_hits, cache.stats.refreshes), (2, 1, 1))
+
+    def test_expired_past_stale_window_refetches(self):
+        cache = ResultCache(name="t", ttl=10, stale_ttl=5, max_entries=4, clock=self.clock.monotonic)
+
+        async def run():
+            await cache.get_or_fetch("q", self._fetch)
+            self.clock.now += 30
+            return await cache.get_or_fetch("q", self._fetch)
+
+        self.assertEqual(json.loads(asyncio.run(run())), {"results": [2]})
+
+    def test_concurrent_misses_share_one_fetch_and_bypass_skips_cache(self):
+        cache = ResultCache(name="t", ttl=10, stale_ttl=0, max_entries=4, clock=self.clock.monotonic)
+
+        async def run():
+            await asyncio.gather(*(cache.get_or_fetch("q", self._fetch) for _ in range(3)))
+            await cache.get_or_fetch("q", self._fetch, bypass=True)
+
+        asyncio.run(run())
+        self.assertEqual(self.calls, 2)
+
+    def test_size_eviction(self):
+        cache = ResultCache(name="t", ttl=10, stale_ttl=0, max_entries=2, clock=self.clock.monotonic)
+
+        async def run():
+            for key in ("a", "b", "a", "c"):
+                await cache.get_or_fetch(key, self._fetch)
+
+        asyncio.run(run())
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats.evictions, 1)
+        self.assertEqual(list(cache._entries), ["a", "c"])
+
+    def test_obsidian_errors_are_never_cached(self):
+        responses = iter([json.dumps({"results": [], "error": "obsidian query failed"}), json.dumps({"results": ["ok"]})])
+
+        async def fake_fetch(query):
+            return next(responses)
+
+        async def run():
+            with patch.object(services, "_fetch_obsidian_search", fake_fetch):
+                first = await services.fetch_obsidian_search("SSS number")
+                second = await services.fetch_obsidian_search("  sss   NUMBER ")
+                third = await services.fetch_obsidian_search("sss number")
+            return first, second, third
+
+        services.obsidian_cache.invalidate()
+        first, second, third = asyncio.run(run())
+        self.assertIn("error", json.loads(first))
+        self.assertEqual(second, third)
+        services.obsidian_cache.invalidate()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""Tests for the Tavily adapter against the offline stub backend."""
+
+import asyncio
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bmo import services
+from bmo.services import StubTavilyBackend, search_tavily, tavily_cache_ttl
+
+
+class TavilyAdapterTests(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = StubTavilyBackend()
+        p = patch.object(services, "_tavily_backend", self.backend)
+        p.start()
+        self.addCleanup(p.stop)
+        services.tavily_cache.invalidate()
+        self.addCleanup(services.tavily_cache.invalidate)
+
+    def test_results_are_normalized_and_cached_per_parameters(self):
+        async def run():
+            first = await search_tavily("BMO adventure time", max_results=2)
+            await search_tavily("  bmo   ADVENTURE time ", max_results=2)
+            await search_tavily("BMO adventure time", max_results=3)
+            await search_tavily("BMO adventure time", topic="news", max_results=2)
+            await search_tavily("BMO adventure time", topic="news", max_results=2, time_range="d")
+            await search_tavily("BMO adventure time", topic="news", max_results=2, time_range="day")
+            return first
+
+        payload = json.loads(asyncio.run(run()))
+        self.assertEqual(payload["topic"], "general")
+        self.assertEqual(set(payload["results"][0]), {"title", "url", "content", "score"})
+        self.assertEqual(len(self.backend.calls), 4)
+        self.assertEqual(self.backend.calls[-1]["time_range"], "day")
+
+    def test_ttl_depends_on_topic_and_time_range(self):
+        self.assertGreater(tavily_cache_ttl("general", None), tavily_cache_ttl("news", None))
+        self.assertGreater(tavily_cache_ttl("news", None), tavily_cache_ttl("finance", None))
+        self.assertLessEqual(tavily_cache_ttl("general", "day"), tavily_cache_ttl("news", None))
+        self.assertLess(tavily_cache_ttl("general", "week"), tavily_cache_ttl("general", "year"))
+
+    def test_errors_are_not_cached(self):
+        async def failing(**kwargs):
+            raise RuntimeError("rate limited")
+
+        async def run():
+            with patch.object(self.backend, "search", failing):
+                first = await search_tavily("weather cebu")
+            second = await search_tavily("weather cebu")
+            return first, second
+
+        first, second = asyncio.run(run())
+        self.assertEqual(json.loads(first)["error"], "search failed")
+        self.assertTrue(json.loads(second)["results"])
+
+
+if __name__ == "__main__":
+    unittest.main()
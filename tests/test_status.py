@@ -0,0 +1,110 @@
+"""Tests for the background status aggregator and the DeepGram balance lookup."""
+
+import asyncio
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+
+from bmo import status
+from bmo.status import StatusAggregator
+
+
+class StatusAggregatorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 100.0
+        self.calls = 0
+
+    def _aggregator(self, fetchers):
+        return StatusAggregator(fetchers, interval=10, max_backoff=60, jitter=0, clock=lambda: self.now)
+
+    def test_failed_provider_keeps_last_value_and_backs_off(self):
+        outcomes = [5.0, RuntimeError("boom"), RuntimeError("boom")]
+
+        async def flaky():
+            result = outcomes.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        async def steady():
+            return 1.0
+
+        aggregator = self._aggregator({"tts_balance": flaky, "stt_balance": steady})
+        self.assertEqual(aggregator.snapshot()["balances_age_seconds"], None)
+
+        self.assertTrue(asyncio.run(aggregator.refresh()))
+        self.assertEqual(aggregator.next_delay(), 10)
+        self.now += 30
+        self.assertFalse(asyncio.run(aggregator.refresh()))
+        self.assertFalse(asyncio.run(aggregator.refresh()))
+
+        snapshot = aggregator.snapshot()
+        self.assertEqual((snapshot["tts_balance"], snapshot["stt_balance"]), (5.0, 1.0))
+        self.assertEqual(snapshot["balances_age_seconds"], 30.0)
+        self.assertEqual(aggregator.next_delay(), 40)
+        aggregator.failures = 10
+        self.assertEqual(aggregator.next_delay(), 60)
+
+    def test_status_response_does_not_wait_for_providers(self):
+        async def slow():
+            await asyncio.sleep(10)
+            return 1.0
+
+        aggregator = self._aggregator({"tts_balance": slow, "stt_balance": slow})
+
+        async def run():
+            with patch.object(status, "status_aggregator", aggregator):
+                payload = json.loads(await asyncio.wait_for(status.build_status_response(), 1))
+            await aggregator.aclose()
+            return payload
+
+        payload = asyncio.run(run())
+        self.assertIsNone(payload["tts_balance"])
+        self.assertIn("obsidian", payload)
+
+
+class DeepgramBalanceTests(unittest.TestCase):
+
+    def setUp(self):
+        self.requests = []
+        patches = [
+            patch.dict(os.environ, {"DEEPGRAM_API_KEY": "key"}),
+            patch.object(status, "_deepgram_project_id", None),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def _handler(self, request):
+        self.requests.append(request.url.path)
+        if request.url.path == "/v1/projects":
+            return httpx.Response(200, json={"projects": [{"project_id": "denied"}, {"project_id": "p1"}]})
+        if request.url.path == "/v1/projects/denied/balances":
+            return httpx.Response(403)
+        return httpx.Response(200, json={"balances": [{"amount": 12.5}]})
+
+    def test_cached_project_skips_listing(self):
+        async def run():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(self._handler))
+            with patch.object(status.http_clients, "get", return_value=client):
+                first = await status.fetch_deepgram_balance()
+                second = await status.fetch_deepgram_balance()
+            await client.aclose()
+            return first, second
+
+        self.assertEqual(asyncio.run(run()), (12.5, 12.5))
+        self.assertEqual(
+            self.requests,
+            ["/v1/projects", "/v1/projects/denied/balances", "/v1/projects/p1/balances", "/v1/projects/p1/balances"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Tests for the speculative Obsidian prefetcher."""
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bmo.tool_prefetch import ObsidianPrefetcher
+
+
+class ObsidianPrefetcherTests(unittest.TestCase):
+
+    def setUp(self):
+        self.fetched = []
+
+    async def _fetch(self, query):
+        self.fetched.append(query)
+        await asyncio.sleep(0.01)
+        return f'{{"results": ["{query}"]}}'
+
+    def _prefetcher(self, **kwargs):
+        return ObsidianPrefetcher(triggers=("Ghegi", "Philhealth"), fetch=self._fetch, **kwargs)
+
+    def test_matching_tool_query_takes_in_flight_result(self):
+        async def run():
+            prefetcher = self._prefetcher()
+            prefetcher.on_user_turn("Hey BMO, what's Ghegi's Philhealth number?")
+            return prefetcher, await prefetcher.take("Ghegi Philhealth number")
+
+        prefetcher, result = asyncio.run(run())
+        self.assertIn("Philhealth", result)
+        self.assertEqual(len(self.fetched), 1)
+        self.assertEqual((prefetcher.stats.hits, prefetcher.stats.hit_rate), (1, 1.0))
+
+    def test_unrelated_query_and_untriggered_turns_miss(self):
+        async def run():
+            prefetcher = self._prefetcher()
+            prefetcher.on_user_turn("Turn the volume up")
+            first = await prefetcher.take("volume")
+            prefetcher.on_user_turn("Ghegi said hi")
+            second = await prefetcher.take("VPS root password")
+            return prefetcher, first, second
+
+        prefetcher, first, second = asyncio.run(run())
+        self.assertIsNone(first)
+        self.assertIsNone(second)
+        self.assertEqual(self.fetched, ["Ghegi said hi"])
+        self.assertEqual(prefetcher.stats.misses, 2)
+
+    def test_next_turn_cancels_unused_prefetch_and_expiry(self):
+        async def run():
+            prefetcher = self._prefetcher(ttl=-1)
+            prefetcher.on_user_turn("Ghegi's SSS number please")
+            task = prefetcher._pending.task
+            prefetcher.on_user_turn("Ghegi's Philhealth number")
+            await asyncio.sleep(0)
+            expired = await prefetcher.take("Ghegi Philhealth number")
+            return prefetcher, task, expired
+
+        prefetcher, task, expired = asyncio.run(run())
+        self.assertTrue(task.cancelled())
+        self.assertIsNone(expired)
+        self.assertEqual(prefetcher.stats.expired, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""Tests for token-budgeted compaction of tool results."""
+
+import json
+import os
+import sys
+import unittest
+from dataclasses import replace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bmo.memory_injection import estimate_tokens
+from bmo.tool_results import OBSIDIAN_PROFILE, TAVILY_PROFILE, compact_tool_result
+
+
+class CompactToolResultTests(unittest.TestCase):
+
+    def test_obsidian_fields_sorting_and_dedupe(self):
+        raw = json.dumps({
+            "query": "sss",
+            "took_ms": 12,
+            "results": [
+                {"source_path": "a.md", "text": "SSS number:  34-123", "score": 0.4, "chunk_id": 1, "embedding": [0.1] * 50},
+                {"source_path": "b.md", "text": "Philhealth number: 12-999", "score": 0.9, "chunk_id": 2},
+                {"source_path": "c.md", "text": "sss NUMBER: 34-123", "score": 0.2},
+            ],
+        })
+        out = json.loads(compact_tool_result(raw, OBSIDIAN_PROFILE))
+        self.assertEqual(set(out), {"results"})
+        self.assertEqual([r["source_path"] for r in out["results"]], ["b.md", "a.md"])
+        self.assertEqual(out["results"][1], {"source_path": "a.md", "text": "SSS number: 34-123", "score": 0.4})
+
+    def test_tavily_fits_budget_and_dedupes_urls(self):
+        results = [
+            {"title": f"t{i}", "url": f"https://x/{i % 4}", "content": f"passage {i} " + "lorem ipsum " * 200, "score": 1 - i / 20, "raw_content": "x" * 5000}
+            for i in range(20)
+        ]
+        raw = json.dumps({"results": results, "topic": "news", "query": "q"})
+        profile = replace(TAVILY_PROFILE, budget=600)
+        compacted = compact_tool_result(raw, profile)
+        out = json.loads(compacted)
+
+        self.assertLessEqual(estimate_tokens(compacted), 600)
+        self.assertEqual(out["topic"], "news")
+        self.assertEqual(len({r["url"] for r in out["results"]}), len(out["results"]))
+        self.assertTrue(all(len(r["content"]) <= TAVILY_PROFILE.max_passage_chars + 1 for r in out["results"]))
+        self.assertEqual(len(out["results"]) + out["omitted_results"], 4)
+
+    def test_single_oversized_passage_is_truncated_to_budget(self):
+        raw = json.dumps({"results": [{"source_path": "big.md", "text": "word " * 5000, "score": 1}]})
+        compacted = compact_tool_result(raw, replace(OBSIDIAN_PROFILE, budget=100))
+        self.assertLessEqual(estimate_tokens(compacted), 110)
+        self.assertTrue(json.loads(compacted)["results"][0]["text"].endswith("…"))
+
+    def test_errors_pass_through(self):
+        raw = json.dumps({"results": [], "error": "obsidian query failed"})
+        self.assertEqual(compact_tool_result(raw, OBSIDIAN_PROFILE), raw)
+        self.assertEqual(compact_tool_result("not json", OBSIDIAN_PROFILE), "not json")
+
+
+if __name__ == "__main__":
+    unittest.main()